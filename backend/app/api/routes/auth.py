@@ -1,13 +1,15 @@
-from datetime import datetime
+import base64
+from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from pydantic import BaseModel
-from sqlalchemy import delete, or_, select
+from sqlalchemy import and_, delete, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse, UserResponse
 from app.services.auth_service import (
+    PasswordHasherBusy,
     create_access_token,
     create_user,
     decode_token,
@@ -15,12 +17,23 @@ from app.services.auth_service import (
     get_user_by_email,
     get_user_by_id,
     get_user_by_username,
-    verify_password,
+    password_hasher,
 )
+from app.services.action_log import delete_actions
+from app.services.lobby_store import lobby_store
+from app.services.persistence import discard_pending
 
 router = APIRouter()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 async def _current_user(
     authorization: str = Header(default=""),
     db: AsyncSession = Depends(get_db),
@@ -44,7 +57,10 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)):
     if await get_user_by_email(db, body.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = await create_user(db, body.username, body.email, body.password)
+    try:
+        user = await create_user(db, body.username, body.email, body.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     token = create_access_token(user.id, user.username)
     return TokenResponse(access_token=token, user=UserResponse.model_validate(user))
 
@@ -52,7 +68,11 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)):
 @router.post("/login", response_model=TokenResponse)
 async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)):
     user = await get_user_by_username(db, body.username)
-    if not user or not verify_password(body.password, user.hashed_password):
+    try:
+        valid = user is not None and await password_hasher.verify(body.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     token = create_access_token(user.id, user.username)
@@ -112,19 +132,16 @@ def _participants_from_game_record(game, user_id: int) -> list[GameParticipantOu
 
 
 def _live_game_item_for_user(user_id: int, lobby) -> Optional[GameHistoryItem]:
-    from app.api.routes.games import dict_to_state
-
-    if not any(player.user_id == user_id for player in lobby.players):
+    if lobby.player_by_user(user_id) is None:
         return None
 
     winner_color = None
     winner_display_name = None
-    if lobby.engine_state:
-        state = dict_to_state(lobby.engine_state)
-        if state.winner_index is not None:
-            winner_color = state.active_colors[state.winner_index]
-            winner_player = next((p for p in lobby.players if p.color == winner_color), None)
-            winner_display_name = winner_player.display_name if winner_player else None
+    state = lobby.engine_state
+    if state is not None and state.winner_index is not None:
+        winner_color = state.active_colors[state.winner_index]
+        winner_player = lobby.player_by_color(winner_color)
+        winner_display_name = winner_player.display_name if winner_player else None
 
     status = "completed" if lobby.status == "finished" else lobby.status
 
@@ -149,25 +166,70 @@ def _live_game_item_for_user(user_id: int, lobby) -> Optional[GameHistoryItem]:
     )
 
 
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+
+def _history_key(created_at: datetime, game_id: str) -> tuple[datetime, str]:
+    # SQLite hands back naive UTC datetimes; live lobbies use aware ones.
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return (created_at, game_id)
+
+
+def _encode_history_cursor(key: tuple[datetime, str]) -> str:
+    created_at, game_id = key
+    raw = f"{created_at.isoformat()}|{game_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_history_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, game_id = raw.split("|", 1)
+        return _history_key(datetime.fromisoformat(created_at), game_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
 @router.get("/me/games", response_model=list[GameHistoryItem])
-async def my_games(user=Depends(_current_user), db: AsyncSession = Depends(get_db)):
-    from app.models.game import Game
-    from app.api.routes.games import _lobbies
+async def my_games(
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    user=Depends(_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    The user's games, newest first, one page at a time.
 
-    items_by_game_id: dict[str, GameHistoryItem] = {}
+    Pages are keyset-paginated on (created_at, game_id); when more games
+    exist, the ``X-Next-Cursor`` header holds the value to pass as ``cursor``.
+    """
+    from app.models.game import Game, GameParticipant
+
+    after = _decode_history_cursor(cursor) if cursor else None
 
-    records_result = await db.execute(
-        select(Game).where(
+    stmt = (
+        select(Game)
+        .join(GameParticipant, GameParticipant.game_id == Game.game_id)
+        .where(GameParticipant.user_id == user.id)
+    )
+    if after is not None:
+        after_created_at, after_game_id = after
+        stmt = stmt.where(
             or_(
-                Game.player_one_user_id == user.id,
-                Game.player_two_user_id == user.id,
-                Game.player_three_user_id == user.id,
-                Game.player_four_user_id == user.id,
+                GameParticipant.created_at < after_created_at,
+                and_(
+                    GameParticipant.created_at == after_created_at,
+                    GameParticipant.game_id < after_game_id,
+                ),
             )
-        ).order_by(Game.created_at.desc())
-    )
-    records = records_result.scalars().all()
+        )
+    stmt = stmt.order_by(GameParticipant.created_at.desc(), GameParticipant.game_id.desc()).limit(limit + 1)
+    records = (await db.execute(stmt)).scalars().unique().all()
 
+    items_by_game_id: dict[str, GameHistoryItem] = {}
     for rec in records:
         items_by_game_id[rec.game_id] = GameHistoryItem(
             game_id=rec.game_id,
@@ -180,33 +242,43 @@ async def my_games(user=Depends(_current_user), db: AsyncSession = Depends(get_d
             participants=_participants_from_game_record(rec, user.id),
         )
 
-    for lobby in _lobbies.values():
+    for lobby in await lobby_store.games_for_user(user.id):
+        if after is not None and _history_key(lobby.created_at, lobby.game_id) >= after:
+            continue
         live_item = _live_game_item_for_user(user.id, lobby)
         if not live_item:
             continue
+        persisted_item = items_by_game_id.get(live_item.game_id)
         if live_item.status in ("waiting", "active", "paused"):
             items_by_game_id[live_item.game_id] = live_item
-        elif live_item.game_id not in items_by_game_id:
+        elif persisted_item is None or persisted_item.status != live_item.status:
+            # Persistence is write-behind, so the row may still show an older status.
             items_by_game_id[live_item.game_id] = live_item
 
-    return sorted(
+    items = sorted(
         items_by_game_id.values(),
-        key=lambda item: item.created_at,
+        key=lambda item: _history_key(item.created_at, item.game_id),
         reverse=True,
     )
+    if len(records) > limit or len(items) > limit:
+        items = items[:limit]
+        response.headers["X-Next-Cursor"] = _encode_history_cursor(
+            _history_key(items[-1].created_at, items[-1].game_id)
+        )
+    return items
 
 
 @router.delete("/me/games/{game_id}")
 async def delete_my_game(game_id: str, user=Depends(_current_user), db: AsyncSession = Depends(get_db)):
-    from app.models.game import Game
-    from app.api.routes.games import _lobbies
+    from app.models.game import Game, GameParticipant
 
-    lobby = _lobbies.get(game_id)
+    lobby = await lobby_store.get(game_id)
     if lobby is not None:
-        host = next((player for player in lobby.players if player.player_index == 0), None)
+        host = lobby.player_by_index(0)
         if not host or host.user_id != user.id:
             raise HTTPException(status_code=403, detail="Only the game creator can delete this game")
-        _lobbies.pop(game_id, None)
+        await lobby_store.delete(game_id)
+        discard_pending(game_id)
 
     record = (
         await db.execute(select(Game).where(Game.game_id == game_id))
@@ -214,12 +286,16 @@ async def delete_my_game(game_id: str, user=Depends(_current_user), db: AsyncSes
 
     if record is None:
         if lobby is not None:
+            await delete_actions(db, game_id)
+            await db.commit()
             return {"ok": True}
         raise HTTPException(status_code=404, detail="Game not found")
 
     if record.player_one_user_id != user.id:
         raise HTTPException(status_code=403, detail="Only the game creator can delete this game")
 
+    await db.execute(delete(GameParticipant).where(GameParticipant.game_id == game_id))
     await db.execute(delete(Game).where(Game.game_id == game_id))
+    await delete_actions(db, game_id)
     await db.commit()
     return {"ok": True}
@@ -1,16 +1,21 @@
-"""Game API: create, join, ready, roll, move, pass, chance, websocket."""
+"""Game API: create, join, ready, bots, roll, move, pass, chance, websocket."""
 
+import asyncio
 import json
 import logging
+import time
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import asdict
 from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.schemas.game import (
+    AddBotsRequest,
+    ColorOddsSchema,
     GameCreate,
     GameState,
     JoinRequest,
@@ -21,15 +26,48 @@ from app.schemas.game import (
     RollResponse,
     MoveRequest,
     MoveResponse,
+    OddsResponse,
 )
+from app.services.action_log import (
+    ACTION_CHANCE,
+    ACTION_MOVE,
+    ACTION_PASS,
+    ACTION_ROLL,
+    ACTION_SNAPSHOT,
+    ACTION_START,
+    LoggedAction,
+    ReplayError,
+    action_log,
+    action_rng,
+    bot_seats,
+    last_seed,
+    load_actions,
+    new_seed,
+    replay,
+)
+from app.services.bot_players import bot_pool, bot_turns
+from app.services.bot_search import BotDecision, SearchRequest
 from app.services.connection_manager import manager
+from app.services.game_actor import game_actors
+from app.services.lobby_store import LobbyConflictError, LobbyRecord, PlayerRecord, lobby_store
+from app.services.odds import OddsBusy, OddsRequest, odds_service
+from app.services.persistence import (
+    checkpoint_queue,
+    discard_pending,
+    persistence_queue,
+    recovery_stats,
+)
 from app.services.game_engine import (
     GameEngine,
     GameEngineState,
+    MoveOption,
     ACTIVE_COLORS_BY_COUNT,
+    get_engine,
     state_to_dict,
     dict_to_state,
     advance_turn,
+    end_chance_turn,
+    end_move_turn,
 )
 from app.services.auth_service import decode_token, get_db
 
@@ -37,35 +75,6 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-# ---------------------------------------------------------------------------
-# In-memory lobby store
-# ---------------------------------------------------------------------------
-
-@dataclass
-class PlayerRecord:
-    player_id: str
-    color: str
-    player_index: int
-    display_name: str
-    ready: bool = False
-    connected: bool = False
-    user_id: Optional[int] = None
-
-
-@dataclass
-class LobbyRecord:
-    game_id: str
-    player_count: int
-    players: list[PlayerRecord] = field(default_factory=list)
-    status: str = "waiting"          # "waiting" | "active" | "paused" | "finished"
-    engine_state: Optional[dict] = None  # None until all players ready
-    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    resume_ready_set: set = field(default_factory=set)  # player_ids who clicked resume
-
-
-_lobbies: dict[str, LobbyRecord] = {}
-
-
 # ---------------------------------------------------------------------------
 # Helpers: DB persistence
 # ---------------------------------------------------------------------------
@@ -80,15 +89,20 @@ def _optional_user_id(authorization: str) -> Optional[int]:
     return int(sub) if sub else None
 
 
+def _auth_user_id(authorization: str = Header(default="")) -> Optional[int]:
+    """Request dependency: the caller's user id, verified once per request."""
+    return _optional_user_id(authorization)
+
+
 def _bind_player_user(
     lobby: "LobbyRecord",
     player: "PlayerRecord",
-    authorization: str,
+    user_id: Optional[int],
 ) -> None:
     """Attach an authenticated user id to the in-memory player record when available."""
-    user_id = _optional_user_id(authorization)
     if user_id is not None:
-        player.user_id = user_id
+        lobby.bind_user(player, user_id)
+        lobby_store.note_user(lobby, user_id)
 
 
 def _stable_player_id(game_id: str, player_index: int) -> str:
@@ -96,79 +110,285 @@ def _stable_player_id(game_id: str, player_index: int) -> str:
     return f"restored:{game_id}:{player_index}"
 
 
+# Rows per multi-row upsert; keeps bind parameters well under driver limits.
+UPSERT_BATCH_SIZE = 500
+
+
 async def _persist_game(lobby: LobbyRecord, db: AsyncSession) -> None:
-    """Upsert a single persisted game row keyed by game_id."""
-    import app.models.game  # noqa: F401
-    from sqlalchemy import select
-    from app.models.game import Game
+    """Upsert a single persisted game row keyed by game_id and commit."""
+    await _upsert_games([lobby], db)
+    await db.commit()
 
-    state = lobby.engine_state
+
+async def persist_lobbies(lobbies: list[LobbyRecord]) -> None:
+    """Write a batch of lobbies in one session and one commit (write-behind flush)."""
+    from app.core.database import SessionLocal
+
+    async with SessionLocal() as db:
+        await _upsert_games(lobbies, db)
+        await db.commit()
+
+
+def lobby_in_use(game_id: str) -> bool:
+    """Games with open sockets or recent commands stay resident in the lobby store."""
+    return manager.has_connections(game_id) or game_actors.is_active(game_id)
+
+
+def _schedule_persist(lobby: LobbyRecord) -> None:
+    """Queue the lobby for the background writer instead of blocking the request."""
+    persistence_queue.mark_dirty(lobby.game_id, lobby)
+
+
+def _schedule_checkpoint(lobby: LobbyRecord) -> None:
+    """Mark an in-progress game for the next periodic crash-safety snapshot."""
+    checkpoint_queue.mark_dirty(lobby.game_id, lobby)
+
+
+def _log_action(lobby: "LobbyRecord", action: str, player_index: Optional[int], payload: dict) -> None:
+    """Record one action-log entry; it reaches the log once the lobby is saved."""
+    lobby.action_seq += 1
+    lobby.pending_actions.append(LoggedAction(
+        game_id=lobby.game_id,
+        seq=lobby.action_seq,
+        action=action,
+        player_index=player_index,
+        payload=payload,
+    ))
+
+
+def _release_logged_actions(lobby: "LobbyRecord") -> None:
+    for entry in lobby.pending_actions:
+        action_log.append(entry)
+    lobby.pending_actions.clear()
+
+
+async def _save_lobby(lobby: "LobbyRecord") -> None:
+    """
+    Write the lobby back to the lobby store.
+
+    With a shared store another worker may have changed the game since it was
+    loaded; the request then fails with 409 and nothing it did is kept.
+    """
+    try:
+        await lobby_store.save(lobby)
+    except LobbyConflictError:
+        logger.info("LOBBY_CONFLICT game=%s store_version=%s", lobby.game_id, lobby.store_version)
+        lobby.pending_actions.clear()
+        # Queued writes may hold this stale copy; the winning worker queues its own.
+        discard_pending(lobby.game_id)
+        raise HTTPException(status_code=409, detail="Game was updated by another request; retry")
+    _release_logged_actions(lobby)
+
+
+def _next_action_rng(lobby: "LobbyRecord"):
+    """RNG for the action about to be logged, so replay draws the same numbers."""
+    if lobby.seed is None:
+        lobby.seed = new_seed()
+    return action_rng(lobby.seed, lobby.action_seq + 1)
+
+
+def _game_row(lobby: LobbyRecord, now: datetime) -> dict:
+    """Column values of the games row for a lobby."""
+    eng_state = lobby.engine_state
     winner_display_name = None
     winner_user_id = None
-    if state:
-        eng_state = dict_to_state(state)
-        if eng_state.winner_index is not None:
-            winner_color = eng_state.active_colors[eng_state.winner_index]
-            winner_player = next(
-                (p for p in lobby.players if p.color == winner_color), None
-            )
-            if winner_player:
-                winner_display_name = winner_player.display_name
-                winner_user_id = winner_player.user_id
+    if eng_state and eng_state.winner_index is not None:
+        winner_color = eng_state.active_colors[eng_state.winner_index]
+        winner_player = lobby.player_by_color(winner_color)
+        if winner_player:
+            winner_display_name = winner_player.display_name
+            winner_user_id = winner_player.user_id
 
-    result = await db.execute(
-        select(Game).where(Game.game_id == lobby.game_id)
-    )
-    record = result.scalar_one_or_none()
-    now = datetime.now(timezone.utc)
-    players = sorted(lobby.players, key=lambda player: player.player_index)
     persisted_status = "completed" if lobby.status == "finished" else lobby.status
 
     def user_id_at(index: int) -> Optional[int]:
-        return players[index].user_id if index < len(players) else None
+        player = lobby.player_by_index(index)
+        return player.user_id if player else None
 
     def display_name_at(index: int) -> Optional[str]:
-        return players[index].display_name if index < len(players) else None
-
-    if record is None:
-        record = Game(
-            game_id=lobby.game_id,
-            player_count=lobby.player_count,
-            status=persisted_status,
-            winner_display_name=winner_display_name,
-            winner_user_id=winner_user_id,
-            engine_state_json=json.dumps(lobby.engine_state) if lobby.engine_state else None,
-            created_at=lobby.created_at,
-            ended_at=now if persisted_status in ("completed", "aborted") else None,
-            player_one_user_id=user_id_at(0),
-            player_two_user_id=user_id_at(1),
-            player_three_user_id=user_id_at(2),
-            player_four_user_id=user_id_at(3),
-            player_one_display_name=display_name_at(0),
-            player_two_display_name=display_name_at(1),
-            player_three_display_name=display_name_at(2),
-            player_four_display_name=display_name_at(3),
-        )
-        db.add(record)
+        player = lobby.player_by_index(index)
+        return player.display_name if player else None
+
+    return {
+        "game_id": lobby.game_id,
+        "player_count": lobby.player_count,
+        "status": persisted_status,
+        "winner_display_name": winner_display_name,
+        "winner_user_id": winner_user_id,
+        "engine_state_json": json.dumps(state_to_dict(eng_state)) if eng_state else None,
+        "state_version": lobby.state_version,
+        "seats_json": json.dumps([
+            {**asdict(player), "resume_ready": player.player_id in lobby.resume_ready_set}
+            for player in lobby.players
+        ]),
+        "created_at": lobby.created_at,
+        "ended_at": now if persisted_status in ("completed", "aborted") else None,
+        "player_one_user_id": user_id_at(0),
+        "player_two_user_id": user_id_at(1),
+        "player_three_user_id": user_id_at(2),
+        "player_four_user_id": user_id_at(3),
+        "player_one_display_name": display_name_at(0),
+        "player_two_display_name": display_name_at(1),
+        "player_three_display_name": display_name_at(2),
+        "player_four_display_name": display_name_at(3),
+    }
+
+
+def _participant_rows(lobby: LobbyRecord) -> list[dict]:
+    """game_participants rows (one per seat) for a lobby."""
+    eng_state = lobby.engine_state
+    winner_color = None
+    if eng_state and eng_state.winner_index is not None:
+        winner_color = eng_state.active_colors[eng_state.winner_index]
+    return [
+        {
+            "game_id": lobby.game_id,
+            "player_index": player.player_index,
+            "user_id": player.user_id,
+            "display_name": player.display_name,
+            "color": player.color,
+            "is_winner": 1 if winner_color is not None and player.color == winner_color else 0,
+            "created_at": lobby.created_at,
+        }
+        for player in lobby.players
+    ]
+
+
+async def _upsert_games(lobbies: list[LobbyRecord], db: AsyncSession) -> None:
+    """
+    Stage games and game_participants rows for many lobbies without committing.
+
+    SQLite and PostgreSQL get one ``INSERT ... ON CONFLICT ... DO UPDATE`` per
+    batch and table; other dialects fall back to ORM merges and seat rewrites.
+    """
+    import app.models.game  # noqa: F401
+    from sqlalchemy import case, func
+    from sqlalchemy import delete as sql_delete
+    from app.models.game import Game, GameParticipant
+
+    now = datetime.now(timezone.utc)
+    # One row per game; ON CONFLICT cannot touch the same row twice in a statement.
+    unique_lobbies = list({lobby.game_id: lobby for lobby in lobbies}.values())
+    rows = [_game_row(lobby, now) for lobby in unique_lobbies]
+    if not rows:
+        return
+    seat_rows = [row for lobby in unique_lobbies for row in _participant_rows(lobby)]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
     else:
-        record.status = persisted_status
-        record.winner_display_name = winner_display_name
-        record.winner_user_id = winner_user_id
-        record.engine_state_json = json.dumps(lobby.engine_state) if lobby.engine_state else None
-        record.player_one_user_id = user_id_at(0)
-        record.player_two_user_id = user_id_at(1)
-        record.player_three_user_id = user_id_at(2)
-        record.player_four_user_id = user_id_at(3)
-        record.player_one_display_name = display_name_at(0)
-        record.player_two_display_name = display_name_at(1)
-        record.player_three_display_name = display_name_at(2)
-        record.player_four_display_name = display_name_at(3)
-        if persisted_status in ("completed", "aborted"):
-            record.ended_at = now
-        elif persisted_status in ("active", "paused", "waiting"):
-            record.ended_at = None
+        written = []
+        for row in rows:
+            existing = await db.get(Game, row["game_id"])
+            if existing is not None and existing.state_version > row["state_version"]:
+                continue
+            if existing is not None and existing.ended_at is not None and row["ended_at"] is not None:
+                row = {**row, "ended_at": existing.ended_at}
+            await db.merge(Game(**row))
+            written.append(row["game_id"])
+        await db.execute(sql_delete(GameParticipant).where(GameParticipant.game_id.in_(written)))
+        db.add_all(GameParticipant(**row) for row in seat_rows if row["game_id"] in written)
+        return
 
-    await db.commit()
+    # Each worker flushes its own copy of a lobby, so copies can arrive out of
+    # order; a row only takes copies at least as new as the one it holds (equal
+    # versions still write: joins and ready marks do not bump the version).
+    written = set()
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(Game).values(rows[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Game.game_id],
+            set_={
+                **{
+                    column: stmt.excluded[column]
+                    for column in rows[0]
+                    if column not in ("game_id", "created_at")
+                },
+                # A game ends once: re-saving a finished game (e.g. spilling it on
+                # eviction) keeps its end time; a reset clears it for the next game.
+                "ended_at": case(
+                    (stmt.excluded.ended_at.is_(None), None),
+                    else_=func.coalesce(Game.ended_at, stmt.excluded.ended_at),
+                ),
+            },
+            where=stmt.excluded.state_version >= Game.state_version,
+        ).returning(Game.game_id)
+        written.update((await db.execute(stmt)).scalars())
+    seat_rows = [row for row in seat_rows if row["game_id"] in written]
+
+    # Seats are only ever appended to a lobby, so upserting by (game_id, seat) is enough.
+    for start in range(0, len(seat_rows), UPSERT_BATCH_SIZE):
+        stmt = insert(GameParticipant).values(seat_rows[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GameParticipant.game_id, GameParticipant.player_index],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("user_id", "display_name", "color", "is_winner")
+            },
+        )
+        await db.execute(stmt)
+
+
+def _players_from_game_columns(record) -> list[PlayerRecord]:
+    """Seats of a started game from the per-seat columns (rows written before seats_json)."""
+    restored_state = json.loads(record.engine_state_json)
+    state_colors = restored_state.get("active_colors") or list(
+        ACTIVE_COLORS_BY_COUNT.get(
+            record.player_count,
+            ("red", "blue", "yellow", "green")[: record.player_count],
+        )
+    )
+    slots = [
+        (0, state_colors[0] if len(state_colors) > 0 else "red", record.player_one_display_name, record.player_one_user_id),
+        (1, state_colors[1] if len(state_colors) > 1 else "blue", record.player_two_display_name, record.player_two_user_id),
+        (2, state_colors[2] if len(state_colors) > 2 else "yellow", record.player_three_display_name, record.player_three_user_id),
+        (3, state_colors[3] if len(state_colors) > 3 else "green", record.player_four_display_name, record.player_four_user_id),
+    ]
+    return [
+        PlayerRecord(
+            player_id=_stable_player_id(record.game_id, player_index),
+            color=color,
+            player_index=player_index,
+            display_name=display_name or f"Player {player_index + 1}",
+            ready=True,
+            connected=False,
+            user_id=user_id,
+        )
+        for player_index, color, display_name, user_id in slots[: record.player_count]
+        if user_id is not None or display_name
+    ]
+
+
+def _restore_engine_from_log(lobby: LobbyRecord, actions: list[LoggedAction]) -> None:
+    """Bring a restored game's checkpoint up to date from its action log."""
+    bots = bot_seats(actions)
+    for index in bots:
+        player = lobby.player_by_index(index)
+        if player is not None:
+            player.is_bot = True
+            player.connected = True
+    # The action log is usually ahead of the last checkpoint; prefer replaying it.
+    replayed = None
+    try:
+        replayed = replay(actions)
+    except ReplayError as exc:
+        logger.warning("ACTION_REPLAY_FAILED game=%s error=%s", lobby.game_id, exc)
+    if replayed is not None:
+        lobby.engine_state = replayed
+        lobby.seed = last_seed(actions)
+        lobby.action_seq = actions[-1].seq
+    else:
+        # No usable log: rebase it on the checkpoint with a fresh seed.
+        lobby.seed = new_seed()
+        lobby.action_seq = actions[-1].seq if actions else 0
+        _log_action(lobby, ACTION_SNAPSHOT, None, {
+            "state": state_to_dict(lobby.engine_state),
+            "seed": lobby.seed,
+            "bots": bots,
+        })
 
 
 async def _restore_lobby_from_db(
@@ -180,6 +400,7 @@ async def _restore_lobby_from_db(
     from sqlalchemy import select
     from app.models.game import Game
 
+    started = time.perf_counter()
     own_session = False
     if db is None:
         from app.core.database import SessionLocal
@@ -193,38 +414,25 @@ async def _restore_lobby_from_db(
         if record is None:
             return None
 
-        if record.status not in ("active", "paused", "completed"):
+        if record.status not in ("waiting", "active", "paused", "completed"):
             return None
-
-        if not record.engine_state_json:
+        if record.status != "waiting" and not record.engine_state_json:
             return None
 
-        restored_state = json.loads(record.engine_state_json)
-        state_colors = restored_state.get("active_colors") or list(
-            ACTIVE_COLORS_BY_COUNT.get(
-                record.player_count,
-                ("red", "blue", "yellow", "green")[: record.player_count],
-            )
-        )
-        slots = [
-            (0, state_colors[0] if len(state_colors) > 0 else "red", record.player_one_display_name, record.player_one_user_id),
-            (1, state_colors[1] if len(state_colors) > 1 else "blue", record.player_two_display_name, record.player_two_user_id),
-            (2, state_colors[2] if len(state_colors) > 2 else "yellow", record.player_three_display_name, record.player_three_user_id),
-            (3, state_colors[3] if len(state_colors) > 3 else "green", record.player_four_display_name, record.player_four_user_id),
-        ]
-        players = [
-            PlayerRecord(
-                player_id=_stable_player_id(game_id, player_index),
-                color=color,
-                player_index=player_index,
-                display_name=display_name or f"Player {player_index + 1}",
-                ready=True,
-                connected=False,
-                user_id=user_id,
-            )
-            for player_index, color, display_name, user_id in slots[: record.player_count]
-            if user_id is not None or display_name
-        ]
+        if record.seats_json:
+            # Seats exactly as the lobby held them, so guests keep acting under their own ids.
+            seats = json.loads(record.seats_json)
+            # A paused game keeps the resume votes already cast.
+            resume_ready_set = {seat["player_id"] for seat in seats if seat.pop("resume_ready", False)}
+            players = [PlayerRecord(**seat) for seat in seats]
+            for player in players:
+                player.connected = player.is_bot
+        elif record.status != "waiting":
+            players = _players_from_game_columns(record)
+            resume_ready_set = set()
+        else:
+            # Rows written before seats were stored do not say who was ready.
+            return None
 
         restored_status = "finished" if record.status == "completed" else record.status
         lobby = LobbyRecord(
@@ -232,10 +440,26 @@ async def _restore_lobby_from_db(
             player_count=record.player_count,
             players=players,
             status=restored_status,
-            engine_state=restored_state,
+            engine_state=dict_to_state(json.loads(record.engine_state_json)) if restored_status != "waiting" else None,
             created_at=record.created_at,
+            resume_ready_set=resume_ready_set if restored_status == "paused" else set(),
+            state_version=record.state_version or 0,
         )
-        _lobbies[game_id] = lobby
+        actions = await load_actions(db, game_id)
+        if lobby.engine_state is None:
+            # Between games: the next start entry opens a fresh stretch of the log.
+            lobby.action_seq = actions[-1].seq if actions else 0
+        else:
+            _restore_engine_from_log(lobby, actions)
+        try:
+            await lobby_store.add(lobby)
+        except LobbyConflictError:
+            # Another worker restored it first.
+            return await lobby_store.get(game_id)
+        _release_logged_actions(lobby)
+        duration_ms = (time.perf_counter() - started) * 1000
+        recovery_stats.record(duration_ms)
+        logger.info("GAME_RESTORED game=%s status=%s ms=%.2f", game_id, restored_status, duration_ms)
         return lobby
     finally:
         if own_session:
@@ -257,6 +481,7 @@ def _lobby_to_schema(lobby: LobbyRecord) -> LobbyStateSchema:
                 display_name=p.display_name,
                 ready=p.ready,
                 connected=p.connected,
+                is_bot=p.is_bot,
             )
             for p in lobby.players
         ],
@@ -264,7 +489,30 @@ def _lobby_to_schema(lobby: LobbyRecord) -> LobbyStateSchema:
     )
 
 
-def _engine_state_to_schema(game_id: str, state: GameEngineState, lobby: LobbyRecord) -> GameState:
+def _engine_for(state: GameEngineState) -> GameEngine:
+    """Return the shared rules engine matching a live state's seating."""
+    return get_engine(state.player_count, state.active_colors)
+
+
+def _move_option_payloads(options: list[MoveOption]) -> list[dict]:
+    return [
+        {
+            "color": option.color,
+            "token_index": option.token_index,
+            "target_kind": option.kind.value,
+            "path_index": option.path_index,
+            "home_index": option.home_index,
+        }
+        for option in options
+    ]
+
+
+def _engine_state_to_schema(
+    game_id: str,
+    state: GameEngineState,
+    lobby: LobbyRecord,
+    move_options: Optional[list[MoveOption]] = None,
+) -> GameState:
     tokens = [
         TokenStateSchema(
             color=t.color,
@@ -275,30 +523,9 @@ def _engine_state_to_schema(game_id: str, state: GameEngineState, lobby: LobbyRe
         )
         for t in state.tokens
     ]
-    engine = GameEngine(player_count=state.player_count)
-    engine.active_colors = state.active_colors
-    engine.color_index = {c: i for i, c in enumerate(state.active_colors)}
-    valid_moves: list[dict] = []
-    for c, ti in engine.valid_moves(state, state.last_roll or 0):
-        token = next(
-            (t for t in state.tokens if t.color == c and t.token_index == ti),
-            None,
-        )
-        if not token:
-            continue
-        destination = engine.get_move_destination(state, token, state.last_roll or 0)
-        if not destination:
-            continue
-        kind, path_index, home_index = destination
-        valid_moves.append(
-            {
-                "color": c,
-                "token_index": ti,
-                "target_kind": kind.value,
-                "path_index": path_index,
-                "home_index": home_index,
-            }
-        )
+    if move_options is None:
+        move_options = _engine_for(state).move_options(state, state.last_roll or 0)
+    valid_moves = _move_option_payloads(move_options)
     if state.winner_index is not None:
         status = "finished"
     elif lobby.status == "paused":
@@ -312,6 +539,7 @@ def _engine_state_to_schema(game_id: str, state: GameEngineState, lobby: LobbyRe
             display_name=p.display_name,
             ready=p.ready,
             connected=p.connected,
+            is_bot=p.is_bot,
         )
         for p in lobby.players
     ]
@@ -335,11 +563,62 @@ def _engine_state_to_schema(game_id: str, state: GameEngineState, lobby: LobbyRe
         resume_ready_player_indices=resume_ready_player_indices,
         resume_ready_count=len(resume_ready_player_indices),
         resume_needed=lobby.player_count if lobby.status == "paused" else 0,
+        version=lobby.state_version,
     )
 
 
+# Snapshot events that delta-protocol clients receive as diffs.
+DELTA_EVENT_TYPES = ("game_state_updated", "game_finished")
+
+
+def _diff_game_snapshots(previous: dict, current: dict) -> dict:
+    """Top-level fields that changed plus only the tokens that moved."""
+    changes = {
+        key: value
+        for key, value in current.items()
+        if key not in ("tokens", "version") and previous.get(key) != value
+    }
+    previous_tokens = previous.get("tokens") or []
+    current_tokens = current["tokens"]
+    if len(previous_tokens) != len(current_tokens):
+        changes["tokens"] = current_tokens
+    else:
+        moved = [token for token, old in zip(current_tokens, previous_tokens) if token != old]
+        if moved:
+            changes["tokens"] = moved
+    return changes
+
+
+async def _broadcast_game(lobby: LobbyRecord, message: dict, game: GameState) -> None:
+    """
+    Broadcast a new game snapshot under the next state version.
+
+    Default clients get the full ``game``; clients on the delta protocol get
+    ``delta`` with ``base_version`` so they can detect gaps and resync.
+    The lobby is saved to the store before anything is sent.
+    """
+    lobby.state_version += 1
+    game.version = lobby.state_version
+    snapshot = game.model_dump()
+    previous = lobby.last_game_snapshot
+    lobby.last_game_snapshot = snapshot
+    await _save_lobby(lobby)
+
+    full_message = {**message, "version": lobby.state_version, "game": snapshot}
+    delta_message = None
+    if previous is not None and message["type"] in DELTA_EVENT_TYPES:
+        delta_message = {
+            **message,
+            "version": lobby.state_version,
+            "base_version": previous["version"],
+            "delta": _diff_game_snapshots(previous, snapshot),
+        }
+    await manager.broadcast(lobby.game_id, full_message, delta_message=delta_message)
+    _schedule_bot_turn(lobby)
+
+
 async def _get_lobby(game_id: str, db: Optional[AsyncSession] = None) -> LobbyRecord:
-    lobby = _lobbies.get(game_id)
+    lobby = await lobby_store.get(game_id)
     if lobby is not None:
         return lobby
     restored = await _restore_lobby_from_db(game_id, db)
@@ -351,24 +630,22 @@ async def _get_lobby(game_id: str, db: Optional[AsyncSession] = None) -> LobbyRe
 def _sync_player_identity_from_auth(
     lobby: LobbyRecord,
     player_id: Optional[str],
-    authorization: str,
+    user_id: Optional[int],
 ) -> Optional[PlayerRecord]:
     """Resolve a player from the authenticated user when available."""
-    user_id = _optional_user_id(authorization)
     if user_id is None:
         return None
-    record = next((p for p in lobby.players if p.user_id == user_id), None)
-    return record
+    return lobby.player_by_user(user_id)
 
 
 def _require_active_player(
     lobby: LobbyRecord,
     player_id: Optional[str],
-    authorization: str = "",
+    user_id: Optional[int] = None,
 ) -> PlayerRecord:
     """Validate X-Player-ID header and return the matching PlayerRecord."""
-    record_by_id = next((p for p in lobby.players if p.player_id == player_id), None) if player_id else None
-    record_by_auth = _sync_player_identity_from_auth(lobby, player_id, authorization)
+    record_by_id = lobby.player_by_id(player_id)
+    record_by_auth = _sync_player_identity_from_auth(lobby, player_id, user_id)
 
     # Live gameplay should trust the explicit seat identity first.
     # Auth is a recovery fallback for reconnect/reclaim flows when the
@@ -386,17 +663,17 @@ def _check_turn(
     lobby: LobbyRecord,
     player_id: Optional[str],
     state: GameEngineState,
-    authorization: str = "",
+    user_id: Optional[int] = None,
 ) -> None:
     """Raise 403 if it is not this player's turn."""
-    record = _require_active_player(lobby, player_id, authorization)
+    record = _require_active_player(lobby, player_id, user_id)
     current_color = state.active_colors[state.current_player_index]
     if record.color != current_color:
         logger.warning(
             "TURN_MISMATCH game=%s x_player_id=%s auth_user_id=%s resolved_player_id=%s resolved_color=%s current_color=%s current_player_index=%s players=%s",
             lobby.game_id,
             player_id,
-            _optional_user_id(authorization),
+            user_id,
             record.player_id,
             record.color,
             current_color,
@@ -422,7 +699,7 @@ def _check_turn(
 @router.post("", response_model=JoinResponse)
 async def create_game(
     payload: GameCreate,
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
 ) -> JoinResponse:
     """Create a new lobby. Returns creator's player_id and assigned color."""
     player_count = min(4, max(2, payload.player_count))
@@ -434,7 +711,7 @@ async def create_game(
         color=active_colors[0],
         player_index=0,
         display_name=payload.display_name,
-        user_id=_optional_user_id(authorization),
+        user_id=user_id,
     )
     lobby = LobbyRecord(
         game_id=game_id,
@@ -442,7 +719,7 @@ async def create_game(
         players=[creator],
         status="waiting",
     )
-    _lobbies[game_id] = lobby
+    await lobby_store.add(lobby)
     return JoinResponse(
         player_id=player_id,
         color=creator.color,
@@ -455,20 +732,16 @@ async def create_game(
 async def join_game(
     game_id: str,
     payload: JoinRequest,
-    authorization: str = Header(default=""),
-    db: AsyncSession = Depends(get_db),
+    authenticated_user_id: Optional[int] = Depends(_auth_user_id),
 ) -> JoinResponse:
     """Join an existing lobby. Returns this player's player_id and assigned color."""
     lobby = await _get_lobby(game_id)
-    authenticated_user_id = _optional_user_id(authorization)
 
     if authenticated_user_id is not None:
-        existing_record = next(
-            (player for player in lobby.players if player.user_id == authenticated_user_id),
-            None,
-        )
+        existing_record = lobby.player_by_user(authenticated_user_id)
         if existing_record is not None:
             existing_record.display_name = payload.display_name or existing_record.display_name
+            await _save_lobby(lobby)
             return JoinResponse(
                 player_id=existing_record.player_id,
                 color=existing_record.color,
@@ -482,10 +755,11 @@ async def join_game(
         unbound_players = [player for player in lobby.players if player.user_id is None]
         if len(unbound_players) == 1:
             reclaimed = unbound_players[0]
-            reclaimed.user_id = authenticated_user_id
+            _bind_player_user(lobby, reclaimed, authenticated_user_id)
             if payload.display_name and payload.display_name != "Player":
                 reclaimed.display_name = payload.display_name
-            await _persist_game(lobby, db)
+            await _save_lobby(lobby)
+            _schedule_persist(lobby)
             return JoinResponse(
                 player_id=reclaimed.player_id,
                 color=reclaimed.color,
@@ -507,7 +781,8 @@ async def join_game(
         display_name=payload.display_name,
         user_id=authenticated_user_id,
     )
-    lobby.players.append(record)
+    lobby.add_player(record)
+    await _save_lobby(lobby)
     await manager.broadcast(game_id, {
         "type": "player_joined",
         "lobby": _lobby_to_schema(lobby).model_dump(),
@@ -524,15 +799,24 @@ async def join_game(
 async def mark_ready(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> LobbyStateSchema:
     """Mark a player as ready. When all players ready, game transitions to active."""
+    return await game_actors.submit(game_id, lambda: _mark_ready(game_id, x_player_id, user_id, db))
+
+
+async def _mark_ready(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+    db: AsyncSession,
+) -> LobbyStateSchema:
     lobby = await _get_lobby(game_id, db)
     if lobby.status != "waiting":
         raise HTTPException(status_code=400, detail="Game already started")
-    record = _require_active_player(lobby, x_player_id, authorization)
-    _bind_player_user(lobby, record, authorization)
+    record = _require_active_player(lobby, x_player_id, user_id)
+    _bind_player_user(lobby, record, user_id)
     record.ready = True
 
     all_ready = (
@@ -541,17 +825,9 @@ async def mark_ready(
     )
 
     if all_ready:
-        engine = GameEngine(player_count=lobby.player_count)
-        state = engine.new_game()
-        lobby.engine_state = state_to_dict(state)
-        lobby.status = "active"
-        await _persist_game(lobby, db)
-        game_schema = _engine_state_to_schema(game_id, state, lobby)
-        await manager.broadcast(game_id, {
-            "type": "game_started",
-            "game": game_schema.model_dump(),
-        })
+        await _start_game(lobby)
     else:
+        await _save_lobby(lobby)
         await manager.broadcast(game_id, {
             "type": "player_ready",
             "player_index": record.player_index,
@@ -561,33 +837,136 @@ async def mark_ready(
     return _lobby_to_schema(lobby)
 
 
+async def _start_game(lobby: LobbyRecord) -> None:
+    """Deal a new game once every seat is taken and ready, and announce it."""
+    state = get_engine(lobby.player_count).new_game()
+    lobby.engine_state = state
+    lobby.status = "active"
+    lobby.seed = new_seed()
+    _log_action(lobby, ACTION_START, None, {
+        "seed": lobby.seed,
+        "player_count": lobby.player_count,
+        "active_colors": list(state.active_colors),
+        "bots": [player.player_index for player in lobby.players if player.is_bot],
+    })
+    _schedule_persist(lobby)
+    game_schema = _engine_state_to_schema(lobby.game_id, state, lobby)
+    await _broadcast_game(lobby, {"type": "game_started"}, game_schema)
+
+
+@router.post("/{game_id}/bots", response_model=LobbyStateSchema)
+async def add_bots(
+    game_id: str,
+    payload: AddBotsRequest,
+    x_player_id: Optional[str] = Header(default=None),
+    user_id: Optional[int] = Depends(_auth_user_id),
+) -> LobbyStateSchema:
+    """Seat bot players in empty slots (host only). Bots are ready at once; a full lobby starts."""
+    return await game_actors.submit(game_id, lambda: _add_bots(game_id, payload, x_player_id, user_id))
+
+
+async def _add_bots(
+    game_id: str,
+    payload: AddBotsRequest,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+) -> LobbyStateSchema:
+    lobby = await _get_lobby(game_id)
+    record = _require_active_player(lobby, x_player_id, user_id)
+    if record.player_index != 0:
+        raise HTTPException(status_code=403, detail="Only the host can add bots")
+    if lobby.status != "waiting":
+        raise HTTPException(status_code=400, detail="Game already started")
+    free = lobby.player_count - len(lobby.players)
+    count = free if payload.count is None else min(max(0, payload.count), free)
+    if count == 0:
+        raise HTTPException(status_code=400, detail="Game is full")
+
+    active_colors = list(ACTIVE_COLORS_BY_COUNT.get(lobby.player_count, ("red", "blue", "yellow", "green")[:lobby.player_count]))
+    for _ in range(count):
+        player_index = len(lobby.players)
+        lobby.add_player(PlayerRecord(
+            player_id=f"bot:{uuid.uuid4()}",
+            color=active_colors[player_index],
+            player_index=player_index,
+            display_name=f"Bot {player_index + 1}",
+            ready=True,
+            connected=True,
+            is_bot=True,
+        ))
+
+    if all(p.ready for p in lobby.players) and len(lobby.players) == lobby.player_count:
+        await _start_game(lobby)
+    else:
+        await _save_lobby(lobby)
+        await manager.broadcast(game_id, {
+            "type": "player_joined",
+            "lobby": _lobby_to_schema(lobby).model_dump(),
+        })
+    return _lobby_to_schema(lobby)
+
+
+async def _set_connected(game_id: str, player_id: str, connected: bool) -> Optional[LobbyRecord]:
+    """Flip a player's connected flag, reloading and retrying if the lobby changed meanwhile."""
+    for _ in range(5):
+        lobby = await lobby_store.get(game_id)
+        if lobby is None:
+            return None
+        record = lobby.player_by_id(player_id)
+        if record is None:
+            return lobby
+        record.connected = connected
+        try:
+            await lobby_store.save(lobby)
+        except LobbyConflictError:
+            continue
+        return lobby
+    logger.warning("WS_CONNECTED_FLAG_CONFLICT game=%s player_id=%s", game_id, player_id)
+    return None
+
+
+def _sync_message(lobby: LobbyRecord) -> dict:
+    game_data = None
+    if lobby.engine_state is not None:
+        game_data = _engine_state_to_schema(lobby.game_id, lobby.engine_state, lobby).model_dump()
+    return {
+        "type": "sync",
+        "version": lobby.state_version,
+        "lobby": _lobby_to_schema(lobby).model_dump(),
+        "game": game_data,
+    }
+
+
 @router.websocket("/{game_id}/ws")
-async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str) -> None:
-    """WebSocket connection for real-time game updates."""
+async def websocket_endpoint(
+    websocket: WebSocket,
+    game_id: str,
+    player_id: str,
+    protocol: str = "full",
+) -> None:
+    """
+    WebSocket connection for real-time game updates.
+
+    ``protocol=delta`` opts into versioned diffs for state updates; such
+    clients send ``{"type": "resync"}`` when they detect a version gap.
+    """
     lobby = await _get_lobby(game_id)
     if not lobby:
         await websocket.close(code=4004)
         return
 
-    record = next((p for p in lobby.players if p.player_id == player_id), None)
+    record = lobby.player_by_id(player_id)
     if not record:
         await websocket.close(code=4003)
         return
 
-    await manager.connect(game_id, player_id, websocket)
-    record.connected = True
+    await manager.connect(game_id, player_id, websocket, delta=protocol == "delta")
+    lobby = await _set_connected(game_id, player_id, True) or lobby
 
     # Send current state on connect
-    game_data = None
-    if lobby.engine_state is not None:
-        state = dict_to_state(lobby.engine_state)
-        game_data = _engine_state_to_schema(game_id, state, lobby).model_dump()
-
-    await manager.send_to(game_id, player_id, {
-        "type": "sync",
-        "lobby": _lobby_to_schema(lobby).model_dump(),
-        "game": game_data,
-    })
+    await manager.send_to(game_id, player_id, _sync_message(lobby))
+    # A bot may be due to move in a game restored after a restart.
+    _schedule_bot_turn(lobby)
 
     try:
         while True:
@@ -604,13 +983,16 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str)
                         "type": "opponent_rolling_stop",
                         "player_index": record.player_index,
                     })
+                elif msg.get("type") == "resync":
+                    lobby = await lobby_store.get(game_id) or lobby
+                    await manager.send_to(game_id, player_id, _sync_message(lobby))
             except (json.JSONDecodeError, KeyError):
                 pass
     except WebSocketDisconnect:
         pass
     finally:
-        record.connected = False
         manager.disconnect(game_id, player_id)
+        lobby = await _set_connected(game_id, player_id, False) or lobby
         await manager.broadcast(game_id, {
             "type": "player_disconnected",
             "player_index": record.player_index,
@@ -622,28 +1004,77 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str)
 async def get_game(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> GameState:
     """Fetch game state by ID."""
     lobby = await _get_lobby(game_id, db)
-    _sync_player_identity_from_auth(lobby, x_player_id, authorization)
+    _sync_player_identity_from_auth(lobby, x_player_id, user_id)
     if lobby.status == "waiting" or lobby.engine_state is None:
         raise HTTPException(status_code=400, detail="Game has not started yet")
-    state = dict_to_state(lobby.engine_state)
+    state = lobby.engine_state
     return _engine_state_to_schema(game_id, state, lobby)
 
 
+@router.get("/{game_id}/odds", response_model=OddsResponse)
+async def get_odds(game_id: str, db: AsyncSession = Depends(get_db)) -> OddsResponse:
+    """Each color's estimated chance of winning from the current position (open to spectators)."""
+    lobby = await _get_lobby(game_id, db)
+    if lobby.status == "waiting" or lobby.engine_state is None:
+        raise HTTPException(status_code=400, detail="Game has not started yet")
+    state = lobby.engine_state
+    # Read everything before awaiting: the game may move on while rollouts run.
+    version = lobby.state_version
+    position_hash = state.zobrist
+    colors = tuple(state.active_colors)
+    rollouts, cached, elapsed_ms = 0, False, 0.0
+    if state.winner_index is not None:
+        probabilities = tuple(1.0 if seat == state.winner_index else 0.0 for seat in range(len(colors)))
+    else:
+        request = OddsRequest(
+            active_colors=colors,
+            positions=bytes(state.positions),
+            seat=state.current_player_index,
+            roll=state.last_roll if state.has_rolled else None,
+            seed=position_hash,
+            chance_rate=settings.odds_chance_rate,
+            time_budget=settings.odds_time_budget_seconds,
+            max_rollouts=settings.odds_max_rollouts,
+        )
+        try:
+            estimate, cached = await odds_service.estimate(position_hash, request)
+        except OddsBusy:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many odds estimates in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        probabilities = estimate.probabilities
+        rollouts, elapsed_ms = estimate.rollouts, estimate.elapsed_ms
+    return OddsResponse(
+        game_id=game_id,
+        version=version,
+        position_hash=f"{position_hash:016x}",
+        odds=[
+            ColorOddsSchema(player_index=seat, color=color, win_probability=round(probabilities[seat], 4))
+            for seat, color in enumerate(colors)
+        ],
+        rollouts=rollouts,
+        cached=cached,
+        elapsed_ms=elapsed_ms,
+    )
+
+
 @router.get("/{game_id}/lobby", response_model=LobbyStateSchema)
 async def get_lobby_state(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> LobbyStateSchema:
     """Fetch lobby metadata even when the game has not started yet."""
     lobby = await _get_lobby(game_id, db)
-    _sync_player_identity_from_auth(lobby, x_player_id, authorization)
+    _sync_player_identity_from_auth(lobby, x_player_id, user_id)
     return _lobby_to_schema(lobby)
 
 
@@ -651,70 +1082,59 @@ async def get_lobby_state(
 async def roll_dice(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
 ) -> RollResponse:
     """Roll the dice for the current player."""
+    return await game_actors.submit(game_id, lambda: _roll_dice(game_id, x_player_id, user_id))
+
+
+async def _roll_dice(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+) -> RollResponse:
     lobby = await _get_lobby(game_id)
     if lobby.status == "finished":
         raise HTTPException(status_code=400, detail="Game is finished")
     if lobby.status != "active" or lobby.engine_state is None:
         raise HTTPException(status_code=400, detail="Game has not started yet")
-    state = dict_to_state(lobby.engine_state)
+    state = lobby.engine_state
     logger.info(
         "ROLL_ATTEMPT game=%s x_player_id=%s auth_user_id=%s current_color=%s current_player_index=%s has_rolled=%s",
         game_id,
         x_player_id,
-        _optional_user_id(authorization),
+        user_id,
         state.active_colors[state.current_player_index],
         state.current_player_index,
         state.has_rolled,
     )
-    _check_turn(lobby, x_player_id, state, authorization)
-    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, authorization), authorization)
+    _check_turn(lobby, x_player_id, state, user_id)
+    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, user_id), user_id)
 
-    engine = GameEngine(player_count=state.player_count)
-    engine.active_colors = state.active_colors
-    engine.color_index = {c: i for i, c in enumerate(state.active_colors)}
+    engine = _engine_for(state)
 
     if state.has_rolled and engine.valid_moves(state, state.last_roll or 0):
         raise HTTPException(status_code=400, detail="You must move a token before rolling again")
 
-    roll = engine.roll_dice()
+    roll = engine.roll_dice(_next_action_rng(lobby))
+    _log_action(lobby, ACTION_ROLL, state.current_player_index, {"roll": roll})
     state.last_roll = roll
     state.has_rolled = True
-    valid_moves = engine.valid_moves(state, roll)
-    lobby.engine_state = state_to_dict(state)
-
-    valid_move_payloads: list[dict] = []
-    for c, ti in valid_moves:
-        token = next((t for t in state.tokens if t.color == c and t.token_index == ti), None)
-        if not token:
-            continue
-        destination = engine.get_move_destination(state, token, roll)
-        if not destination:
-            continue
-        kind, path_index, home_index = destination
-        valid_move_payloads.append({
-            "color": c,
-            "token_index": ti,
-            "target_kind": kind.value,
-            "path_index": path_index,
-            "home_index": home_index,
-        })
+    move_options = engine.move_options(state, roll)
 
     roll_response = RollResponse(
         roll=roll,
-        valid_moves=valid_move_payloads,
-        message=f"Rolled {roll}. Move a token or pass." if not valid_moves else f"Rolled {roll}.",
+        valid_moves=_move_option_payloads(move_options),
+        message=f"Rolled {roll}. Move a token or pass." if not move_options else f"Rolled {roll}.",
     )
 
-    game_schema = _engine_state_to_schema(game_id, state, lobby)
-    await manager.broadcast(game_id, {
+    game_schema = _engine_state_to_schema(game_id, state, lobby, move_options)
+    _schedule_checkpoint(lobby)
+    await _broadcast_game(lobby, {
         "type": "game_state_updated",
         "event": "rolled",
         "player_index": state.current_player_index,
-        "game": game_schema.model_dump(),
-    })
+    }, game_schema)
 
     return roll_response
 
@@ -724,63 +1144,65 @@ async def move_token(
     game_id: str,
     payload: MoveRequest,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
 ) -> GameState:
     """Move a token. Returns updated game state."""
+    return await game_actors.submit(game_id, lambda: _move_token(game_id, payload, x_player_id, user_id))
+
+
+async def _move_token(
+    game_id: str,
+    payload: MoveRequest,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+) -> GameState:
     lobby = await _get_lobby(game_id)
     if lobby.status == "finished":
         raise HTTPException(status_code=400, detail="Game is finished")
     if lobby.status != "active" or lobby.engine_state is None:
         raise HTTPException(status_code=400, detail="Game has not started yet")
-    state = dict_to_state(lobby.engine_state)
-    _check_turn(lobby, x_player_id, state, authorization)
-    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, authorization), authorization)
+    state = lobby.engine_state
+    _check_turn(lobby, x_player_id, state, user_id)
+    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, user_id), user_id)
 
-    engine = GameEngine(player_count=state.player_count)
-    engine.active_colors = state.active_colors
-    engine.color_index = {c: i for i, c in enumerate(state.active_colors)}
+    engine = _engine_for(state)
 
     roll = state.last_roll
     if roll is None or not state.has_rolled:
         raise HTTPException(status_code=400, detail="Roll the dice first")
 
-    valid_moves = engine.valid_moves(state, roll)
-    if (payload.color, payload.token_index) not in valid_moves:
-        raise HTTPException(status_code=400, detail="Invalid move")
-
-    token = next(
-        (t for t in state.tokens if t.color == payload.color and t.token_index == payload.token_index),
+    option = next(
+        (
+            o
+            for o in engine.move_options(state, roll)
+            if o.color == payload.color and o.token_index == payload.token_index
+        ),
         None,
     )
-    if not token:
-        raise HTTPException(status_code=400, detail="Invalid token selection")
-
-    destination = engine.get_move_destination(state, token, roll)
-    if not destination:
+    if option is None:
         raise HTTPException(status_code=400, detail="Invalid move")
 
-    expected_kind, expected_path, expected_home = destination
-    if payload.target_kind != expected_kind.value:
+    if payload.target_kind != option.kind.value:
         raise HTTPException(status_code=400, detail=f"Move must be exactly {roll} spaces for this token")
-    if expected_kind.value == "path" and payload.path_index != expected_path:
+    if option.kind.value == "path" and payload.path_index != option.path_index:
         raise HTTPException(status_code=400, detail=f"Move must be exactly {roll} spaces for this token")
-    if expected_kind.value == "home" and payload.home_index != expected_home:
+    if option.kind.value == "home" and payload.home_index != option.home_index:
         raise HTTPException(status_code=400, detail=f"Move must be exactly {roll} spaces for this token")
 
+    mover_index = state.current_player_index
     result = engine.apply_move(state, payload.color, payload.token_index, roll)
     if not result.moved:
         raise HTTPException(status_code=400, detail=result.message)
+    _log_action(lobby, ACTION_MOVE, mover_index, {
+        "color": payload.color,
+        "token_index": payload.token_index,
+    })
 
-    if not result.extra_turn:
-        advance_turn(state)
-    else:
-        state.last_roll = None
-        state.has_rolled = False
+    end_move_turn(state, result)
 
     if state.winner_index is not None:
         lobby.status = "finished"
 
-    lobby.engine_state = state_to_dict(state)
     out = _engine_state_to_schema(game_id, state, lobby)
     out.message = result.message
 
@@ -789,16 +1211,16 @@ async def move_token(
         "type": event_type,
         "event": "moved",
         "player_index": state.current_player_index,
-        "game": out.model_dump(),
     }
     if lobby.status == "finished" and state.winner_index is not None:
         broadcast_msg["winner_index"] = state.winner_index
         broadcast_msg["winner_color"] = state.active_colors[state.winner_index]
-    await manager.broadcast(game_id, broadcast_msg)
+    await _broadcast_game(lobby, broadcast_msg, out)
 
     if lobby.status == "finished":
-        async with __import__("app.core.database", fromlist=["SessionLocal"]).SessionLocal() as db:
-            await _persist_game(lobby, db)
+        _schedule_persist(lobby)
+    else:
+        _schedule_checkpoint(lobby)
 
     return out
 
@@ -807,21 +1229,27 @@ async def move_token(
 async def pass_turn(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
 ) -> GameState:
     """Pass turn when no valid move available."""
+    return await game_actors.submit(game_id, lambda: _pass_turn(game_id, x_player_id, user_id))
+
+
+async def _pass_turn(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+) -> GameState:
     lobby = await _get_lobby(game_id)
     if lobby.status == "finished":
         raise HTTPException(status_code=400, detail="Game is finished")
     if lobby.status != "active" or lobby.engine_state is None:
         raise HTTPException(status_code=400, detail="Game has not started yet")
-    state = dict_to_state(lobby.engine_state)
-    _check_turn(lobby, x_player_id, state, authorization)
-    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, authorization), authorization)
+    state = lobby.engine_state
+    _check_turn(lobby, x_player_id, state, user_id)
+    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, user_id), user_id)
 
-    engine = GameEngine(player_count=state.player_count)
-    engine.active_colors = state.active_colors
-    engine.color_index = {c: i for i, c in enumerate(state.active_colors)}
+    engine = _engine_for(state)
 
     roll = state.last_roll
     if roll is None or not state.has_rolled:
@@ -829,18 +1257,16 @@ async def pass_turn(
     if engine.valid_moves(state, roll):
         raise HTTPException(status_code=400, detail="You have valid moves; cannot pass")
 
+    _log_action(lobby, ACTION_PASS, state.current_player_index, {})
     advance_turn(state)
-    state.last_roll = None
-    state.has_rolled = False
-    lobby.engine_state = state_to_dict(state)
 
     out = _engine_state_to_schema(game_id, state, lobby)
-    await manager.broadcast(game_id, {
+    _schedule_checkpoint(lobby)
+    await _broadcast_game(lobby, {
         "type": "game_state_updated",
         "event": "passed",
         "player_index": state.current_player_index,
-        "game": out.model_dump(),
-    })
+    }, out)
     return out
 
 
@@ -848,33 +1274,38 @@ async def pass_turn(
 async def play_chance(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
 ) -> GameState:
     """Use chance instead of rolling the dice for this turn."""
+    return await game_actors.submit(game_id, lambda: _play_chance(game_id, x_player_id, user_id))
+
+
+async def _play_chance(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+) -> GameState:
     lobby = await _get_lobby(game_id)
     if lobby.status == "finished":
         raise HTTPException(status_code=400, detail="Game is finished")
     if lobby.status != "active" or lobby.engine_state is None:
         raise HTTPException(status_code=400, detail="Game has not started yet")
-    state = dict_to_state(lobby.engine_state)
-    _check_turn(lobby, x_player_id, state, authorization)
-    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, authorization), authorization)
+    state = lobby.engine_state
+    _check_turn(lobby, x_player_id, state, user_id)
+    _bind_player_user(lobby, _require_active_player(lobby, x_player_id, user_id), user_id)
 
-    engine = GameEngine(player_count=state.player_count)
-    engine.active_colors = state.active_colors
-    engine.color_index = {c: i for i, c in enumerate(state.active_colors)}
+    engine = _engine_for(state)
 
     if state.has_rolled:
         raise HTTPException(status_code=400, detail="Cannot use chance after rolling")
 
-    message, turns_to_advance = engine.apply_random_chance(state)
-    if state.winner_index is None:
-        for _ in range(max(1, turns_to_advance)):
-            advance_turn(state)
-    else:
+    option_id = engine.draw_chance(_next_action_rng(lobby))
+    _log_action(lobby, ACTION_CHANCE, state.current_player_index, {"option_id": option_id})
+    message, turns_to_advance = engine.apply_chance(state, option_id)
+    end_chance_turn(state, turns_to_advance)
+    if state.winner_index is not None:
         lobby.status = "finished"
 
-    lobby.engine_state = state_to_dict(state)
     out = _engine_state_to_schema(game_id, state, lobby)
     out.message = message
 
@@ -883,20 +1314,117 @@ async def play_chance(
         "type": event_type,
         "event": "chance",
         "player_index": state.current_player_index,
-        "game": out.model_dump(),
     }
     if lobby.status == "finished" and state.winner_index is not None:
         broadcast_msg["winner_index"] = state.winner_index
         broadcast_msg["winner_color"] = state.active_colors[state.winner_index]
-    await manager.broadcast(game_id, broadcast_msg)
+    await _broadcast_game(lobby, broadcast_msg, out)
 
     if lobby.status == "finished":
-        async with __import__("app.core.database", fromlist=["SessionLocal"]).SessionLocal() as db:
-            await _persist_game(lobby, db)
+        _schedule_persist(lobby)
+    else:
+        _schedule_checkpoint(lobby)
 
     return out
 
 
+# ---------------------------------------------------------------------------
+# Bot players
+# ---------------------------------------------------------------------------
+
+def _current_bot(lobby: LobbyRecord) -> Optional[PlayerRecord]:
+    """The bot seat whose turn it is in an active game, if any."""
+    state = lobby.engine_state
+    if lobby.status != "active" or state is None or state.winner_index is not None:
+        return None
+    player = lobby.player_by_color(state.active_colors[state.current_player_index])
+    return player if player is not None and player.is_bot else None
+
+
+def _schedule_bot_turn(lobby: LobbyRecord) -> None:
+    """Start the current bot's next action in the background, if a bot is to play."""
+    bot = _current_bot(lobby)
+    if bot is None:
+        return
+    game_id, player_id, version = lobby.game_id, bot.player_id, lobby.state_version
+    bot_turns.schedule(game_id, version, lambda: _bot_turn(game_id, player_id, version))
+
+
+async def _bot_turn(game_id: str, player_id: str, version: int) -> None:
+    """
+    Decide one bot action outside the game's actor, then apply it through the actor.
+
+    Humans' commands for the game (pause, reset) are not held up while the
+    bot thinks; the action is dropped if the game moved on meanwhile.
+    """
+    await asyncio.sleep(settings.bot_move_delay_seconds)
+    lobby = await lobby_store.get(game_id)
+    if lobby is None or lobby.state_version != version or _current_bot(lobby) is None:
+        return
+    state = lobby.engine_state
+    roll = state.last_roll if state.has_rolled else None
+    if roll is not None and not _engine_for(state).move_options(state, roll):
+        decision = BotDecision(action="pass")
+    else:
+        decision = await bot_pool.decide(SearchRequest(
+            active_colors=tuple(state.active_colors),
+            positions=bytes(state.positions),
+            seat=state.current_player_index,
+            roll=roll,
+            allow_chance=settings.bot_use_chance,
+            time_budget=settings.bot_think_seconds,
+            max_depth=settings.bot_max_depth,
+        ))
+    logger.info(
+        "BOT_DECISION game=%s player_id=%s action=%s token=%s depth=%s nodes=%s ms=%.1f",
+        game_id,
+        player_id,
+        decision.action,
+        decision.token_index,
+        decision.depth,
+        decision.nodes,
+        decision.elapsed_ms,
+    )
+    await game_actors.submit(game_id, lambda: _bot_act(game_id, player_id, version, decision))
+
+
+async def _bot_act(game_id: str, player_id: str, version: int, decision: BotDecision) -> None:
+    """Apply a bot decision with the same commands a client would send."""
+    lobby = await _get_lobby(game_id)
+    if lobby.state_version != version:
+        return
+    if decision.action == "roll":
+        await _roll_dice(game_id, player_id, None)
+    elif decision.action == "chance":
+        await _play_chance(game_id, player_id, None)
+    elif decision.action == "pass":
+        await _pass_turn(game_id, player_id, None)
+    else:
+        state = lobby.engine_state
+        options = _engine_for(state).move_options(state, state.last_roll or 0)
+        option = next((o for o in options if o.token_index == decision.token_index), None)
+        if option is None:
+            # The search chose a token that cannot move now; play anything legal.
+            logger.warning(
+                "BOT_MOVE_STALE game=%s player_id=%s token=%s options=%s",
+                game_id,
+                player_id,
+                decision.token_index,
+                len(options),
+            )
+            if not options:
+                await _pass_turn(game_id, player_id, None)
+                return
+            option = options[0]
+        await _move_token(game_id, MoveRequest(
+            color=option.color,
+            token_index=option.token_index,
+            target_kind=option.kind.value,
+            path_index=option.path_index,
+            home_index=option.home_index,
+        ), player_id, None)
+
+
 # ---------------------------------------------------------------------------
 # Pause / Reset
 # ---------------------------------------------------------------------------
@@ -905,25 +1433,35 @@ async def play_chance(
 async def pause_game(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> GameState:
     """Pause an active game and persist its state."""
+    return await game_actors.submit(game_id, lambda: _pause_game(game_id, x_player_id, user_id, db))
+
+
+async def _pause_game(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+    db: AsyncSession,
+) -> GameState:
     lobby = await _get_lobby(game_id, db)
-    record = _require_active_player(lobby, x_player_id, authorization)
-    _bind_player_user(lobby, record, authorization)
+    record = _require_active_player(lobby, x_player_id, user_id)
+    _bind_player_user(lobby, record, user_id)
     if lobby.status != "active":
         raise HTTPException(status_code=400, detail="Game is not active")
     if lobby.engine_state is None:
         raise HTTPException(status_code=400, detail="Game has not started yet")
 
     lobby.status = "paused"
-    lobby.resume_ready_set = set()  # clear any stale votes
-    await _persist_game(lobby, db)
+    # Clear any stale votes; bots are always ready to resume.
+    lobby.resume_ready_set = {p.player_id for p in lobby.players if p.is_bot}
+    _schedule_persist(lobby)
 
-    state = dict_to_state(lobby.engine_state)
+    state = lobby.engine_state
     out = _engine_state_to_schema(game_id, state, lobby)
-    await manager.broadcast(game_id, {"type": "game_paused", "game": out.model_dump()})
+    await _broadcast_game(lobby, {"type": "game_paused"}, out)
     return out
 
 
@@ -931,30 +1469,42 @@ async def pause_game(
 async def resume_game(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> GameState:
     """Vote to resume a paused game. Game resumes when all players have voted."""
+    return await game_actors.submit(game_id, lambda: _resume_game(game_id, x_player_id, user_id, db))
+
+
+async def _resume_game(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+    db: AsyncSession,
+) -> GameState:
     lobby = await _get_lobby(game_id, db)
-    record = _require_active_player(lobby, x_player_id, authorization)
-    _bind_player_user(lobby, record, authorization)
+    record = _require_active_player(lobby, x_player_id, user_id)
+    _bind_player_user(lobby, record, user_id)
     if lobby.status != "paused":
         raise HTTPException(status_code=400, detail="Game is not paused")
 
     lobby.resume_ready_set.add(record.player_id)
+    # Restored games start with no votes recorded.
+    lobby.resume_ready_set.update(p.player_id for p in lobby.players if p.is_bot)
     resume_count = len(lobby.resume_ready_set)
     resume_needed = lobby.player_count
 
-    state = dict_to_state(lobby.engine_state)
+    state = lobby.engine_state
 
     if resume_count >= resume_needed:
         lobby.status = "active"
         lobby.resume_ready_set = set()
-        await _persist_game(lobby, db)
+        _schedule_persist(lobby)
         out = _engine_state_to_schema(game_id, state, lobby)
-        await manager.broadcast(game_id, {"type": "game_resumed", "game": out.model_dump()})
+        await _broadcast_game(lobby, {"type": "game_resumed"}, out)
     else:
-        await _persist_game(lobby, db)
+        await _save_lobby(lobby)
+        _schedule_persist(lobby)
         out = _engine_state_to_schema(game_id, state, lobby)
         await manager.broadcast(game_id, {
             "type": "resume_ready",
@@ -970,28 +1520,46 @@ async def resume_game(
 async def reset_game(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> LobbyStateSchema:
     """Reset a game back to the waiting/lobby state (host only)."""
+    return await game_actors.submit(game_id, lambda: _reset_game(game_id, x_player_id, user_id, db))
+
+
+async def _reset_game(
+    game_id: str,
+    x_player_id: Optional[str],
+    user_id: Optional[int],
+    db: AsyncSession,
+) -> LobbyStateSchema:
     lobby = await _get_lobby(game_id, db)
-    record = _require_active_player(lobby, x_player_id, authorization)
-    _bind_player_user(lobby, record, authorization)
+    record = _require_active_player(lobby, x_player_id, user_id)
+    _bind_player_user(lobby, record, user_id)
     if record.player_index != 0:
         raise HTTPException(status_code=403, detail="Only the host can reset the game")
     if lobby.status == "waiting":
         raise HTTPException(status_code=400, detail="Game is already in lobby")
 
+    # The row has to be written before the state is cleared below, so take any
+    # pending background write and do it inline.
+    pending_write = discard_pending(game_id)
     if lobby.status != "finished":
         previous_status = lobby.status
+        # A new version, so no copy of the live game still queued anywhere outranks the aborted row.
+        lobby.state_version += 1
         lobby.status = "aborted"
         await _persist_game(lobby, db)
         lobby.status = previous_status
+    elif pending_write:
+        await _persist_game(lobby, db)
 
     for p in lobby.players:
         p.ready = False
     lobby.status = "waiting"
     lobby.engine_state = None
+    lobby.last_game_snapshot = None
+    await _save_lobby(lobby)
 
     schema = _lobby_to_schema(lobby)
     await manager.broadcast(game_id, {"type": "game_reset", "lobby": schema.model_dump()})
@@ -1002,12 +1570,13 @@ async def reset_game(
 async def claim_game(
     game_id: str,
     x_player_id: Optional[str] = Header(default=None),
-    authorization: str = Header(default=""),
+    user_id: Optional[int] = Depends(_auth_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, bool]:
     """Bind the current authenticated user to an existing player slot and persist it for history."""
     lobby = await _get_lobby(game_id, db)
-    record = _require_active_player(lobby, x_player_id, authorization)
-    _bind_player_user(lobby, record, authorization)
-    await _persist_game(lobby, db)
+    record = _require_active_player(lobby, x_player_id, user_id)
+    _bind_player_user(lobby, record, user_id)
+    await _save_lobby(lobby)
+    _schedule_persist(lobby)
     return {"ok": True}
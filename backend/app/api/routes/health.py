@@ -1,5 +1,14 @@
 from fastapi import APIRouter
 
+from app.services.action_log import action_log
+from app.services.auth_service import password_hasher, token_cache
+from app.services.bot_players import bot_pool, bot_turns
+from app.services.connection_manager import manager
+from app.services.game_actor import game_actors
+from app.services.lobby_store import lobby_store
+from app.services.odds import odds_service
+from app.services.persistence import checkpoint_queue, persistence_queue, recovery_stats
+
 router = APIRouter()
 
 
@@ -8,3 +17,45 @@ router = APIRouter()
 async def health_check() -> dict[str, str]:
     """Simple health check endpoint."""
     return {"status": "healthy"}
+
+
+@router.get("/connections")
+async def connection_stats() -> dict:
+    """WebSocket fan-out metrics, including send-queue depth."""
+    return manager.stats()
+
+
+@router.get("/persistence")
+async def persistence_stats() -> dict:
+    """Write-behind, checkpoint, action-log, recovery and lobby-cache metrics."""
+    return {
+        "lifecycle": persistence_queue.stats(),
+        "checkpoints": checkpoint_queue.stats(),
+        "action_log": action_log.stats(),
+        "recovery": recovery_stats.stats(),
+        "lobby_cache": lobby_store.stats(),
+    }
+
+
+@router.get("/actors")
+async def actor_stats() -> dict:
+    """Per-game command actors: queue depth and command service time."""
+    return game_actors.stats()
+
+
+@router.get("/auth")
+async def auth_stats() -> dict:
+    """Password-hashing pool queueing and token-cache hit rate."""
+    return {"password_hasher": password_hasher.stats(), "token_cache": token_cache.stats()}
+
+
+@router.get("/bots")
+async def bot_stats() -> dict:
+    """Bot search pool load and think time, and pending bot turns."""
+    return {"pool": bot_pool.stats(), "turns": bot_turns.stats()}
+
+
+@router.get("/odds")
+async def odds_stats() -> dict:
+    """Win-probability estimates: cache hits, coalesced requests and rollout cost."""
+    return odds_service.stats()
@@ -29,6 +29,55 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-me-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 60 * 24 * 7  # 7 days
+    # Verified JWT claims kept per process so repeat requests skip signature checks.
+    token_cache_size: int = 10000
+    # bcrypt runs on this many threads off the event loop; further logins queue, up to max_pending.
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+    # Per-socket outbound queue; "drop" discards superseded states, "disconnect" closes slow clients.
+    ws_send_queue_size: int = 64
+    ws_slow_consumer_policy: str = "drop"
+    # Write-behind game persistence: flush every N seconds or once this many games are dirty.
+    persist_flush_interval_seconds: float = 2.0
+    persist_flush_threshold: int = 100
+    # Crash-safety checkpoints of in-progress games (rolls/moves between lifecycle writes).
+    checkpoint_interval_seconds: float = 5.0
+    checkpoint_flush_threshold: int = 500
+    # Append-only action log: buffered entries are inserted in batches at this interval.
+    action_log_flush_interval_seconds: float = 1.0
+    # Live lobby storage: "memory" (single worker) or "sqlite" (shared by all workers on one box).
+    lobby_store_backend: str = "memory"
+    lobby_store_path: str = "./lobby_store.db"
+    # In-memory store bounds: lobbies idle this long, or least recently used beyond max games,
+    # are written to the database and dropped (games with open sockets are kept). The ceiling
+    # is a game count, not a byte budget.
+    lobby_cache_max_games: int = 5000
+    lobby_cache_idle_seconds: float = 3600.0
+    lobby_cache_sweep_seconds: float = 30.0
+    # Cross-worker broadcasts: "memory" (single worker) or "unix" (datagram sockets in this directory).
+    broadcast_bus_backend: str = "memory"
+    broadcast_bus_dir: str = "/tmp/ludo-broadcast-bus"
+    # Per-game command actors are retired after this many idle seconds.
+    game_actor_idle_seconds: float = 60.0
+    # Bot players: expectimax search in this many worker processes, at most think_seconds per
+    # decision and max_depth turns deep. Beyond max_pending queued searches bots answer from a
+    # shallow in-process search instead. Bots wait move_delay_seconds before each action.
+    bot_workers: int = 1
+    bot_max_pending: int = 32
+    bot_think_seconds: float = 0.5
+    bot_max_depth: int = 4
+    bot_move_delay_seconds: float = 0.8
+    bot_use_chance: bool = True
+    # Win-probability estimates (GET /games/{id}/odds): random rollouts in this many worker
+    # processes, for at most time_budget_seconds or max_rollouts per position, with chance
+    # played on chance_rate of turns. Estimates are cached per position hash; beyond
+    # max_pending concurrent estimates requests get a 503.
+    odds_workers: int = 1
+    odds_time_budget_seconds: float = 0.2
+    odds_max_rollouts: int = 2000
+    odds_chance_rate: float = 0.1
+    odds_cache_size: int = 10000
+    odds_max_pending: int = 16
 
     def model_post_init(self, __context) -> None:
         self.database_url = self.normalize_database_url(self.database_url)
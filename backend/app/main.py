@@ -7,20 +7,54 @@ if os.name == "nt":
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import DBAPIError
 
 from app.api.routes import games, health
 from app.api.routes import auth as auth_routes
 from app.core.config import get_cors_origins
 from app.core.database import Base, engine
+from app.services.action_log import action_log
+from app.services.auth_service import password_hasher
+from app.services.bot_players import bot_pool, bot_turns
+from app.services.connection_manager import manager
+from app.services.game_actor import game_actors
+from app.services.lobby_store import lobby_store
+from app.services.odds import odds_service
+from app.services.persistence import checkpoint_queue, persistence_queue
 import app.models.game  # noqa: F401
+import app.models.game_action  # noqa: F401
 import app.models.user  # noqa: F401
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    except DBAPIError:
+        # Another worker created the same tables concurrently; a second pass is a no-op.
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await lobby_store.start()
+    await manager.start()
+    persistence_queue.start(games.persist_lobbies)
+    checkpoint_queue.start(games.persist_lobbies)
+    action_log.start()
+    lobby_store.start_eviction(games.persist_lobbies, games.lobby_in_use)
+    try:
+        yield
+    finally:
+        await bot_turns.stop()
+        await game_actors.stop()
+        # Never lose dirty games on shutdown.
+        await persistence_queue.stop()
+        await checkpoint_queue.stop()
+        await action_log.stop()
+        await lobby_store.close()
+        await manager.close()
+        password_hasher.shutdown()
+        bot_pool.shutdown()
+        odds_service.shutdown()
 
 
 app = FastAPI(title="Ludo API", lifespan=lifespan)
@@ -31,6 +65,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cross-origin clients can only read response headers listed here.
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(health.router, prefix="/health", tags=["health"])
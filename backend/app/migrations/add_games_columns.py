@@ -0,0 +1,52 @@
+"""
+One-shot migration adding newer ``games`` columns to an existing database.
+
+Run once after deploying:
+
+    python -m app.migrations.add_games_columns
+
+- ``state_version``: existing rows start at 0, so the next write of any live
+  game takes effect.
+- ``seats_json``: empty for existing rows, which restore as before.
+
+Columns are only added when missing, so re-running it is safe.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import inspect, text
+
+from app.core.database import Base, engine
+import app.models.game  # noqa: F401
+import app.models.user  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = {
+    "state_version": "INTEGER NOT NULL DEFAULT 0",
+    "seats_json": "TEXT",
+}
+
+
+async def migrate() -> list[str]:
+    """Add whichever columns the games table lacks. Returns the names added."""
+    added = []
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        existing = await conn.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("games")}
+        )
+        for name, ddl in COLUMNS.items():
+            if name in existing:
+                continue
+            await conn.execute(text(f"ALTER TABLE games ADD COLUMN {name} {ddl}"))
+            logger.info("GAMES_COLUMN_ADDED column=%s", name)
+            added.append(name)
+    return added
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    added = asyncio.run(migrate())
+    print(f"Added games columns: {', '.join(added)}" if added else "games table already up to date")
@@ -0,0 +1,89 @@
+"""
+One-shot backfill of ``game_participants`` from existing ``games`` rows.
+
+Run once after deploying the participants table:
+
+    python -m app.migrations.backfill_game_participants
+
+Only games without any participant rows are touched, so re-running it is safe.
+"""
+
+import asyncio
+import json
+import logging
+
+from sqlalchemy import insert, select
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.game import Game, GameParticipant
+import app.models.user  # noqa: F401
+from app.services.game_engine import ACTIVE_COLORS_BY_COUNT
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+DEFAULT_COLORS = ("red", "blue", "yellow", "green")
+
+
+def participant_rows_from_game(game: Game) -> list[dict]:
+    """Seats of a games row, with colors taken from its saved engine state when present."""
+    colors = None
+    if game.engine_state_json:
+        colors = json.loads(game.engine_state_json).get("active_colors")
+    if not colors:
+        colors = list(ACTIVE_COLORS_BY_COUNT.get(game.player_count, DEFAULT_COLORS[: game.player_count]))
+    slots = [
+        (0, game.player_one_user_id, game.player_one_display_name),
+        (1, game.player_two_user_id, game.player_two_display_name),
+        (2, game.player_three_user_id, game.player_three_display_name),
+        (3, game.player_four_user_id, game.player_four_display_name),
+    ]
+    return [
+        {
+            "game_id": game.game_id,
+            "player_index": player_index,
+            "user_id": user_id,
+            "display_name": display_name or f"Player {player_index + 1}",
+            "color": colors[player_index] if player_index < len(colors) else DEFAULT_COLORS[player_index],
+            "is_winner": 1 if game.winner_user_id is not None and user_id == game.winner_user_id else 0,
+            "created_at": game.created_at,
+        }
+        for player_index, user_id, display_name in slots[: game.player_count]
+        if user_id is not None or display_name
+    ]
+
+
+async def backfill() -> int:
+    """Insert participant rows for every game that has none. Returns games backfilled."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    backfilled = 0
+    last_game_id = ""
+    async with SessionLocal() as db:
+        while True:
+            has_participants = select(GameParticipant.id).where(GameParticipant.game_id == Game.game_id).exists()
+            games = (
+                await db.execute(
+                    select(Game)
+                    .where(Game.game_id > last_game_id)
+                    .where(~has_participants)
+                    .order_by(Game.game_id)
+                    .limit(BATCH_SIZE)
+                )
+            ).scalars().all()
+            if not games:
+                break
+            rows = [row for game in games for row in participant_rows_from_game(game)]
+            if rows:
+                await db.execute(insert(GameParticipant), rows)
+            await db.commit()
+            backfilled += len(games)
+            last_game_id = games[-1].game_id
+            logger.info("PARTICIPANTS_BACKFILL games=%s total=%s", len(games), backfilled)
+    return backfilled
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Backfilled participants for {asyncio.run(backfill())} games")
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 
 from app.core.database import Base
 
@@ -27,6 +27,32 @@ class Game(Base):
     winner_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     winner_display_name = Column(String(100), nullable=True)
     engine_state_json = Column(Text, nullable=True)
+    # Lobby state_version of the copy last written; older copies never overwrite the row.
+    state_version = Column(Integer, nullable=False, default=0)
+    # Every seat as the lobby held it (player ids, ready, bot), so any lobby can be restored after eviction.
+    seats_json = Column(Text, nullable=True)
 
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     ended_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class GameParticipant(Base):
+    """One seat of a persisted game, for per-user history lookups."""
+
+    __tablename__ = "game_participants"
+    __table_args__ = (
+        UniqueConstraint("game_id", "player_index", name="uq_game_participants_game_seat"),
+        Index("ix_game_participants_user_created", "user_id", "created_at", "game_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_id = Column(String(36), ForeignKey("games.game_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    player_index = Column(Integer, nullable=False)
+    display_name = Column(String(100), nullable=False)
+    color = Column(String(20), nullable=False)
+    is_winner = Column(Integer, nullable=False, default=0)
+
+    # Copy of games.created_at so a history page is read straight off the
+    # (user_id, created_at) index.
+    created_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint
+
+from app.core.database import Base
+
+
+class GameAction(Base):
+    """One entry of a game's append-only action log."""
+
+    __tablename__ = "game_actions"
+    __table_args__ = (UniqueConstraint("game_id", "seq", name="uq_game_actions_game_seq"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_id = Column(String(36), nullable=False, index=True)
+    seq = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)
+    player_index = Column(Integer, nullable=True)
+    payload_json = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -24,6 +24,7 @@ class LobbyPlayerSchema(BaseModel):
     display_name: str
     ready: bool
     connected: bool
+    is_bot: bool = False
 
 
 class LobbyStateSchema(BaseModel):
@@ -48,6 +49,12 @@ class JoinRequest(BaseModel):
     display_name: str = "Player"
 
 
+class AddBotsRequest(BaseModel):
+    """Host request to seat bot players in the empty slots of a waiting lobby."""
+
+    count: Optional[int] = None  # empty slots to fill; all of them when omitted
+
+
 class JoinResponse(BaseModel):
     """Returned to a player when they create or join a game."""
 
@@ -75,6 +82,27 @@ class GameState(BaseModel):
     resume_ready_player_indices: list[int] = []
     resume_ready_count: int = 0
     resume_needed: int = 0
+    version: int = 0  # lobby state version, matches websocket update versions
+
+
+class ColorOddsSchema(BaseModel):
+    """One color's estimated chance of winning."""
+
+    player_index: int
+    color: str
+    win_probability: float
+
+
+class OddsResponse(BaseModel):
+    """Win probabilities for the current position, from Monte Carlo rollouts."""
+
+    game_id: str
+    version: int  # lobby state version the estimate is for
+    position_hash: str  # GameEngineState.zobrist, hex
+    odds: list[ColorOddsSchema]
+    rollouts: int = 0  # 0 once the game is decided
+    cached: bool = False
+    elapsed_ms: float = 0.0  # rollout time when the estimate was computed
 
 
 class RollResponse(BaseModel):
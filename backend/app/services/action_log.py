@@ -0,0 +1,284 @@
+"""Append-only per-game action log with seeded randomness and deterministic replay."""
+
+import asyncio
+import json
+import logging
+import random
+import secrets
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.game_action import GameAction
+from app.services.game_engine import (
+    GameEngineState,
+    advance_turn,
+    dict_to_state,
+    end_chance_turn,
+    end_move_turn,
+    get_engine,
+)
+
+logger = logging.getLogger(__name__)
+
+ACTION_START = "start"        # new game: seed, player_count, active_colors, bot seats
+ACTION_SNAPSHOT = "snapshot"  # full state + fresh seed (+ bot seats), when the log has to be rebased
+ACTION_ROLL = "roll"
+ACTION_MOVE = "move"
+ACTION_PASS = "pass"
+ACTION_CHANCE = "chance"
+
+
+class ReplayError(Exception):
+    """The log cannot be replayed into a consistent state."""
+
+
+@dataclass
+class LoggedAction:
+    game_id: str
+    seq: int
+    action: str
+    player_index: Optional[int]
+    payload: dict
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def new_seed() -> int:
+    return secrets.randbits(63)
+
+
+def action_rng(seed: int, seq: int) -> random.Random:
+    """RNG for one action; depends only on the game seed and the action's sequence number."""
+    return random.Random(f"{seed}:{seq}")
+
+
+def replay(actions: Iterable[LoggedAction]) -> Optional[GameEngineState]:
+    """
+    Rebuild engine state from a game's log, oldest first.
+
+    Rolls and chance draws are regenerated from the seed and checked against
+    the recorded outcome. Returns None for an empty log.
+    """
+    state: Optional[GameEngineState] = None
+    seed: Optional[int] = None
+    for entry in actions:
+        payload = entry.payload
+        if entry.action == ACTION_START:
+            state = get_engine(payload["player_count"], payload["active_colors"]).new_game()
+            seed = payload["seed"]
+            continue
+        if entry.action == ACTION_SNAPSHOT:
+            state = dict_to_state(payload["state"])
+            seed = payload["seed"]
+            continue
+        if state is None or seed is None:
+            raise ReplayError(f"seq {entry.seq}: {entry.action} before start")
+
+        engine = get_engine(state.player_count, state.active_colors)
+        if entry.action == ACTION_ROLL:
+            roll = engine.roll_dice(action_rng(seed, entry.seq))
+            if roll != payload["roll"]:
+                raise ReplayError(f"seq {entry.seq}: rolled {roll}, log has {payload['roll']}")
+            state.last_roll = roll
+            state.has_rolled = True
+        elif entry.action == ACTION_MOVE:
+            roll = state.last_roll
+            if roll is None:
+                raise ReplayError(f"seq {entry.seq}: move without a roll")
+            result = engine.apply_move(state, payload["color"], payload["token_index"], roll)
+            if not result.moved:
+                raise ReplayError(f"seq {entry.seq}: {result.message}")
+            end_move_turn(state, result)
+        elif entry.action == ACTION_PASS:
+            advance_turn(state)
+        elif entry.action == ACTION_CHANCE:
+            option_id = engine.draw_chance(action_rng(seed, entry.seq))
+            if option_id != payload["option_id"]:
+                raise ReplayError(f"seq {entry.seq}: drew {option_id}, log has {payload['option_id']}")
+            _, turns_to_advance = engine.apply_chance(state, option_id)
+            end_chance_turn(state, turns_to_advance)
+        else:
+            raise ReplayError(f"seq {entry.seq}: unknown action {entry.action!r}")
+    return state
+
+
+def last_seed(actions: Iterable[LoggedAction]) -> Optional[int]:
+    seed = None
+    for entry in actions:
+        if entry.action in (ACTION_START, ACTION_SNAPSHOT):
+            seed = entry.payload["seed"]
+    return seed
+
+
+def bot_seats(actions: Iterable[LoggedAction]) -> list[int]:
+    """Seat indices played by bots, as recorded by the latest start or snapshot entry."""
+    seats: list[int] = []
+    for entry in actions:
+        if entry.action in (ACTION_START, ACTION_SNAPSHOT):
+            seats = list(entry.payload.get("bots", []))
+    return seats
+
+
+class ActionLogWriter:
+    """Buffers appended actions and inserts them in batches in the background."""
+
+    def __init__(self, interval: Optional[float] = None) -> None:
+        self.interval = interval if interval is not None else settings.action_log_flush_interval_seconds
+        self._buffer: list[LoggedAction] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self.appended = 0
+        self.written = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        self._lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher, letting a flush in progress finish, and write everything still buffered."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def append(self, entry: LoggedAction) -> None:
+        self._buffer.append(entry)
+        self.appended += 1
+
+    def pending_for(self, game_id: str) -> list[LoggedAction]:
+        return [entry for entry in self._buffer if entry.game_id == game_id]
+
+    def discard(self, game_id: str) -> None:
+        self._buffer = [entry for entry in self._buffer if entry.game_id != game_id]
+
+    async def flush(self) -> int:
+        if not self._buffer:
+            return 0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                await self._insert(batch)
+            except IntegrityError:
+                # Retrying the batch would fail on the same row forever; find it row by row.
+                return await self._insert_rows(batch)
+            except Exception:
+                self.failures += 1
+                logger.exception("ACTION_LOG_FLUSH_FAILED entries=%s", len(batch))
+                self._buffer = batch + self._buffer
+                return 0
+            except asyncio.CancelledError:
+                # Cancelled mid-insert (e.g. the loop is shutting down): keep the entries.
+                self._buffer = batch + self._buffer
+                raise
+            self.written += len(batch)
+            return len(batch)
+
+    async def _insert_rows(self, batch: list[LoggedAction]) -> int:
+        """Insert one entry per transaction, dropping those the database rejects for good."""
+        written = 0
+        for i, entry in enumerate(batch):
+            try:
+                await self._insert([entry])
+            except IntegrityError as exc:
+                self.rejected += 1
+                logger.error(
+                    "ACTION_LOG_ROW_REJECTED game=%s seq=%s action=%s error=%s",
+                    entry.game_id,
+                    entry.seq,
+                    entry.action,
+                    exc.orig,
+                )
+            except Exception:
+                self.failures += 1
+                logger.exception("ACTION_LOG_FLUSH_FAILED entries=%s", len(batch) - i)
+                self._buffer = batch[i:] + self._buffer
+                break
+            except asyncio.CancelledError:
+                self._buffer = batch[i:] + self._buffer
+                self.written += written
+                raise
+            else:
+                written += 1
+        self.written += written
+        return written
+
+    @staticmethod
+    async def _insert(entries: list[LoggedAction]) -> None:
+        async with SessionLocal() as db:
+            await db.execute(
+                insert(GameAction),
+                [
+                    {
+                        "game_id": entry.game_id,
+                        "seq": entry.seq,
+                        "action": entry.action,
+                        "player_index": entry.player_index,
+                        "payload_json": json.dumps(entry.payload),
+                        "created_at": entry.created_at,
+                    }
+                    for entry in entries
+                ],
+            )
+            await db.commit()
+
+    async def _run(self) -> None:
+        assert self._stopping is not None
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._buffer),
+            "appended": self.appended,
+            "written": self.written,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+async def load_actions(db: AsyncSession, game_id: str) -> list[LoggedAction]:
+    """Persisted plus still-buffered actions for a game, ordered by seq."""
+    result = await db.execute(
+        select(GameAction).where(GameAction.game_id == game_id).order_by(GameAction.seq)
+    )
+    by_seq = {
+        row.seq: LoggedAction(
+            game_id=row.game_id,
+            seq=row.seq,
+            action=row.action,
+            player_index=row.player_index,
+            payload=json.loads(row.payload_json),
+            created_at=row.created_at,
+        )
+        for row in result.scalars()
+    }
+    for entry in action_log.pending_for(game_id):
+        by_seq[entry.seq] = entry
+    return [by_seq[seq] for seq in sorted(by_seq)]
+
+
+async def delete_actions(db: AsyncSession, game_id: str) -> None:
+    """Drop a game's log (buffered and persisted); the caller commits."""
+    action_log.discard(game_id)
+    await db.execute(delete(GameAction).where(GameAction.game_id == game_id))
+
+
+action_log = ActionLogWriter()
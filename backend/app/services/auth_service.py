@@ -1,5 +1,9 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable, Optional, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
@@ -10,6 +14,8 @@ from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.user import User
 
+T = TypeVar("T")
+
 
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
@@ -19,17 +25,148 @@ def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode(), hashed.encode())
 
 
+class PasswordHasherBusy(Exception):
+    """More password checks are queued than ``password_hash_max_pending`` allows."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL while it works, so a login spike only occupies
+    ``workers`` threads instead of stalling the event loop (and every game
+    socket on this worker). Callers beyond ``max_pending`` are rejected
+    rather than queued without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_service_ms = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self.max_pending > 0 and self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+        def timed() -> tuple[T, float, float]:
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started, time.perf_counter()
+
+        submitted = time.perf_counter()
+        self.pending += 1
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+        wait_ms = (started - submitted) * 1000
+        self.completed += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.total_service_ms += (finished - started) * 1000
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        running = min(self.pending, self.workers)
+        return {
+            "workers": self.workers,
+            "running": running,
+            "queued": self.pending - running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_ms / self.completed, 3) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "avg_hash_ms": round(self.total_service_ms / self.completed, 3) if self.completed else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_pending)
+
+
 def create_access_token(user_id: int, username: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.jwt_expire_minutes)
     payload = {"sub": str(user_id), "username": username, "exp": expire}
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified token -> claims.
+
+    Entries are dropped at the token's own ``exp``, so a cached token never
+    outlives what ``jwt.decode`` would accept. Failed verifications are not
+    cached.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_size <= 0:
+            return
+        self._entries[token] = (claims, float(exp))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(settings.token_cache_size)
+
+
 def decode_token(token: str) -> dict:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
-        return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        claims = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
     except JWTError:
         return {}
+    token_cache.put(token, claims)
+    return claims
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -53,7 +190,7 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
 
 
 async def create_user(db: AsyncSession, username: str, email: str, password: str) -> User:
-    user = User(username=username, email=email, hashed_password=hash_password(password))
+    user = User(username=username, email=email, hashed_password=await password_hasher.hash(password))
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -0,0 +1,159 @@
+"""
+Bot players: search in a process pool, one pending turn task per game.
+
+The API worker only schedules bot turns and applies their decisions through
+the ordinary game commands; the search itself (``bot_search.decide``) runs in
+separate processes, so a bot thinking for its full time budget never holds
+the event loop that serves human games.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.services.bot_search import BotDecision, SearchRequest, TranspositionTable, decide
+
+logger = logging.getLogger(__name__)
+
+# Depth-1 searches answered in-process when the pool is saturated or broken.
+_fallback_table = TranspositionTable(max_entries=10_000)
+
+
+class BotPool:
+    """
+    Runs bot searches on a small process pool.
+
+    Requests beyond ``max_pending``, and any request the pool fails (a
+    crashed worker restarts the pool), get a depth-1 answer computed
+    in-process instead: a weaker move now beats a bot that stalls its game.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.total_think_ms = 0.0
+        self.max_think_ms = 0.0
+        self.total_depth = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers only import the search module, not the app and its open sockets.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _fallback(self, request: SearchRequest) -> BotDecision:
+        self.fallbacks += 1
+        return decide(replace(request, max_depth=1), _fallback_table)
+
+    async def decide(self, request: SearchRequest) -> BotDecision:
+        if self.max_pending > 0 and self.pending >= self.max_pending:
+            return self._fallback(request)
+        started = time.perf_counter()
+        self.pending += 1
+        try:
+            decision = await asyncio.get_running_loop().run_in_executor(self._pool(), decide, request)
+        except BrokenProcessPool:
+            self.failures += 1
+            logger.warning("BOT_POOL_BROKEN workers=%s; restarting", self.workers)
+            self.shutdown()
+            return self._fallback(request)
+        except Exception as exc:
+            self.failures += 1
+            logger.warning("BOT_SEARCH_FAILED error=%r", exc)
+            return self._fallback(request)
+        finally:
+            self.pending -= 1
+        think_ms = (time.perf_counter() - started) * 1000
+        self.completed += 1
+        self.total_think_ms += think_ms
+        self.max_think_ms = max(self.max_think_ms, think_ms)
+        self.total_depth += decision.depth
+        return decision
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        running = min(self.pending, self.workers)
+        return {
+            "workers": self.workers,
+            "running": running,
+            "queued": self.pending - running,
+            "completed": self.completed,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+            "avg_think_ms": round(self.total_think_ms / self.completed, 3) if self.completed else 0.0,
+            "max_think_ms": round(self.max_think_ms, 3),
+            "avg_depth": round(self.total_depth / self.completed, 2) if self.completed else 0.0,
+        }
+
+
+class BotTurns:
+    """
+    One background task per game whose current player is a bot.
+
+    A task is keyed by the lobby's ``state_version`` when it was scheduled;
+    scheduling the same version again is a no-op, and a newer version
+    replaces the older task's slot (the older one notices the version moved
+    on and does nothing).
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, tuple[int, asyncio.Task]] = {}
+        self.scheduled = 0
+        self.errors = 0
+
+    def schedule(self, game_id: str, version: int, turn: Callable[[], Awaitable[None]]) -> None:
+        current = self._tasks.get(game_id)
+        if current is not None and current[0] == version and not current[1].done():
+            return
+        task = asyncio.create_task(self._run(game_id, turn))
+        self._tasks[game_id] = (version, task)
+        self.scheduled += 1
+
+    async def _run(self, game_id: str, turn: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await turn()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.errors += 1
+            logger.exception("BOT_TURN_FAILED game=%s", game_id)
+        finally:
+            current = self._tasks.get(game_id)
+            if current is not None and current[1] is asyncio.current_task():
+                del self._tasks[game_id]
+
+    async def stop(self) -> None:
+        tasks = [task for _, task in self._tasks.values()]
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {"pending_turns": len(self._tasks), "scheduled": self.scheduled, "errors": self.errors}
+
+
+bot_pool = BotPool(settings.bot_workers, settings.bot_max_pending)
+bot_turns = BotTurns()
@@ -0,0 +1,379 @@
+"""
+Expectimax search for bot players.
+
+The search does not touch ``GameEngine``: positions are the engine's compact
+``positions`` bytes (one position code per token, seat-major) and the rules
+are replayed on copies of them from the engine's lookup tables, so a node
+costs a few byte operations instead of decoding ``TokenState`` objects.
+
+A turn is a decision between rolling and playing chance, the die and the
+chance draw are chance nodes with the engine's probabilities, and the mover
+picks the legal move that is best for itself (max-n: every node value is a
+vector with one score per seat). Search deepens one turn at a time until the
+time budget runs out and answers from the deepest finished iteration.
+Subtrees are memoised in a per-process transposition table.
+
+``decide`` is a plain function of a picklable ``SearchRequest`` so it can run
+in a worker process.
+"""
+
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.services.game_engine import (
+    BEFORE_HOME_LANE,
+    CHANCE_OPTIONS,
+    FINISHED_CODE,
+    HOME_CODE_BASE,
+    MOVE_TABLE,
+    NEAREST_START_PATH,
+    PATH_CODE_BASE,
+    PATH_LENGTH,
+    ROUTE_PROGRESS,
+    SAFE_PATH_INDEXES,
+    TOKENS_PER_PLAYER,
+)
+
+# The weighted die of GameEngine.roll_dice as (face, probability).
+ROLL_PROBABILITIES = tuple((face, (5 if face == 6 else 2) / 15) for face in range(1, 7))
+CHANCE_IDS = tuple(option["id"] for option in CHANCE_OPTIONS)
+CHANCE_PROBABILITY = 1 / len(CHANCE_IDS)
+
+TABLE_MAX_ENTRIES = 200_000
+# Time is checked once per this many nodes.
+CLOCK_INTERVAL = 64
+
+# Token scores for the evaluation: yard 0, track 1-51 by progress, home column 53-58, finished 60.
+_FINISHED_SCORE = 60
+_SAFE_BONUS = 3
+_MAX_STRENGTH = TOKENS_PER_PLAYER * _FINISHED_SCORE
+
+
+@dataclass(frozen=True)
+class SearchRequest:
+    active_colors: tuple[str, ...]
+    positions: bytes  # GameEngineState.positions
+    seat: int  # current_player_index
+    roll: Optional[int] = None  # the roll to move with, None before rolling
+    allow_chance: bool = True
+    time_budget: float = 0.5  # seconds
+    max_depth: int = 4  # turns
+
+
+@dataclass(frozen=True)
+class BotDecision:
+    action: str  # "roll" | "chance" | "move" | "pass"
+    token_index: Optional[int] = None  # for "move"
+    depth: int = 0  # deepest completed iteration, in turns
+    nodes: int = 0
+    table_hits: int = 0
+    value: float = 0.0  # the mover's score for the chosen action
+    elapsed_ms: float = 0.0
+
+
+class CompactRules:
+    """Engine tables indexed by seat instead of color."""
+
+    def __init__(self, active_colors: tuple[str, ...]) -> None:
+        self.seats = len(active_colors)
+        self.move = tuple(MOVE_TABLE[color] for color in active_colors)
+        self.progress = []
+        self.before_home = []
+        self.token_score = []
+        for color in active_colors:
+            progress = [-1] * (FINISHED_CODE + 1)
+            before_home = [False] * (FINISHED_CODE + 1)
+            score = [0] * (FINISHED_CODE + 1)
+            for path_index in range(PATH_LENGTH):
+                code = PATH_CODE_BASE + path_index
+                progress[code] = ROUTE_PROGRESS[color][path_index]
+                before_home[code] = BEFORE_HOME_LANE[color][path_index]
+                score[code] = 1 + progress[code] + (_SAFE_BONUS if path_index in SAFE_PATH_INDEXES else 0)
+            for code in range(HOME_CODE_BASE, FINISHED_CODE):
+                score[code] = 53 + code - HOME_CODE_BASE
+            score[FINISHED_CODE] = _FINISHED_SCORE
+            self.progress.append(tuple(progress))
+            self.before_home.append(tuple(before_home))
+            self.token_score.append(tuple(score))
+
+
+@lru_cache(maxsize=None)
+def compact_rules(active_colors: tuple[str, ...]) -> CompactRules:
+    return CompactRules(active_colors)
+
+
+def _is_path(code: int) -> bool:
+    return PATH_CODE_BASE <= code < HOME_CODE_BASE
+
+
+def _owners_at(positions: bytes, code: int) -> list[int]:
+    return [slot // TOKENS_PER_PLAYER for slot, at in enumerate(positions) if at == code]
+
+
+def _destination(rules: CompactRules, positions: bytes, seat: int, code: int, roll: int) -> Optional[int]:
+    """Where a token of ``seat`` at ``code`` lands with ``roll``, or None (as GameEngine._destination_code)."""
+    destination = rules.move[seat][code][roll]
+    if destination is None:
+        return None
+    if _is_path(code) and destination < HOME_CODE_BASE:
+        owners = _owners_at(positions, destination)
+        if len(owners) >= 2 and owners.count(owners[0]) == len(owners) and owners[0] != seat:
+            return None
+    return destination
+
+
+def _capture_slot(positions: bytes, seat: int, destination: int) -> Optional[int]:
+    """The lone opponent token a track move onto ``destination`` would capture."""
+    if destination - PATH_CODE_BASE in SAFE_PATH_INDEXES:
+        return None
+    found = None
+    for slot, at in enumerate(positions):
+        if at == destination:
+            if found is not None:
+                return None
+            found = slot
+    if found is None or found // TOKENS_PER_PLAYER == seat:
+        return None
+    return found
+
+
+def _has_won(positions, seat: int) -> bool:
+    base = seat * TOKENS_PER_PLAYER
+    return all(code == FINISHED_CODE for code in positions[base:base + TOKENS_PER_PLAYER])
+
+
+def _step_token(board: bytearray, seat: int, token_index: int, destination: int) -> None:
+    """Move one token to a legal ``destination`` in place, capturing as apply_move does."""
+    slot = seat * TOKENS_PER_PLAYER + token_index
+    if _is_path(board[slot]) and destination < HOME_CODE_BASE:
+        victim = _capture_slot(board, seat, destination)
+        if victim is not None:
+            board[victim] = 0
+    board[slot] = destination
+
+
+def legal_moves(rules: CompactRules, positions: bytes, seat: int, roll: int) -> list[tuple[int, bytes, bool]]:
+    """(token_index, positions after the move, won) for every legal move."""
+    moves = []
+    base = seat * TOKENS_PER_PLAYER
+    for token_index in range(TOKENS_PER_PLAYER):
+        destination = _destination(rules, positions, seat, positions[base + token_index], roll)
+        if destination is None:
+            continue
+        board = bytearray(positions)
+        _step_token(board, seat, token_index, destination)
+        moves.append((token_index, bytes(board), _has_won(board, seat)))
+    return moves
+
+
+def apply_chance(rules: CompactRules, positions: bytes, seat: int, option_id: str) -> tuple[bytes, bool, int]:
+    """(positions after the chance option, won, turns to advance), as GameEngine.apply_chance."""
+    board = bytearray(positions)
+    if option_id == "opponent_most_advanced_back_4":
+        best = None
+        best_key = None
+        for slot, code in enumerate(board):
+            owner = slot // TOKENS_PER_PLAYER
+            if owner == seat or not _is_path(code):
+                continue
+            key = (rules.progress[owner][code], -(slot % TOKENS_PER_PLAYER))
+            if best_key is None or key > best_key:
+                best, best_key = slot, key
+        if best is not None:
+            board[best] = PATH_CODE_BASE + (board[best] - PATH_CODE_BASE - 4) % PATH_LENGTH
+        return bytes(board), False, 1
+    if option_id == "advance_all_mine_by_1":
+        base = seat * TOKENS_PER_PLAYER
+        for token_index in range(TOKENS_PER_PLAYER):
+            code = board[base + token_index]
+            destination = _destination(rules, board, seat, code, 1)
+            if destination is not None and code != 0:
+                _step_token(board, seat, token_index, destination)
+        return bytes(board), _has_won(board, seat), 1
+    if option_id == "skip_next_player":
+        return positions, False, 2
+    if option_id == "move_closest_to_start_to_nearest_start":
+        base = seat * TOKENS_PER_PLAYER
+        best = None
+        best_key = None
+        for token_index in range(TOKENS_PER_PLAYER):
+            code = board[base + token_index]
+            if not rules.before_home[seat][code]:
+                continue
+            forward = rules.progress[seat][code]
+            key = (min(forward, PATH_LENGTH - forward), token_index)
+            if best_key is None or key < best_key:
+                best, best_key = base + token_index, key
+        if best is not None:
+            board[best] = PATH_CODE_BASE + NEAREST_START_PATH[board[best] - PATH_CODE_BASE]
+        return bytes(board), False, 1
+    return positions, False, 1
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class TranspositionTable:
+    """Node values keyed by (seating, positions, seat to move, depth, chance allowed); cleared when full."""
+
+    def __init__(self, max_entries: int = TABLE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: dict = {}
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def put(self, key, value) -> None:
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# One table per process: a worker keeps it across decisions, so the next
+# turn of the same game starts with most of its subtrees already valued.
+_table = TranspositionTable()
+
+
+class _Search:
+    def __init__(self, request: SearchRequest, table: TranspositionTable) -> None:
+        self.request = request
+        self.colors = request.active_colors
+        self.rules = compact_rules(request.active_colors)
+        self.seats = self.rules.seats
+        self.allow_chance = request.allow_chance
+        self.table = table
+        self.deadline: Optional[float] = None
+        self.nodes = 0
+        self.hits = 0
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % CLOCK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise _OutOfTime
+
+    def evaluate(self, positions: bytes) -> tuple[float, ...]:
+        strengths = []
+        for seat in range(self.seats):
+            scores = self.rules.token_score[seat]
+            base = seat * TOKENS_PER_PLAYER
+            strengths.append(sum(scores[code] for code in positions[base:base + TOKENS_PER_PLAYER]))
+        values = []
+        for seat, strength in enumerate(strengths):
+            rival = max(other for index, other in enumerate(strengths) if index != seat)
+            values.append((strength - rival) / _MAX_STRENGTH)
+        return tuple(values)
+
+    def won(self, winner: int) -> tuple[float, ...]:
+        return tuple(1.0 if seat == winner else -1.0 for seat in range(self.seats))
+
+    def next_seat(self, seat: int, turns: int = 1) -> int:
+        return (seat + turns) % self.seats
+
+    def after_move(self, seat: int, roll: int, positions: bytes, won: bool, depth: int) -> tuple[float, ...]:
+        if won:
+            return self.won(seat)
+        # A six moves again; anything else hands the turn on.
+        return self.turn(positions, seat if roll == 6 else self.next_seat(seat), depth - 1)
+
+    def rolled(self, positions: bytes, seat: int, roll: int, depth: int) -> tuple[float, ...]:
+        """Value once ``seat`` has rolled ``roll``: its best move, or a pass."""
+        moves = legal_moves(self.rules, positions, seat, roll)
+        if not moves:
+            return self.turn(positions, self.next_seat(seat), depth - 1)
+        best = None
+        for _, after, won in moves:
+            value = self.after_move(seat, roll, after, won, depth)
+            if best is None or value[seat] > best[seat]:
+                best = value
+        return best
+
+    def roll_value(self, positions: bytes, seat: int, depth: int) -> tuple[float, ...]:
+        total = [0.0] * self.seats
+        for roll, probability in ROLL_PROBABILITIES:
+            value = self.rolled(positions, seat, roll, depth)
+            for index in range(self.seats):
+                total[index] += probability * value[index]
+        return tuple(total)
+
+    def chance_value(self, positions: bytes, seat: int, depth: int) -> tuple[float, ...]:
+        total = [0.0] * self.seats
+        for option_id in CHANCE_IDS:
+            after, won, turns = apply_chance(self.rules, positions, seat, option_id)
+            value = self.won(seat) if won else self.turn(after, self.next_seat(seat, turns), depth - 1)
+            for index in range(self.seats):
+                total[index] += CHANCE_PROBABILITY * value[index]
+        return tuple(total)
+
+    def turn(self, positions: bytes, seat: int, depth: int) -> tuple[float, ...]:
+        """Value at the start of ``seat``'s turn with ``depth`` turns left to search."""
+        if depth <= 0:
+            return self.evaluate(positions)
+        key = (self.colors, positions, seat, depth, self.allow_chance)
+        cached = self.table.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self._tick()
+        value = self.roll_value(positions, seat, depth)
+        if self.allow_chance:
+            chance = self.chance_value(positions, seat, depth)
+            if chance[seat] > value[seat]:
+                value = chance
+        self.table.put(key, value)
+        return value
+
+    def root(self, depth: int) -> tuple[BotDecision, float]:
+        """Best action at the root for one iteration depth, with the mover's value."""
+        request = self.request
+        seat = request.seat
+        if request.roll is not None:
+            best = None
+            for token_index, after, won in legal_moves(self.rules, request.positions, seat, request.roll):
+                value = self.after_move(seat, request.roll, after, won, depth)[seat]
+                if best is None or value > best[1]:
+                    best = (token_index, value)
+            if best is None:
+                return BotDecision(action="pass"), 0.0
+            return BotDecision(action="move", token_index=best[0]), best[1]
+        value = self.roll_value(request.positions, seat, depth)[seat]
+        if self.allow_chance:
+            chance = self.chance_value(request.positions, seat, depth)[seat]
+            if chance > value:
+                return BotDecision(action="chance"), chance
+        return BotDecision(action="roll"), value
+
+
+def decide(request: SearchRequest, table: Optional[TranspositionTable] = None) -> BotDecision:
+    """
+    The bot's action for the position in ``request``.
+
+    Depth 1 always completes; deeper iterations run until ``max_depth`` or
+    the time budget, whichever comes first.
+    """
+    started = time.perf_counter()
+    search = _Search(request, _table if table is None else table)
+    decision, value = search.root(1)
+    depth = 1
+    search.deadline = started + request.time_budget
+    only_one = request.roll is not None and len(legal_moves(search.rules, request.positions, request.seat, request.roll)) <= 1
+    while not only_one and depth < request.max_depth:
+        try:
+            decision, value = search.root(depth + 1)
+        except _OutOfTime:
+            break
+        depth += 1
+    return BotDecision(
+        action=decision.action,
+        token_index=decision.token_index,
+        depth=depth,
+        nodes=search.nodes,
+        table_hits=search.hits,
+        value=round(value, 4),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -1,61 +1,483 @@
 """WebSocket connection manager for broadcasting game events."""
 
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from enum import Enum
+from typing import Callable, Optional
+
 from fastapi import WebSocket
 
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Messages that carry a full snapshot, so an older queued copy is safe to drop
+# once a newer message is waiting behind it.
+SUPERSEDABLE_MESSAGE_TYPES = {
+    "game_state_updated",
+    "opponent_rolling",
+    "opponent_rolling_stop",
+}
+
+# Close code sent to a client that fell too far behind.
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def encode_message(message: dict) -> str:
+    """Encode a message to JSON text once so it can be written to many sockets."""
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class SlowConsumerPolicy(str, Enum):
+    DROP = "drop"              # discard the oldest state a newer one of its type replaces
+    DISCONNECT = "disconnect"  # close the socket
+
+
+class _Connection:
+    """A single socket with its own bounded outbound queue and writer task."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int, delta: bool = False) -> None:
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.delta = delta  # client opted into versioned state diffs
+        # (message type, encoded JSON text)
+        self.queue: deque[tuple[Optional[str], str]] = deque()
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def enqueue(self, message_type: Optional[str], text: str, policy: SlowConsumerPolicy) -> bool:
+        """Queue a message without waiting. Returns False when the consumer must be dropped."""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.max_queue:
+            if policy == SlowConsumerPolicy.DISCONNECT or not self._drop_superseded(message_type):
+                return False
+        self.queue.append((message_type, text))
+        self._wakeup.set()
+        return True
+
+    def _drop_superseded(self, incoming_type: Optional[str]) -> bool:
+        """
+        Drop the oldest queued snapshot that a newer message of the same type
+        (queued behind it, or the incoming one) replaces. Returns False when
+        nothing is superseded, so the client is not left on a stale state.
+        """
+        newer_types = {incoming_type}
+        superseded = None
+        for i in range(len(self.queue) - 1, -1, -1):
+            queued_type = self.queue[i][0]
+            if queued_type in SUPERSEDABLE_MESSAGE_TYPES and queued_type in newer_types:
+                superseded = i
+            newer_types.add(queued_type)
+        if superseded is None:
+            return False
+        del self.queue[superseded]
+        self.dropped += 1
+        return True
+
+    async def run(self, on_error) -> None:
+        try:
+            while True:
+                while self.queue:
+                    _, text = self.queue.popleft()
+                    await self.websocket.send_text(text)
+                self._wakeup.clear()
+                await self._wakeup.wait()
+        except Exception:
+            on_error()
+
+    def stop(self) -> None:
+        self.closed = True
+        self.queue.clear()
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+
+
+class Envelope:
+    """One broadcast as it travels between workers: routing info plus pre-encoded texts."""
+
+    __slots__ = ("game_id", "exclude_player_id", "message_type", "text", "delta_type", "delta_text")
+
+    def __init__(
+        self,
+        game_id: str,
+        message_type: Optional[str],
+        text: str,
+        delta_type: Optional[str] = None,
+        delta_text: Optional[str] = None,
+        exclude_player_id: Optional[str] = None,
+    ) -> None:
+        self.game_id = game_id
+        self.exclude_player_id = exclude_player_id
+        self.message_type = message_type
+        self.text = text
+        self.delta_type = delta_type
+        self.delta_text = delta_text
+
+    def to_bytes(self) -> bytes:
+        # JSON header line, then the message text and delta text back to back,
+        # so the already-encoded payloads are never escaped a second time.
+        text = self.text.encode()
+        header = json.dumps({
+            "g": self.game_id,
+            "x": self.exclude_player_id,
+            "t": self.message_type,
+            "dt": self.delta_type,
+            "n": len(text),
+            "d": self.delta_text is not None,
+        })
+        delta = self.delta_text.encode() if self.delta_text is not None else b""
+        return header.encode() + b"\n" + text + delta
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Envelope":
+        header_raw, _, body = data.partition(b"\n")
+        header = json.loads(header_raw)
+        size = header["n"]
+        return cls(
+            game_id=header["g"],
+            message_type=header["t"],
+            text=body[:size].decode(),
+            delta_type=header["dt"],
+            delta_text=body[size:].decode() if header["d"] else None,
+            exclude_player_id=header["x"],
+        )
+
+
+class BroadcastBus:
+    """
+    Carries broadcasts to the other worker processes.
+
+    The publishing worker always fans out to its own sockets directly; the bus
+    only has to reach the other workers, each of which fans out to its own.
+    """
+
+    remote = False  # True when publishes can reach other processes
+
+    async def start(self, deliver: Callable[[Envelope], None]) -> None:
+        """Begin receiving; ``deliver`` is called for envelopes from other workers."""
+
+    async def close(self) -> None:
+        pass
+
+    def publish(self, envelope: Envelope) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "memory"}
+
+
+class InMemoryBus(BroadcastBus):
+    """Single process: every socket is local, so there is nothing to forward."""
+
+
+class UnixSocketBus(BroadcastBus):
+    """
+    Multi-process bus for workers on one Linux box, with no broker to run.
+
+    Each worker binds a Unix datagram socket in ``directory``; publishing sends
+    the envelope to every other socket there. Sockets left by dead workers are
+    removed the first time a send to them is refused.
+    """
+
+    remote = True
+    MAX_DATAGRAM = 1 << 20
+    PEER_REFRESH_SECONDS = 1.0
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._sock: Optional[socket.socket] = None
+        self._deliver: Optional[Callable[[Envelope], None]] = None
+        self._peers: list[str] = []
+        self._peers_at = 0.0
+        self.published = 0
+        self.received = 0
+        self.send_failures = 0
+
+    async def start(self, deliver: Callable[[Envelope], None]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.path)
+        sock.setblocking(False)
+        self._sock = sock
+        self._deliver = deliver
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    async def close(self) -> None:
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _on_readable(self) -> None:
+        assert self._sock is not None and self._deliver is not None
+        while True:
+            try:
+                data = self._sock.recv(self.MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            self.received += 1
+            try:
+                self._deliver(Envelope.from_bytes(data))
+            except Exception:
+                logger.exception("BUS_DELIVER_FAILED bytes=%s", len(data))
+
+    def _peer_paths(self) -> list[str]:
+        now = time.monotonic()
+        if now - self._peers_at >= self.PEER_REFRESH_SECONDS:
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                names = []
+            self._peers = [
+                os.path.join(self.directory, name)
+                for name in names
+                if name.endswith(".sock") and os.path.join(self.directory, name) != self.path
+            ]
+            self._peers_at = now
+        return self._peers
+
+    def publish(self, envelope: Envelope) -> None:
+        if self._sock is None:
+            return
+        peers = self._peer_paths()
+        if not peers:
+            return
+        data = envelope.to_bytes()
+        self.published += 1
+        for peer in list(peers):
+            try:
+                self._sock.sendto(data, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker is gone; forget its socket.
+                self._peers.remove(peer)
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+            except OSError as exc:
+                # Receiver buffer full (EAGAIN) or message too large; that worker misses
+                # this update and its clients catch up from the next one or a resync.
+                self.send_failures += 1
+                logger.warning("BUS_SEND_FAILED peer=%s error=%s", peer, exc)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "unix",
+            "peers": len(self._peers),
+            "published": self.published,
+            "received": self.received,
+            "send_failures": self.send_failures,
+        }
+
+
+def create_broadcast_bus(backend: Optional[str] = None) -> BroadcastBus:
+    backend = backend or settings.broadcast_bus_backend
+    if backend == "memory":
+        return InMemoryBus()
+    if backend == "unix":
+        return UnixSocketBus(settings.broadcast_bus_dir)
+    raise ValueError(f"Unknown broadcast bus backend: {backend!r}")
+
 
 class ConnectionManager:
-    """Manages active WebSocket connections per game."""
+    """
+    Manages active WebSocket connections per game.
+
+    Each worker only holds its own sockets; broadcasts also go out on the
+    ``bus`` so players of the same game connected to other workers get them.
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        bus: Optional[BroadcastBus] = None,
+    ) -> None:
+        # game_id -> {player_id -> connection}
+        self._connections: dict[str, dict[str, _Connection]] = {}
+        self.max_queue = max_queue or settings.ws_send_queue_size
+        self.slow_consumer_policy = SlowConsumerPolicy(
+            slow_consumer_policy or settings.ws_slow_consumer_policy
+        )
+        self.slow_disconnects = 0
+        self.bus = bus or create_broadcast_bus()
+
+    async def start(self) -> None:
+        await self.bus.start(self._fanout)
 
-    def __init__(self) -> None:
-        # game_id -> {player_id -> WebSocket}
-        self._connections: dict[str, dict[str, WebSocket]] = {}
+    async def close(self) -> None:
+        await self.bus.close()
 
-    async def connect(self, game_id: str, player_id: str, websocket: WebSocket) -> None:
+    async def connect(
+        self,
+        game_id: str,
+        player_id: str,
+        websocket: WebSocket,
+        delta: bool = False,
+    ) -> None:
         await websocket.accept()
         if game_id not in self._connections:
             self._connections[game_id] = {}
-        self._connections[game_id][player_id] = websocket
+        previous = self._connections[game_id].get(player_id)
+        if previous is not None:
+            previous.stop()
+        conn = _Connection(websocket, self.max_queue, delta=delta)
+        conn.task = asyncio.create_task(
+            conn.run(lambda: self._drop_connection(game_id, player_id, conn))
+        )
+        self._connections[game_id][player_id] = conn
 
     def disconnect(self, game_id: str, player_id: str) -> None:
         if game_id in self._connections:
-            self._connections[game_id].pop(player_id, None)
+            conn = self._connections[game_id].pop(player_id, None)
+            if conn is not None:
+                conn.stop()
             if not self._connections[game_id]:
                 del self._connections[game_id]
 
-    async def broadcast(self, game_id: str, message: dict) -> None:
-        """Send a message to all connected players in a game."""
-        connections = self._connections.get(game_id, {})
-        dead: list[str] = []
-        for player_id, ws in connections.items():
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(player_id)
-        for player_id in dead:
+    def _drop_connection(self, game_id: str, player_id: str, conn: _Connection) -> None:
+        """Remove a connection only if it is still the registered one for this player."""
+        if self._connections.get(game_id, {}).get(player_id) is conn:
             self.disconnect(game_id, player_id)
+        else:
+            conn.stop()
 
-    async def broadcast_except(self, game_id: str, exclude_player_id: str, message: dict) -> None:
-        """Send a message to all connected players except one."""
-        connections = self._connections.get(game_id, {})
-        dead: list[str] = []
-        for player_id, ws in connections.items():
-            if player_id == exclude_player_id:
+    def _enqueue(
+        self,
+        game_id: str,
+        player_id: str,
+        conn: _Connection,
+        message_type: Optional[str],
+        text: str,
+    ) -> None:
+        if conn.enqueue(message_type, text, self.slow_consumer_policy):
+            return
+        logger.warning(
+            "WS_SLOW_CONSUMER game=%s player_id=%s queued=%s policy=%s",
+            game_id,
+            player_id,
+            len(conn.queue),
+            self.slow_consumer_policy.value,
+        )
+        self.slow_disconnects += 1
+        self._drop_connection(game_id, player_id, conn)
+        asyncio.create_task(self._close_quietly(conn.websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+
+    def _fanout(self, envelope: Envelope) -> None:
+        """Queue an encoded broadcast on this worker's sockets for the game."""
+        connections = self._connections.get(envelope.game_id)
+        if not connections:
+            return
+        for player_id, conn in list(connections.items()):
+            if player_id == envelope.exclude_player_id:
                 continue
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(player_id)
-        for player_id in dead:
-            self.disconnect(game_id, player_id)
+            if conn.delta and envelope.delta_text is not None:
+                self._enqueue(envelope.game_id, player_id, conn, envelope.delta_type, envelope.delta_text)
+            else:
+                self._enqueue(envelope.game_id, player_id, conn, envelope.message_type, envelope.text)
+
+    def _has_delta_connection(self, game_id: str) -> bool:
+        return any(conn.delta for conn in self._connections.get(game_id, {}).values())
+
+    async def broadcast(
+        self,
+        game_id: str,
+        message: dict,
+        delta_message: Optional[dict] = None,
+    ) -> None:
+        """
+        Queue a message for all connected players in a game, encoding it once.
+
+        Connections that opted into the delta protocol receive ``delta_message``
+        instead when one is given.
+        """
+        if not self.bus.remote and game_id not in self._connections:
+            return
+        delta_text: Optional[str] = None
+        if delta_message is not None and (self.bus.remote or self._has_delta_connection(game_id)):
+            delta_text = encode_message(delta_message)
+        envelope = Envelope(
+            game_id,
+            message.get("type"),
+            encode_message(message),
+            delta_type=delta_message.get("type") if delta_message is not None else None,
+            delta_text=delta_text,
+        )
+        self._fanout(envelope)
+        self.bus.publish(envelope)
+
+    async def broadcast_except(self, game_id: str, exclude_player_id: str, message: dict) -> None:
+        """Queue a message for all connected players except one, encoding it once."""
+        if not self.bus.remote and game_id not in self._connections:
+            return
+        envelope = Envelope(
+            game_id,
+            message.get("type"),
+            encode_message(message),
+            exclude_player_id=exclude_player_id,
+        )
+        self._fanout(envelope)
+        self.bus.publish(envelope)
 
     async def send_to(self, game_id: str, player_id: str, message: dict) -> None:
-        """Send a message to a specific player."""
-        ws = self._connections.get(game_id, {}).get(player_id)
-        if ws:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                self.disconnect(game_id, player_id)
+        """Queue a message for a specific player."""
+        conn = self._connections.get(game_id, {}).get(player_id)
+        if conn:
+            self._enqueue(game_id, player_id, conn, message.get("type"), encode_message(message))
+
+    def has_connections(self, game_id: str) -> bool:
+        return bool(self._connections.get(game_id))
+
+    def queue_depth(self, game_id: str, player_id: str) -> int:
+        """Number of messages waiting to be written to one player's socket."""
+        conn = self._connections.get(game_id, {}).get(player_id)
+        return len(conn.queue) if conn else 0
+
+    def stats(self) -> dict:
+        """Aggregate connection and send-queue metrics."""
+        depths = [len(conn.queue) for conns in self._connections.values() for conn in conns.values()]
+        return {
+            "games": len(self._connections),
+            "connections": len(depths),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "dropped_messages": sum(
+                conn.dropped for conns in self._connections.values() for conn in conns.values()
+            ),
+            "slow_consumer_disconnects": self.slow_disconnects,
+            "bus": self.bus.stats(),
+        }
 
 
 manager = ConnectionManager()
@@ -0,0 +1,162 @@
+"""Per-game actors: one task per live game applies its commands strictly in order."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Command = Callable[[], Awaitable[Any]]
+
+
+class GameActor:
+    """
+    Owns one game's command queue.
+
+    A command runs to completion, including its awaits on broadcast or the
+    database, before the next one for the same game starts. Other games have
+    their own actors and are never blocked by this one.
+    """
+
+    def __init__(self, game_id: str, registry: "GameActorRegistry") -> None:
+        self.game_id = game_id
+        self._registry = registry
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+        self.processed = 0
+        self.total_service_ms = 0.0
+        self.max_service_ms = 0.0
+        self.total_wait_ms = 0.0
+        self.task = asyncio.create_task(self._run())
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, command: Command) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((command, future, time.perf_counter()))
+        return future
+
+    async def _run(self) -> None:
+        future: Optional[asyncio.Future] = None
+        try:
+            while True:
+                try:
+                    command, future, enqueued = await asyncio.wait_for(
+                        self._queue.get(), timeout=self._registry.idle_seconds
+                    )
+                except asyncio.TimeoutError:
+                    if self._queue.empty():
+                        # Nothing can be queued between this check and the removal.
+                        self.closed = True
+                        self._registry._remove(self)
+                        return
+                    continue
+                if future.cancelled():
+                    # The caller went away before the command started.
+                    continue
+                started = time.perf_counter()
+                try:
+                    result = await command()
+                except Exception as exc:
+                    if not future.done():
+                        future.set_exception(exc)
+                    else:
+                        logger.warning("ACTOR_COMMAND_FAILED game=%s error=%r (caller gone)", self.game_id, exc)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finished = time.perf_counter()
+                service_ms = (finished - started) * 1000
+                self.processed += 1
+                self.total_service_ms += service_ms
+                self.max_service_ms = max(self.max_service_ms, service_ms)
+                self.total_wait_ms += (started - enqueued) * 1000
+                self._registry._record(service_ms)
+        except asyncio.CancelledError:
+            # Shutdown: release the callers of the running command and of everything queued.
+            self.closed = True
+            if future is not None:
+                future.cancel()
+            while not self._queue.empty():
+                _, queued, _ = self._queue.get_nowait()
+                queued.cancel()
+            raise
+
+
+class GameActorRegistry:
+    """Creates actors on demand and retires them after ``idle_seconds`` without commands."""
+
+    def __init__(self, idle_seconds: Optional[float] = None) -> None:
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings.game_actor_idle_seconds
+        self._actors: dict[str, GameActor] = {}
+        self.processed = 0
+        self.total_service_ms = 0.0
+        self.max_service_ms = 0.0
+
+    async def submit(self, game_id: str, command: Command) -> Any:
+        """Run ``command`` on the game's actor and return its result (or raise its error)."""
+        actor = self._actors.get(game_id)
+        if actor is None or actor.closed:
+            actor = GameActor(game_id, self)
+            self._actors[game_id] = actor
+        return await actor.submit(command)
+
+    def _remove(self, actor: GameActor) -> None:
+        if self._actors.get(actor.game_id) is actor:
+            del self._actors[actor.game_id]
+
+    def _record(self, service_ms: float) -> None:
+        self.processed += 1
+        self.total_service_ms += service_ms
+        self.max_service_ms = max(self.max_service_ms, service_ms)
+
+    def is_active(self, game_id: str) -> bool:
+        """True while the game has a live actor, i.e. it saw a command within ``idle_seconds``."""
+        actor = self._actors.get(game_id)
+        return actor is not None and not actor.closed
+
+    def queue_depth(self, game_id: str) -> int:
+        actor = self._actors.get(game_id)
+        return actor.depth() if actor else 0
+
+    async def stop(self) -> None:
+        """Cancel all actors (on shutdown); callers still waiting on a command see it cancelled."""
+        actors = list(self._actors.values())
+        self._actors.clear()
+        for actor in actors:
+            actor.closed = True
+            actor.task.cancel()
+        for actor in actors:
+            try:
+                await actor.task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        depths = {game_id: actor.depth() for game_id, actor in self._actors.items()}
+        busiest = sorted(self._actors.values(), key=lambda actor: actor.depth(), reverse=True)[:5]
+        return {
+            "actors": len(self._actors),
+            "queued_commands": sum(depths.values()),
+            "max_queue_depth": max(depths.values(), default=0),
+            "processed": self.processed,
+            "avg_service_ms": round(self.total_service_ms / self.processed, 3) if self.processed else 0.0,
+            "max_service_ms": round(self.max_service_ms, 3),
+            "busiest": [
+                {
+                    "game_id": actor.game_id,
+                    "queue_depth": actor.depth(),
+                    "processed": actor.processed,
+                    "avg_service_ms": round(actor.total_service_ms / actor.processed, 3) if actor.processed else 0.0,
+                    "avg_wait_ms": round(actor.total_wait_ms / actor.processed, 3) if actor.processed else 0.0,
+                }
+                for actor in busiest
+            ],
+        }
+
+
+game_actors = GameActorRegistry()
@@ -1,6 +1,6 @@
 """Ludo game rules engine: board, moves, capture, blocks, safe squares, home."""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
 import random
 from typing import Optional
@@ -52,7 +52,126 @@ class TokenPositionKind(str, Enum):
     HOME = "home"
 
 
-@dataclass
+# Compact position codes: one small int per token.
+#   0        -> yard
+#   1..52    -> main track square (path_index + 1)
+#   53..58   -> home column cell (home_index + 53); 58 is finished
+YARD_CODE = 0
+PATH_CODE_BASE = 1
+HOME_CODE_BASE = PATH_CODE_BASE + PATH_LENGTH
+FINISHED_CODE = HOME_CODE_BASE + 5
+
+# Each path square packs a 4-bit token count per color slot.
+_OCCUPANCY_BITS = 4
+_OCCUPANCY_MASK = (1 << _OCCUPANCY_BITS) - 1
+
+
+def encode_position(
+    kind: TokenPositionKind,
+    path_index: Optional[int] = None,
+    home_index: Optional[int] = None,
+) -> int:
+    """Encode a token position as a single small int."""
+    if kind == TokenPositionKind.PATH and path_index is not None:
+        return PATH_CODE_BASE + path_index
+    if kind == TokenPositionKind.HOME and home_index is not None:
+        return HOME_CODE_BASE + home_index
+    return YARD_CODE
+
+
+def decode_position(code: int) -> tuple[TokenPositionKind, Optional[int], Optional[int]]:
+    """Decode a position code into (kind, path_index, home_index)."""
+    if code >= HOME_CODE_BASE:
+        return (TokenPositionKind.HOME, None, code - HOME_CODE_BASE)
+    if code >= PATH_CODE_BASE:
+        return (TokenPositionKind.PATH, code - PATH_CODE_BASE, None)
+    return (TokenPositionKind.YARD, None, None)
+
+
+def _build_move_table() -> dict[str, tuple[tuple[Optional[int], ...], ...]]:
+    """(color, position code, roll) -> destination code, or None when the roll cannot be used.
+
+    Blocks depend on the live board and are checked separately.
+    """
+    table: dict[str, tuple[tuple[Optional[int], ...], ...]] = {}
+    for color in COLORS:
+        start = START_PATH_INDEX[color]
+        steps_to_entrance = (HOME_ENTRANCE_PATH[color] - start) % PATH_LENGTH
+        rows: list[tuple[Optional[int], ...]] = []
+        for code in range(FINISHED_CODE + 1):
+            row: list[Optional[int]] = [None] * 7  # indexed by roll; 0 is never valid
+            kind, path_index, home_index = decode_position(code)
+            for roll in range(1, 7):
+                if kind == TokenPositionKind.YARD:
+                    if roll == 6:
+                        row[roll] = PATH_CODE_BASE + start
+                elif kind == TokenPositionKind.PATH:
+                    assert path_index is not None
+                    traveled = (path_index - start) % PATH_LENGTH
+                    if traveled + roll > steps_to_entrance:
+                        next_home = traveled + roll - steps_to_entrance - 1
+                        if next_home <= 5:
+                            row[roll] = HOME_CODE_BASE + next_home
+                    else:
+                        row[roll] = PATH_CODE_BASE + (path_index + roll) % PATH_LENGTH
+                else:
+                    assert home_index is not None
+                    if home_index + roll <= 5:
+                        row[roll] = HOME_CODE_BASE + home_index + roll
+            rows.append(tuple(row))
+        table[color] = tuple(rows)
+    return table
+
+
+def _nearest_start(path_index: int) -> int:
+    def circular_distance(target: int) -> tuple[int, int]:
+        forward = (target - path_index) % PATH_LENGTH
+        backward = (path_index - target) % PATH_LENGTH
+        return (min(forward, backward), target)
+
+    return min(SAFE_PATH_INDEXES, key=circular_distance)
+
+
+# Immutable lookup tables built once at import time.
+MOVE_TABLE = _build_move_table()
+# color -> path_index -> squares traveled since leaving the yard (0..51)
+ROUTE_PROGRESS = {
+    color: tuple((p - START_PATH_INDEX[color]) % PATH_LENGTH for p in range(PATH_LENGTH))
+    for color in COLORS
+}
+# color -> path_index -> True while the token has not yet passed its home entrance
+BEFORE_HOME_LANE = {
+    color: tuple(
+        progress <= (HOME_ENTRANCE_PATH[color] - START_PATH_INDEX[color]) % PATH_LENGTH
+        for progress in ROUTE_PROGRESS[color]
+    )
+    for color in COLORS
+}
+# path_index -> closest start tile (ties go to the lower index)
+NEAREST_START_PATH = tuple(_nearest_start(p) for p in range(PATH_LENGTH))
+
+
+# Zobrist keys (64-bit). Token keys are per (token slot, position code); the yard
+# key is 0 so a new game's tokens hash to 0. A fixed seed keeps hashes identical
+# across processes and restarts.
+def _zobrist_keys():
+    rng = random.Random("ludo-zobrist")
+    tokens = tuple(
+        tuple(0 if code == YARD_CODE else rng.getrandbits(64) for code in range(FINISHED_CODE + 1))
+        for _ in range(len(COLORS) * TOKENS_PER_PLAYER)
+    )
+    seating = {(slot, color): rng.getrandbits(64) for slot in range(len(COLORS)) for color in COLORS}
+    turn = tuple(rng.getrandbits(64) for _ in COLORS)
+    # Index: last_roll (0 for None) + 7 when has_rolled.
+    roll = tuple(rng.getrandbits(64) for _ in range(14))
+    winner = tuple(rng.getrandbits(64) for _ in COLORS)
+    return tokens, seating, turn, roll, winner
+
+
+ZOBRIST_TOKEN, ZOBRIST_SEATING, ZOBRIST_TURN, ZOBRIST_ROLL, ZOBRIST_WINNER = _zobrist_keys()
+
+
+@dataclass(slots=True)
 class TokenState:
     """State of a single token."""
 
@@ -79,42 +198,202 @@ class MoveResult:
     message: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
+class MoveOption:
+    """A legal move for the current roll together with where it lands."""
+
+    color: str
+    token_index: int
+    kind: TokenPositionKind
+    path_index: Optional[int] = None
+    home_index: Optional[int] = None
+
+
 class GameEngineState:
-    """Full in-memory game state for Ludo."""
+    """
+    Full in-memory game state for Ludo.
+
+    The board is stored compactly: ``positions`` holds one position code per
+    token at ``color_slot * TOKENS_PER_PLAYER + token_index`` (color_slot is
+    the index in ``active_colors``), and ``occupancy`` holds one int per path
+    square packing a 4-bit token count per color slot. ``TokenState`` objects
+    are decoded on demand.
+
+    ``zobrist`` is a 64-bit hash of the position. Its token part is updated
+    in ``set_token``, the only place tokens move; seating, the player to
+    move, the roll state and the winner are folded in when it is read.
+    """
+
+    __slots__ = (
+        "current_player_index",
+        "last_roll",
+        "has_rolled",
+        "winner_index",
+        "player_count",
+        "active_colors",
+        "positions",
+        "occupancy",
+        "_color_slots",
+        "_token_hash",
+        "_seating_hash",
+    )
 
-    current_player_index: int
-    last_roll: Optional[int] = None
-    has_rolled: bool = False
-    tokens: list[TokenState] = field(default_factory=list)
-    winner_index: Optional[int] = None
-    player_count: int = 4
-    active_colors: list[str] = field(default_factory=list)
+    def __init__(
+        self,
+        current_player_index: int,
+        last_roll: Optional[int] = None,
+        has_rolled: bool = False,
+        tokens: Optional[list[TokenState]] = None,
+        winner_index: Optional[int] = None,
+        player_count: int = 4,
+        active_colors: Optional[list[str]] = None,
+    ) -> None:
+        if active_colors is None:
+            active_colors = list(ACTIVE_COLORS_BY_COUNT.get(player_count, COLORS[:player_count]))
+        self.current_player_index = current_player_index
+        self.last_roll = last_roll
+        self.has_rolled = has_rolled
+        self.winner_index = winner_index
+        self.player_count = player_count
+        self.active_colors = active_colors
+        self._color_slots = {c: i for i, c in enumerate(active_colors)}
+        self.positions = bytearray(len(active_colors) * TOKENS_PER_PLAYER)
+        self.occupancy = [0] * PATH_LENGTH
+        self._token_hash = 0
+        self._seating_hash = 0
+        for color_slot, color in enumerate(active_colors):
+            self._seating_hash ^= ZOBRIST_SEATING[(color_slot, color)]
+        for token in tokens or ():
+            if token.color in self._color_slots:
+                self.set_token(token)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GameEngineState):
+            return NotImplemented
+        return (
+            self.current_player_index == other.current_player_index
+            and self.last_roll == other.last_roll
+            and self.has_rolled == other.has_rolled
+            and self.winner_index == other.winner_index
+            and self.player_count == other.player_count
+            and self.active_colors == other.active_colors
+            and self.positions == other.positions
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"GameEngineState(current_player_index={self.current_player_index}, "
+            f"last_roll={self.last_roll}, has_rolled={self.has_rolled}, "
+            f"winner_index={self.winner_index}, active_colors={self.active_colors}, "
+            f"positions={list(self.positions)})"
+        )
+
+    @property
+    def zobrist(self) -> int:
+        """64-bit Zobrist hash of tokens, seating, player to move, roll state and winner."""
+        value = (
+            self._token_hash
+            ^ self._seating_hash
+            ^ ZOBRIST_TURN[self.current_player_index]
+            ^ ZOBRIST_ROLL[(self.last_roll or 0) + (7 if self.has_rolled else 0)]
+        )
+        if self.winner_index is not None:
+            value ^= ZOBRIST_WINNER[self.winner_index]
+        return value
+
+    @property
+    def tokens(self) -> list[TokenState]:
+        """All tokens in seat order, decoded from the compact board."""
+        return [self._decode_slot(slot) for slot in range(len(self.positions))]
+
+    def _decode_slot(self, slot: int) -> TokenState:
+        kind, path_index, home_index = decode_position(self.positions[slot])
+        return TokenState(
+            color=self.active_colors[slot // TOKENS_PER_PLAYER],
+            token_index=slot % TOKENS_PER_PLAYER,
+            kind=kind,
+            path_index=path_index,
+            home_index=home_index,
+        )
+
+    def color_slot(self, color: str) -> Optional[int]:
+        return self._color_slots.get(color)
+
+    def get_token(self, color: str, token_index: int) -> Optional[TokenState]:
+        color_slot = self._color_slots.get(color)
+        if color_slot is None or not 0 <= token_index < TOKENS_PER_PLAYER:
+            return None
+        return self._decode_slot(color_slot * TOKENS_PER_PLAYER + token_index)
+
+    def set_token(self, token: TokenState) -> None:
+        """Place a token at its position, keeping square occupancy in sync."""
+        color_slot = self._color_slots[token.color]
+        slot = color_slot * TOKENS_PER_PLAYER + token.token_index
+        bit = 1 << (_OCCUPANCY_BITS * color_slot)
+        old_code = self.positions[slot]
+        if PATH_CODE_BASE <= old_code < HOME_CODE_BASE:
+            self.occupancy[old_code - PATH_CODE_BASE] -= bit
+        new_code = encode_position(token.kind, token.path_index, token.home_index)
+        if PATH_CODE_BASE <= new_code < HOME_CODE_BASE:
+            self.occupancy[new_code - PATH_CODE_BASE] += bit
+        self.positions[slot] = new_code
+        keys = ZOBRIST_TOKEN[slot]
+        self._token_hash ^= keys[old_code] ^ keys[new_code]
 
     def get_tokens_by_color(self, color: str) -> list[TokenState]:
-        return [t for t in self.tokens if t.color == color]
+        color_slot = self._color_slots.get(color)
+        if color_slot is None:
+            return []
+        base = color_slot * TOKENS_PER_PLAYER
+        return [self._decode_slot(slot) for slot in range(base, base + TOKENS_PER_PLAYER)]
 
     def get_tokens_at_path(self, path_index: int) -> list[TokenState]:
-        return [t for t in self.tokens if t.at_path_index(path_index)]
+        packed = self.occupancy[path_index]
+        if not packed:
+            return []
+        code = PATH_CODE_BASE + path_index
+        return [
+            self._decode_slot(slot)
+            for slot in range(len(self.positions))
+            if self.positions[slot] == code
+        ]
 
     def get_tokens_at_home(self, color: str, home_index: int) -> list[TokenState]:
-        return [t for t in self.tokens if t.color == color and t.at_home_index(home_index)]
+        return [t for t in self.get_tokens_by_color(color) if t.at_home_index(home_index)]
+
+    def _sole_occupant(self, path_index: int) -> Optional[tuple[int, int]]:
+        """Return (color_slot, count) when only one color occupies the square."""
+        packed = self.occupancy[path_index]
+        if not packed:
+            return None
+        shift = (packed.bit_length() - 1) // _OCCUPANCY_BITS * _OCCUPANCY_BITS
+        count = packed >> shift
+        if count << shift != packed:
+            return None
+        return (shift // _OCCUPANCY_BITS, count)
 
     def is_blocked(self, path_index: int, moving_color: str) -> bool:
         """Block = two or more tokens of same color on same square (others cannot pass/land)."""
-        at = self.get_tokens_at_path(path_index)
-        if len(at) < 2:
+        occupant = self._sole_occupant(path_index)
+        if occupant is None or occupant[1] < 2:
             return False
-        return all(t.color == at[0].color for t in at) and at[0].color != moving_color
+        return self.active_colors[occupant[0]] != moving_color
 
     def can_capture(self, path_index: int, moving_color: str) -> bool:
         """Can capture if one token of different color and not safe square."""
         if path_index in SAFE_PATH_INDEXES:
             return False
-        at = self.get_tokens_at_path(path_index)
-        if len(at) != 1:
+        occupant = self._sole_occupant(path_index)
+        if occupant is None or occupant[1] != 1:
             return False
-        return at[0].color != moving_color
+        return self.active_colors[occupant[0]] != moving_color
+
+    def is_finished(self, color: str) -> bool:
+        color_slot = self._color_slots.get(color)
+        if color_slot is None:
+            return False
+        base = color_slot * TOKENS_PER_PLAYER
+        return all(code == FINISHED_CODE for code in self.positions[base:base + TOKENS_PER_PLAYER])
 
 
 class GameEngine:
@@ -143,20 +422,31 @@ class GameEngine:
             current_player_index=0,
             tokens=tokens,
             player_count=self.player_count,
-            active_colors=self.active_colors,
+            active_colors=list(self.active_colors),
         )
 
-    def roll_dice(self) -> int:
+    def roll_dice(self, rng: Optional[random.Random] = None) -> int:
         # Weighted roll: 6 appears with 1/3 probability; 1-5 share the remaining 2/3.
         # weights sum = 15; 6 gets weight 5 → 5/15 = 1/3
-        return random.choices([1, 2, 3, 4, 5, 6], weights=[2, 2, 2, 2, 2, 5], k=1)[0]
+        # Pass a seeded rng to make rolls reproducible.
+        return (rng or random).choices([1, 2, 3, 4, 5, 6], weights=[2, 2, 2, 2, 2, 5], k=1)[0]
 
     def chance_options(self) -> list[dict]:
         return [dict(option) for option in CHANCE_OPTIONS]
 
-    def apply_random_chance(self, state: GameEngineState) -> tuple[str, int]:
-        option = random.choice(CHANCE_OPTIONS)
-        option_id = option["id"]
+    def draw_chance(self, rng: Optional[random.Random] = None) -> str:
+        """Pick a chance option id; pass a seeded rng to make it reproducible."""
+        return (rng or random).choice(CHANCE_OPTIONS)["id"]
+
+    def apply_random_chance(
+        self,
+        state: GameEngineState,
+        rng: Optional[random.Random] = None,
+    ) -> tuple[str, int]:
+        return self.apply_chance(state, self.draw_chance(rng))
+
+    def apply_chance(self, state: GameEngineState, option_id: str) -> tuple[str, int]:
+        """Apply a chance option. Returns (message, turns to advance)."""
         if option_id == "opponent_most_advanced_back_4":
             return (self._chance_opponent_back_4(state), 1)
         if option_id == "advance_all_mine_by_1":
@@ -172,46 +462,52 @@ class GameEngine:
         Returns list of (color, token_index) that can move with this roll.
         Token index 0-3 for that color.
         """
-        if state.winner_index is not None:
+        return [(option.color, option.token_index) for option in self.move_options(state, roll)]
+
+    def move_options(self, state: GameEngineState, roll: int) -> list[MoveOption]:
+        """Return every legal move for the current player with its destination, in one pass."""
+        if state.winner_index is not None or roll < 1 or roll > 6:
             return []
         color = state.active_colors[state.current_player_index]
-        tokens = self.get_tokens_by_color(state, color)
-        moves: list[tuple[str, int]] = []
+        base = state.current_player_index * TOKENS_PER_PLAYER
+        options: list[MoveOption] = []
 
-        for t in tokens:
-            if self._can_move_token(state, t, roll):
-                moves.append((t.color, t.token_index))
+        for token_index in range(TOKENS_PER_PLAYER):
+            destination = self._destination_code(state, color, state.positions[base + token_index], roll)
+            if destination is None:
+                continue
+            kind, path_index, home_index = decode_position(destination)
+            options.append(MoveOption(color, token_index, kind, path_index, home_index))
 
-        return moves
+        return options
 
-    def _can_move_token(self, state: GameEngineState, token: TokenState, roll: int) -> bool:
-        if token.kind == TokenPositionKind.YARD:
-            return roll == 6
-        if token.kind == TokenPositionKind.PATH:
-            return self._can_advance_on_path(state, token, roll)
-        if token.kind == TokenPositionKind.HOME:
-            return self._can_advance_in_home(token, roll)
-        return False
-
-    def _can_advance_on_path(self, state: GameEngineState, token: TokenState, roll: int) -> bool:
-        assert token.path_index is not None
-        destination = self._path_destination(token, roll)
-        if destination[0] == TokenPositionKind.HOME:
-            return destination[2] is not None
-        new_path = destination[1]
-        if new_path is None:
-            return False
-        if state.is_blocked(new_path, token.color):
-            return False
-        return True
+    def _destination_code(
+        self,
+        state: GameEngineState,
+        color: str,
+        code: int,
+        roll: int,
+    ) -> Optional[int]:
+        """Destination code for a token of ``color`` at ``code``, or None if it cannot move."""
+        if roll < 1 or roll > 6:
+            return None
+        destination = MOVE_TABLE[color][code][roll]
+        if destination is None:
+            return None
+        if (
+            PATH_CODE_BASE <= code < HOME_CODE_BASE
+            and destination < HOME_CODE_BASE
+            and state.is_blocked(destination - PATH_CODE_BASE, color)
+        ):
+            return None
+        return destination
 
-    def _can_advance_in_home(self, token: TokenState, roll: int) -> bool:
-        assert token.home_index is not None
-        next_idx = token.home_index + roll
-        return next_idx <= 5
+    def _can_move_token(self, state: GameEngineState, token: TokenState, roll: int) -> bool:
+        code = encode_position(token.kind, token.path_index, token.home_index)
+        return self._destination_code(state, token.color, code, roll) is not None
 
     def get_tokens_by_color(self, state: GameEngineState, color: str) -> list[TokenState]:
-        return [t for t in state.tokens if t.color == color]
+        return state.get_tokens_by_color(color)
 
     def get_move_destination(
         self,
@@ -220,26 +516,11 @@ class GameEngine:
         roll: int,
     ) -> Optional[tuple[TokenPositionKind, Optional[int], Optional[int]]]:
         """Return expected destination (kind, path_index, home_index) for a move."""
-        if not self._can_move_token(state, token, roll):
+        code = encode_position(token.kind, token.path_index, token.home_index)
+        destination = self._destination_code(state, token.color, code, roll)
+        if destination is None:
             return None
-        if token.kind == TokenPositionKind.YARD:
-            return (TokenPositionKind.PATH, START_PATH_INDEX[token.color], None)
-        if token.kind == TokenPositionKind.PATH:
-            assert token.path_index is not None
-            kind, new_path, new_home = self._path_destination(token, roll)
-            if kind == TokenPositionKind.HOME:
-                return (kind, None, new_home)
-            if new_path is None:
-                return None
-            if state.is_blocked(new_path, token.color):
-                return None
-            return (TokenPositionKind.PATH, new_path, None)
-        if token.kind == TokenPositionKind.HOME:
-            assert token.home_index is not None
-            next_idx = token.home_index + roll
-            if next_idx <= 5:
-                return (TokenPositionKind.HOME, None, next_idx)
-        return None
+        return decode_position(destination)
 
     def apply_move(
         self,
@@ -252,10 +533,7 @@ class GameEngine:
         Apply move for token (color, token_index). Assumes move is valid.
         Returns MoveResult; does not mutate state (caller must build new state).
         """
-        token = next(
-            (t for t in state.tokens if t.color == color and t.token_index == token_index),
-            None,
-        )
+        token = state.get_token(color, token_index)
         if not token or not self._can_move_token(state, token, roll):
             return MoveResult(moved=False, extra_turn=False, message="Invalid move")
 
@@ -354,19 +632,11 @@ class GameEngine:
     ) -> tuple[TokenPositionKind, Optional[int], Optional[int]]:
         """Resolve destination from PATH considering color-specific home entrance."""
         assert token.path_index is not None
-        start = START_PATH_INDEX[token.color]
-        entrance = HOME_ENTRANCE_PATH[token.color]
-        steps_to_entrance = (entrance - start) % PATH_LENGTH
-        # Distance traveled on color route since leaving yard: 0..51
-        traveled = (token.path_index - start) % PATH_LENGTH
-        # After passing entrance tile, movement continues in the 5-cell home lane.
-        if traveled + roll > steps_to_entrance:
-            home_index = traveled + roll - steps_to_entrance - 1
-            if home_index > 5:
-                return (TokenPositionKind.HOME, None, None)
-            return (TokenPositionKind.HOME, None, home_index)
-        new_path = (token.path_index + roll) % PATH_LENGTH
-        return (TokenPositionKind.PATH, new_path, None)
+        destination = MOVE_TABLE[token.color][PATH_CODE_BASE + token.path_index][roll]
+        if destination is None:
+            # Overshot the last home cell.
+            return (TokenPositionKind.HOME, None, None)
+        return decode_position(destination)
 
     def _apply_home_move(
         self,
@@ -406,39 +676,23 @@ class GameEngine:
         old_token: TokenState,
         new_token: TokenState,
     ) -> None:
-        for i, t in enumerate(state.tokens):
-            if t.color == old_token.color and t.token_index == old_token.token_index:
-                state.tokens[i] = new_token
-                return
+        state.set_token(new_token)
 
     def _check_winner(self, state: GameEngineState, color: str) -> bool:
-        home_tokens = [t for t in state.tokens if t.color == color and t.kind == TokenPositionKind.HOME]
-        return len(home_tokens) == TOKENS_PER_PLAYER and all(
-            t.home_index == 5 for t in home_tokens
-        )
+        return state.is_finished(color)
 
     def _route_progress(self, token: TokenState) -> Optional[int]:
         if token.kind != TokenPositionKind.PATH or token.path_index is None:
             return None
-        start = START_PATH_INDEX[token.color]
-        return (token.path_index - start) % PATH_LENGTH
+        return ROUTE_PROGRESS[token.color][token.path_index]
 
     def _is_before_home_lane(self, token: TokenState) -> bool:
-        progress = self._route_progress(token)
-        if progress is None:
+        if token.kind != TokenPositionKind.PATH or token.path_index is None:
             return False
-        start = START_PATH_INDEX[token.color]
-        entrance = HOME_ENTRANCE_PATH[token.color]
-        steps_to_entrance = (entrance - start) % PATH_LENGTH
-        return progress <= steps_to_entrance
+        return BEFORE_HOME_LANE[token.color][token.path_index]
 
     def _nearest_start_path(self, path_index: int) -> int:
-        def circular_distance(target: int) -> tuple[int, int]:
-            forward = (target - path_index) % PATH_LENGTH
-            backward = (path_index - target) % PATH_LENGTH
-            return (min(forward, backward), target)
-
-        return min(SAFE_PATH_INDEXES, key=circular_distance)
+        return NEAREST_START_PATH[path_index]
 
     def _chance_opponent_back_4(self, state: GameEngineState) -> str:
         current_color = state.active_colors[state.current_player_index]
@@ -450,12 +704,10 @@ class GameEngine:
         if not opponent_tokens:
             return "Chance: no opponent coin on track to move back."
 
-        def progress(token: TokenState) -> int:
-            start = START_PATH_INDEX[token.color]
-            assert token.path_index is not None
-            return (token.path_index - start) % PATH_LENGTH
-
-        target = max(opponent_tokens, key=lambda t: (progress(t), -t.token_index))
+        target = max(
+            opponent_tokens,
+            key=lambda t: (ROUTE_PROGRESS[t.color][t.path_index], -t.token_index),
+        )
         assert target.path_index is not None
         new_path = (target.path_index - 4) % PATH_LENGTH
         moved_token = TokenState(
@@ -471,10 +723,7 @@ class GameEngine:
         current_color = state.active_colors[state.current_player_index]
         moved_count = 0
         for token_index in range(TOKENS_PER_PLAYER):
-            token = next(
-                (t for t in state.tokens if t.color == current_color and t.token_index == token_index),
-                None,
-            )
+            token = state.get_token(current_color, token_index)
             if token is None or not self._can_move_token(state, token, 1):
                 continue
             if token.kind == TokenPositionKind.PATH:
@@ -512,13 +761,12 @@ class GameEngine:
         if not candidates:
             return "Chance: no eligible coin could move to a start tile."
 
-        own_start = START_PATH_INDEX[current_color]
+        progress_table = ROUTE_PROGRESS[current_color]
 
         def closeness_to_own_start(token: TokenState) -> tuple[int, int]:
             assert token.path_index is not None
-            forward = (token.path_index - own_start) % PATH_LENGTH
-            backward = (own_start - token.path_index) % PATH_LENGTH
-            return (min(forward, backward), token.token_index)
+            forward = progress_table[token.path_index]
+            return (min(forward, PATH_LENGTH - forward), token.token_index)
 
         target = min(candidates, key=closeness_to_own_start)
         assert target.path_index is not None
@@ -535,16 +783,35 @@ class GameEngine:
         )
 
 
+_ENGINE_CACHE: dict[tuple[str, ...], GameEngine] = {}
+
+
+def get_engine(player_count: int, active_colors: Optional[list[str]] = None) -> GameEngine:
+    """Return a shared engine for a seating; engines hold no per-game state."""
+    player_count = min(4, max(2, player_count))
+    if active_colors is None:
+        active_colors = list(ACTIVE_COLORS_BY_COUNT.get(player_count, COLORS[:player_count]))
+    key = tuple(active_colors)
+    engine = _ENGINE_CACHE.get(key)
+    if engine is None:
+        engine = GameEngine(player_count=player_count)
+        engine.active_colors = list(active_colors)
+        engine.color_index = {c: i for i, c in enumerate(engine.active_colors)}
+        _ENGINE_CACHE[key] = engine
+    return engine
+
+
 def state_to_dict(state: GameEngineState) -> dict:
     """Serialize engine state for API/JSON."""
     tokens_data = []
-    for t in state.tokens:
+    for slot, code in enumerate(state.positions):
+        kind, path_index, home_index = decode_position(code)
         tokens_data.append({
-            "color": t.color,
-            "token_index": t.token_index,
-            "kind": t.kind.value,
-            "path_index": t.path_index,
-            "home_index": t.home_index,
+            "color": state.active_colors[slot // TOKENS_PER_PLAYER],
+            "token_index": slot % TOKENS_PER_PLAYER,
+            "kind": kind.value,
+            "path_index": path_index,
+            "home_index": home_index,
         })
     return {
         "current_player_index": state.current_player_index,
@@ -591,3 +858,19 @@ def advance_turn(state: GameEngineState) -> None:
     state.current_player_index = (state.current_player_index + 1) % len(state.active_colors)
     state.last_roll = None
     state.has_rolled = False
+
+
+def end_move_turn(state: GameEngineState, result: MoveResult) -> None:
+    """After a move: pass the turn on, or clear the roll when it earned an extra turn."""
+    if not result.extra_turn:
+        advance_turn(state)
+    else:
+        state.last_roll = None
+        state.has_rolled = False
+
+
+def end_chance_turn(state: GameEngineState, turns_to_advance: int) -> None:
+    """After a chance play: advance (skipping players if needed) unless someone won."""
+    if state.winner_index is None:
+        for _ in range(max(1, turns_to_advance)):
+            advance_turn(state)
@@ -0,0 +1,538 @@
+"""
+Lobby storage behind one interface.
+
+``InMemoryLobbyStore`` keeps live ``LobbyRecord`` objects in this process (the
+original single-worker behaviour). ``SqliteLobbyStore`` keeps serialized
+lobbies in a SQLite file shared by every worker on the box; each row carries a
+version and ``save`` only succeeds against the version that was loaded, so two
+workers cannot silently overwrite each other's moves.
+
+The in-memory store is bounded: idle and least recently used lobbies without
+open sockets are written to the database and dropped, and come back through
+the usual restore path on their next request.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, delete, event, insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.services.game_engine import GameEngineState, dict_to_state, state_to_dict
+from app.services.persistence import discard_pending
+
+logger = logging.getLogger(__name__)
+
+SpillFn = Callable[[list["LobbyRecord"]], Awaitable[None]]
+InUseFn = Callable[[str], bool]
+
+
+@dataclass
+class PlayerRecord:
+    player_id: str
+    color: str
+    player_index: int
+    display_name: str
+    ready: bool = False
+    connected: bool = False
+    user_id: Optional[int] = None
+    is_bot: bool = False  # seat played by the server (bot_players), never by a client
+
+
+@dataclass
+class LobbyRecord:
+    game_id: str
+    player_count: int
+    players: list[PlayerRecord] = field(default_factory=list)
+    status: str = "waiting"          # "waiting" | "active" | "paused" | "finished"
+    engine_state: Optional[GameEngineState] = None  # live state; None until all players ready
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    resume_ready_set: set = field(default_factory=set)  # player_ids who clicked resume
+    state_version: int = 0  # bumped on every broadcast game snapshot
+    last_game_snapshot: Optional[dict] = None  # last broadcast GameState, base for deltas
+    seed: Optional[int] = None  # per-game RNG seed; rolls and chance draws derive from it
+    action_seq: int = 0  # seq of the last entry appended to the action log
+    store_version: int = 0  # LobbyStore row version this copy was loaded at
+    # Action-log entries produced by this copy; appended to the log once the lobby is saved.
+    pending_actions: list = field(default_factory=list, repr=False)
+    # User ids the store's user -> games index currently lists for this lobby.
+    indexed_user_ids: frozenset = field(default_factory=frozenset, repr=False)
+    # Lookup maps over ``players``; change seats through add_player / bind_user to keep them current.
+    _by_player_id: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_user_id: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_color: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_index: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.reindex_players()
+
+    def reindex_players(self) -> None:
+        """Rebuild the lookup maps from ``players``."""
+        self._by_player_id = {}
+        self._by_user_id = {}
+        self._by_color = {}
+        self._by_index = {}
+        for player in self.players:
+            self._index_player(player)
+
+    def _index_player(self, player: PlayerRecord) -> None:
+        # The first seat in ``players`` wins on duplicates, as a linear scan would.
+        self._by_player_id.setdefault(player.player_id, player)
+        self._by_color.setdefault(player.color, player)
+        self._by_index.setdefault(player.player_index, player)
+        if player.user_id is not None:
+            self._by_user_id.setdefault(player.user_id, player)
+
+    def add_player(self, player: PlayerRecord) -> None:
+        self.players.append(player)
+        self._index_player(player)
+
+    def bind_user(self, player: PlayerRecord, user_id: Optional[int]) -> None:
+        if player.user_id == user_id:
+            return
+        player.user_id = user_id
+        self._by_user_id = {}
+        for seat in self.players:
+            if seat.user_id is not None:
+                self._by_user_id.setdefault(seat.user_id, seat)
+
+    def player_by_id(self, player_id: Optional[str]) -> Optional[PlayerRecord]:
+        return self._by_player_id.get(player_id) if player_id else None
+
+    def player_by_user(self, user_id: Optional[int]) -> Optional[PlayerRecord]:
+        return self._by_user_id.get(user_id) if user_id is not None else None
+
+    def player_by_color(self, color: Optional[str]) -> Optional[PlayerRecord]:
+        return self._by_color.get(color) if color is not None else None
+
+    def player_by_index(self, player_index: int) -> Optional[PlayerRecord]:
+        return self._by_index.get(player_index)
+
+    def user_ids(self) -> frozenset:
+        return frozenset(self._by_user_id)
+
+
+class LobbyConflictError(Exception):
+    """The lobby was changed by someone else since this copy was loaded."""
+
+
+def lobby_to_dict(lobby: LobbyRecord) -> dict:
+    return {
+        "game_id": lobby.game_id,
+        "player_count": lobby.player_count,
+        "players": [asdict(player) for player in lobby.players],
+        "status": lobby.status,
+        "engine_state": state_to_dict(lobby.engine_state) if lobby.engine_state is not None else None,
+        "created_at": lobby.created_at.isoformat(),
+        "resume_ready_set": sorted(lobby.resume_ready_set),
+        "state_version": lobby.state_version,
+        "last_game_snapshot": lobby.last_game_snapshot,
+        "seed": lobby.seed,
+        "action_seq": lobby.action_seq,
+    }
+
+
+def dict_to_lobby(data: dict, store_version: int = 0) -> LobbyRecord:
+    lobby = LobbyRecord(
+        game_id=data["game_id"],
+        player_count=data["player_count"],
+        players=[PlayerRecord(**player) for player in data["players"]],
+        status=data["status"],
+        engine_state=dict_to_state(data["engine_state"]) if data.get("engine_state") else None,
+        created_at=datetime.fromisoformat(data["created_at"]),
+        resume_ready_set=set(data.get("resume_ready_set", [])),
+        state_version=data.get("state_version", 0),
+        last_game_snapshot=data.get("last_game_snapshot"),
+        seed=data.get("seed"),
+        action_seq=data.get("action_seq", 0),
+        store_version=store_version,
+    )
+    lobby.indexed_user_ids = lobby.user_ids()
+    return lobby
+
+
+class LobbyStore(ABC):
+    """Where live lobbies are kept. All lobby access in the API goes through this."""
+
+    async def start(self) -> None:
+        """Prepare the backing storage (called from the app lifespan)."""
+
+    async def close(self) -> None:
+        """Release the backing storage."""
+
+    @abstractmethod
+    async def get(self, game_id: str) -> Optional[LobbyRecord]:
+        """The lobby for ``game_id``, or None if it is not live."""
+
+    @abstractmethod
+    async def add(self, lobby: LobbyRecord) -> None:
+        """Insert a new lobby; raises LobbyConflictError if the game id is taken."""
+
+    @abstractmethod
+    async def save(self, lobby: LobbyRecord) -> None:
+        """Write back a loaded lobby; raises LobbyConflictError if it changed meanwhile."""
+
+    @abstractmethod
+    async def delete(self, game_id: str) -> Optional[LobbyRecord]:
+        """Remove the lobby and return it, or None if it was not live."""
+
+    @abstractmethod
+    async def all(self) -> list[LobbyRecord]:
+        """Every live lobby."""
+
+    @abstractmethod
+    async def games_for_user(self, user_id: int) -> list[LobbyRecord]:
+        """Live lobbies the user has a seat in, without scanning every lobby."""
+
+    def note_user(self, lobby: LobbyRecord, user_id: int) -> None:
+        """A user was bound to a seat outside of ``save``; index it right away if needed."""
+
+    def start_eviction(self, spill: SpillFn, in_use: InUseFn) -> None:
+        """
+        Bound the lobbies held in memory, where the backend holds any.
+
+        ``spill`` writes lobbies to the database before they are dropped;
+        ``in_use(game_id)`` pins games that must stay resident.
+        """
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryLobbyStore(LobbyStore):
+    """
+    Lobbies as live objects in a dict; only valid with a single worker process.
+
+    Once eviction is started, a sweep every ``sweep_seconds`` (or as soon as
+    ``max_games`` is exceeded) spills and drops lobbies unused for
+    ``idle_seconds``, then the least recently used ones until at most
+    ``max_games`` remain. Games ``in_use`` are never dropped.
+    """
+
+    def __init__(
+        self,
+        max_games: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        sweep_seconds: Optional[float] = None,
+    ) -> None:
+        self.max_games = max_games if max_games is not None else settings.lobby_cache_max_games
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings.lobby_cache_idle_seconds
+        self.sweep_seconds = sweep_seconds if sweep_seconds is not None else settings.lobby_cache_sweep_seconds
+        # Least recently used first; last use is on the monotonic clock.
+        self._lobbies: OrderedDict[str, LobbyRecord] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        self._games_by_user: dict[int, set[str]] = {}
+        self._spill: Optional[SpillFn] = None
+        self._in_use: Optional[InUseFn] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.evicted = 0
+        self.spill_failures = 0
+        self.last_sweep_ms = 0.0
+
+    def _touch(self, game_id: str) -> None:
+        self._lobbies.move_to_end(game_id)
+        self._last_used[game_id] = time.monotonic()
+
+    def _reindex(self, lobby: LobbyRecord, user_ids: frozenset) -> None:
+        for user_id in lobby.indexed_user_ids - user_ids:
+            game_ids = self._games_by_user.get(user_id)
+            if game_ids is not None:
+                game_ids.discard(lobby.game_id)
+                if not game_ids:
+                    del self._games_by_user[user_id]
+        for user_id in user_ids - lobby.indexed_user_ids:
+            self._games_by_user.setdefault(user_id, set()).add(lobby.game_id)
+        lobby.indexed_user_ids = user_ids
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, game_id: str) -> Optional[LobbyRecord]:
+        lobby = self._lobbies.get(game_id)
+        if lobby is not None:
+            self._touch(game_id)
+        return lobby
+
+    async def add(self, lobby: LobbyRecord) -> None:
+        if lobby.game_id in self._lobbies:
+            raise LobbyConflictError(lobby.game_id)
+        self._lobbies[lobby.game_id] = lobby
+        self._touch(lobby.game_id)
+        self._reindex(lobby, lobby.user_ids())
+        if self._wakeup is not None and len(self._lobbies) > self.max_games:
+            self._wakeup.set()
+
+    async def save(self, lobby: LobbyRecord) -> None:
+        # Handlers share the stored object, so the version check only fires
+        # for a copy that was replaced (e.g. deleted and recreated) meanwhile.
+        current = self._lobbies.get(lobby.game_id)
+        if current is not None and current is not lobby and current.store_version != lobby.store_version:
+            raise LobbyConflictError(lobby.game_id)
+        lobby.store_version += 1
+        self._lobbies[lobby.game_id] = lobby
+        self._touch(lobby.game_id)
+        self._reindex(lobby, lobby.user_ids())
+
+    async def delete(self, game_id: str) -> Optional[LobbyRecord]:
+        lobby = self._lobbies.pop(game_id, None)
+        self._last_used.pop(game_id, None)
+        if lobby is not None:
+            self._reindex(lobby, frozenset())
+        return lobby
+
+    async def all(self) -> list[LobbyRecord]:
+        return list(self._lobbies.values())
+
+    async def games_for_user(self, user_id: int) -> list[LobbyRecord]:
+        return [self._lobbies[game_id] for game_id in self._games_by_user.get(user_id, ())]
+
+    def note_user(self, lobby: LobbyRecord, user_id: int) -> None:
+        # Handlers mutate the stored object itself, so a binding is live even
+        # if the request fails before saving; keep the index in step with it.
+        if self._lobbies.get(lobby.game_id) is lobby and user_id not in lobby.indexed_user_ids:
+            self._reindex(lobby, lobby.indexed_user_ids | {user_id})
+
+    def start_eviction(self, spill: SpillFn, in_use: InUseFn) -> None:
+        self._spill = spill
+        self._in_use = in_use
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sweep_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.evict()
+            except Exception:
+                logger.exception("LOBBY_EVICT_FAILED")
+
+    async def evict(self) -> int:
+        """Spill and drop idle or excess lobbies now. Returns the number dropped."""
+        if self._spill is None or self._in_use is None:
+            return 0
+        started = time.monotonic()
+        excess = len(self._lobbies) - self.max_games
+        victims: list[LobbyRecord] = []
+        for game_id, lobby in self._lobbies.items():
+            idle = started - self._last_used[game_id]
+            if idle < self.idle_seconds and len(victims) >= excess:
+                break  # everything after this was used more recently
+            if not self._in_use(game_id):
+                victims.append(lobby)
+        if not victims:
+            return 0
+        try:
+            await self._spill(victims)
+        except Exception:
+            self.spill_failures += 1
+            logger.exception("LOBBY_SPILL_FAILED lobbies=%s", len(victims))
+            return 0
+        dropped = 0
+        for lobby in victims:
+            game_id = lobby.game_id
+            # Keep anything touched or picked up while the batch was being written.
+            if (
+                self._lobbies.get(game_id) is not lobby
+                or self._last_used[game_id] > started
+                or self._in_use(game_id)
+            ):
+                continue
+            del self._lobbies[game_id]
+            del self._last_used[game_id]
+            self._reindex(lobby, frozenset())
+            # Just written; a queued copy must not be flushed over a later restore.
+            discard_pending(game_id)
+            dropped += 1
+        self.evicted += dropped
+        self.last_sweep_ms = (time.monotonic() - started) * 1000
+        if dropped:
+            logger.info("LOBBIES_EVICTED count=%s resident=%s", dropped, len(self._lobbies))
+        return dropped
+
+    def stats(self) -> dict:
+        return {
+            "resident": len(self._lobbies),
+            "max_games": self.max_games,
+            "evicted": self.evicted,
+            "spill_failures": self.spill_failures,
+            "last_sweep_ms": round(self.last_sweep_ms, 3),
+        }
+
+
+_metadata = MetaData()
+lobby_table = Table(
+    "lobbies",
+    _metadata,
+    Column("game_id", String(36), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("payload_json", Text, nullable=False),
+)
+lobby_user_table = Table(
+    "lobby_users",
+    _metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("game_id", String(36), primary_key=True, index=True),
+)
+
+
+class SqliteLobbyStore(LobbyStore):
+    """
+    Lobbies serialized into a SQLite file shared by all worker processes.
+
+    Every ``get`` returns a fresh copy. ``save`` is a compare-and-set on the
+    row version (``UPDATE ... WHERE version = :loaded``). ``lobby_users``
+    indexes seats by user id and is updated in the same transaction.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._engine = create_async_engine(f"sqlite+aiosqlite:///{path}", echo=False)
+        event.listen(self._engine.sync_engine, "connect", self._configure_connection)
+        self.conflicts = 0
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, _record) -> None:
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers in other workers proceed while one worker writes.
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    async def start(self) -> None:
+        try:
+            async with self._engine.begin() as conn:
+                await conn.run_sync(_metadata.create_all)
+        except OperationalError:
+            # Another worker created the table at the same moment.
+            async with self._engine.begin() as conn:
+                await conn.run_sync(_metadata.create_all)
+
+    async def close(self) -> None:
+        await self._engine.dispose()
+
+    async def get(self, game_id: str) -> Optional[LobbyRecord]:
+        async with self._engine.connect() as conn:
+            row = (
+                await conn.execute(
+                    select(lobby_table.c.version, lobby_table.c.payload_json)
+                    .where(lobby_table.c.game_id == game_id)
+                )
+            ).first()
+        if row is None:
+            return None
+        return dict_to_lobby(json.loads(row.payload_json), store_version=row.version)
+
+    @staticmethod
+    async def _reindex(conn, lobby: LobbyRecord, user_ids: frozenset) -> None:
+        removed = lobby.indexed_user_ids - user_ids
+        added = user_ids - lobby.indexed_user_ids
+        if removed:
+            await conn.execute(
+                delete(lobby_user_table)
+                .where(lobby_user_table.c.game_id == lobby.game_id)
+                .where(lobby_user_table.c.user_id.in_(removed))
+            )
+        if added:
+            await conn.execute(
+                insert(lobby_user_table).prefix_with("OR IGNORE"),
+                [{"user_id": user_id, "game_id": lobby.game_id} for user_id in added],
+            )
+
+    async def add(self, lobby: LobbyRecord) -> None:
+        user_ids = lobby.user_ids()
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(
+                    insert(lobby_table).values(
+                        game_id=lobby.game_id,
+                        version=1,
+                        payload_json=json.dumps(lobby_to_dict(lobby)),
+                    )
+                )
+                await self._reindex(conn, lobby, user_ids)
+        except IntegrityError:
+            self.conflicts += 1
+            raise LobbyConflictError(lobby.game_id) from None
+        lobby.store_version = 1
+        lobby.indexed_user_ids = user_ids
+
+    async def save(self, lobby: LobbyRecord) -> None:
+        user_ids = lobby.user_ids()
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                update(lobby_table)
+                .where(lobby_table.c.game_id == lobby.game_id)
+                .where(lobby_table.c.version == lobby.store_version)
+                .values(
+                    version=lobby.store_version + 1,
+                    payload_json=json.dumps(lobby_to_dict(lobby)),
+                )
+            )
+            if result.rowcount == 1:
+                await self._reindex(conn, lobby, user_ids)
+        if result.rowcount != 1:
+            self.conflicts += 1
+            raise LobbyConflictError(lobby.game_id)
+        lobby.store_version += 1
+        lobby.indexed_user_ids = user_ids
+
+    async def delete(self, game_id: str) -> Optional[LobbyRecord]:
+        lobby = await self.get(game_id)
+        if lobby is None:
+            return None
+        async with self._engine.begin() as conn:
+            await conn.execute(delete(lobby_table).where(lobby_table.c.game_id == game_id))
+            await conn.execute(delete(lobby_user_table).where(lobby_user_table.c.game_id == game_id))
+        return lobby
+
+    async def all(self) -> list[LobbyRecord]:
+        async with self._engine.connect() as conn:
+            rows = (
+                await conn.execute(select(lobby_table.c.version, lobby_table.c.payload_json))
+            ).all()
+        return [dict_to_lobby(json.loads(row.payload_json), store_version=row.version) for row in rows]
+
+    async def games_for_user(self, user_id: int) -> list[LobbyRecord]:
+        async with self._engine.connect() as conn:
+            rows = (
+                await conn.execute(
+                    select(lobby_table.c.version, lobby_table.c.payload_json)
+                    .join(lobby_user_table, lobby_user_table.c.game_id == lobby_table.c.game_id)
+                    .where(lobby_user_table.c.user_id == user_id)
+                )
+            ).all()
+        return [dict_to_lobby(json.loads(row.payload_json), store_version=row.version) for row in rows]
+
+
+def create_lobby_store(backend: Optional[str] = None) -> LobbyStore:
+    backend = backend or settings.lobby_store_backend
+    if backend == "memory":
+        return InMemoryLobbyStore()
+    if backend == "sqlite":
+        return SqliteLobbyStore(settings.lobby_store_path)
+    raise ValueError(f"Unknown lobby store backend: {backend!r}")
+
+
+lobby_store = create_lobby_store()
@@ -0,0 +1,242 @@
+"""
+Win-probability estimates for live games.
+
+Each estimate plays the position out many times to the end with random legal
+moves, the engine's weighted die and (at ``chance_rate`` of turns) a chance
+draw, on the compact rules ``bot_search`` uses, and counts who won. Rollouts
+run in a process pool under a time budget; results are cached per position
+hash (``GameEngineState.zobrist``), so any state change is a new key and all
+spectators of one position share a single estimate.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.services.bot_search import CHANCE_IDS, apply_chance, compact_rules
+from app.services.game_engine import (
+    FINISHED_CODE,
+    HOME_CODE_BASE,
+    PATH_CODE_BASE,
+    SAFE_PATH_INDEXES,
+    TOKENS_PER_PLAYER,
+)
+
+logger = logging.getLogger(__name__)
+
+# GameEngine.roll_dice's weighted die, one entry per equally likely outcome.
+_DIE = (1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 6, 6, 6)
+# A rollout longer than this many actions is counted as unfinished.
+MAX_ROLLOUT_ACTIONS = 5000
+# Estimates always rest on at least this many rollouts, whatever the time budget.
+MIN_ROLLOUTS = 32
+
+
+@dataclass(frozen=True)
+class OddsRequest:
+    active_colors: tuple[str, ...]
+    positions: bytes  # GameEngineState.positions
+    seat: int  # current_player_index
+    roll: Optional[int] = None  # the roll still to be moved with, None before rolling
+    seed: int = 0  # the position hash, so one position always gets the same estimate
+    chance_rate: float = 0.0  # share of turns that play chance instead of rolling
+    time_budget: float = 0.2  # seconds
+    max_rollouts: int = 2000
+
+
+@dataclass(frozen=True)
+class OddsEstimate:
+    wins: tuple[int, ...]  # rollouts won, per seat
+    rollouts: int
+    elapsed_ms: float = 0.0
+
+    @property
+    def probabilities(self) -> tuple[float, ...]:
+        finished = sum(self.wins)
+        if not finished:
+            return tuple(1 / len(self.wins) for _ in self.wins)
+        return tuple(won / finished for won in self.wins)
+
+
+def _destinations(rules, board: bytearray, seat: int, roll: int) -> list[tuple[int, int]]:
+    """(slot, destination) for every legal move, as bot_search.legal_moves without copying the board."""
+    moves = []
+    table = rules.move[seat]
+    base = seat * TOKENS_PER_PLAYER
+    for slot in range(base, base + TOKENS_PER_PLAYER):
+        code = board[slot]
+        destination = table[code][roll]
+        if destination is None:
+            continue
+        if PATH_CODE_BASE <= code < HOME_CODE_BASE and destination < HOME_CODE_BASE and board.count(destination) >= 2:
+            owners = {other // TOKENS_PER_PLAYER for other, at in enumerate(board) if at == destination}
+            if len(owners) == 1 and seat not in owners:
+                continue
+        moves.append((slot, destination))
+    return moves
+
+
+def _move(board: bytearray, seat: int, slot: int, destination: int) -> bool:
+    """Apply a legal move in place, capturing a lone opponent on the track; whether it won the game."""
+    if PATH_CODE_BASE <= board[slot] < HOME_CODE_BASE and destination < HOME_CODE_BASE:
+        if destination - PATH_CODE_BASE not in SAFE_PATH_INDEXES and board.count(destination) == 1:
+            victim = board.index(destination)
+            if victim // TOKENS_PER_PLAYER != seat:
+                board[victim] = 0
+    board[slot] = destination
+    if destination != FINISHED_CODE:
+        return False
+    base = seat * TOKENS_PER_PLAYER
+    return board.count(FINISHED_CODE, base, base + TOKENS_PER_PLAYER) == TOKENS_PER_PLAYER
+
+
+def _rollout(rules, positions: bytes, seat: int, roll: Optional[int], rng: random.Random, chance_rate: float) -> Optional[int]:
+    """Play one game out from the position; the winning seat, or None if it ran too long."""
+    seats = rules.seats
+    board = bytearray(positions)
+    draw = rng.random  # int(draw() * n) instead of randrange: this loop is all the estimate does
+    for _ in range(MAX_ROLLOUT_ACTIONS):
+        if roll is None:
+            if chance_rate and draw() < chance_rate:
+                after, won, turns = apply_chance(rules, bytes(board), seat, CHANCE_IDS[int(draw() * len(CHANCE_IDS))])
+                if won:
+                    return seat
+                board[:] = after
+                seat = (seat + turns) % seats
+                continue
+            roll = _DIE[int(draw() * len(_DIE))]
+        moves = _destinations(rules, board, seat, roll)
+        if moves:
+            slot, destination = moves[int(draw() * len(moves))] if len(moves) > 1 else moves[0]
+            if _move(board, seat, slot, destination):
+                return seat
+        if roll != 6 or not moves:
+            seat = (seat + 1) % seats
+        roll = None
+    return None
+
+
+def estimate(request: OddsRequest) -> OddsEstimate:
+    """Roll the position out until the time budget or max_rollouts runs out."""
+    started = time.perf_counter()
+    deadline = started + request.time_budget
+    rules = compact_rules(request.active_colors)
+    rng = random.Random(request.seed)
+    wins = [0] * rules.seats
+    rollouts = 0
+    while rollouts < request.max_rollouts and (rollouts < MIN_ROLLOUTS or time.perf_counter() < deadline):
+        winner = _rollout(rules, request.positions, request.seat, request.roll, rng, request.chance_rate)
+        if winner is not None:
+            wins[winner] += 1
+        rollouts += 1
+    return OddsEstimate(
+        wins=tuple(wins),
+        rollouts=rollouts,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+class OddsBusy(Exception):
+    """Raised when max_pending estimates are already running or queued."""
+
+
+class OddsService:
+    """
+    Cached, coalesced rollout estimates on a small process pool.
+
+    Concurrent requests for a position that is already being estimated wait
+    for that estimate instead of starting another one; finished estimates
+    stay in an LRU cache of ``cache_size`` positions.
+    """
+
+    def __init__(self, workers: int, cache_size: int, max_pending: int) -> None:
+        self.workers = max(1, workers)
+        self.cache_size = cache_size
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[int, OddsEstimate]" = OrderedDict()
+        self._inflight: dict[int, asyncio.Task] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.computed = 0
+        self.rejected = 0
+        self.failures = 0
+        self.total_compute_ms = 0.0
+        self.total_rollouts = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers only import the rules modules, not the app and its open sockets.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def estimate(self, key: int, request: OddsRequest) -> tuple[OddsEstimate, bool]:
+        """(estimate, served from cache) for the position hashed to ``key``."""
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached, True
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight), True
+        if self.max_pending > 0 and len(self._inflight) >= self.max_pending:
+            self.rejected += 1
+            raise OddsBusy()
+        task = asyncio.create_task(self._compute(key, request))
+        # Retrieved here so a failure nobody is still waiting for does not log "never retrieved".
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = task
+        return await asyncio.shield(task), False
+
+    async def _compute(self, key: int, request: OddsRequest) -> OddsEstimate:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool(), estimate, request)
+        except BrokenProcessPool:
+            self.failures += 1
+            logger.warning("ODDS_POOL_BROKEN workers=%s; restarting", self.workers)
+            self.shutdown()
+            raise
+        finally:
+            del self._inflight[key]
+        self.computed += 1
+        self.total_compute_ms += result.elapsed_ms
+        self.total_rollouts += result.rollouts
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": len(self._inflight),
+            "cached_positions": len(self._cache),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "computed": self.computed,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "avg_compute_ms": round(self.total_compute_ms / self.computed, 3) if self.computed else 0.0,
+            "avg_rollouts": round(self.total_rollouts / self.computed, 1) if self.computed else 0.0,
+        }
+
+
+odds_service = OddsService(settings.odds_workers, settings.odds_cache_size, settings.odds_max_pending)
@@ -0,0 +1,160 @@
+"""Write-behind persistence: coalesce dirty games and flush them in batches."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FlushFn = Callable[[list[Any]], Awaitable[None]]
+
+
+class WriteBehindQueue:
+    """
+    Collects dirty items by key and writes them in the background.
+
+    Marking the same key twice before a flush keeps only the latest item, so a
+    busy game costs one row write per flush. A flush runs every
+    ``interval`` seconds, or sooner once ``threshold`` keys are dirty.
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold: Optional[int] = None,
+    ) -> None:
+        self.interval = interval if interval is not None else settings.persist_flush_interval_seconds
+        self.threshold = threshold if threshold is not None else settings.persist_flush_threshold
+        self._dirty: dict[str, Any] = {}
+        self._flush_fn: Optional[FlushFn] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self.flushes = 0
+        self.items_written = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+
+    def start(self, flush_fn: FlushFn) -> None:
+        """Start the background flusher on the running event loop."""
+        self._flush_fn = flush_fn
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher, letting a flush in progress finish, and write everything still pending."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def mark_dirty(self, key: str, item: Any) -> None:
+        self._dirty[key] = item
+        if self._wakeup is not None and len(self._dirty) >= self.threshold:
+            self._wakeup.set()
+
+    def discard(self, key: str) -> bool:
+        """Forget a pending write, e.g. when the game is deleted or written synchronously."""
+        return self._dirty.pop(key, None) is not None
+
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    async def flush(self) -> int:
+        """Write all dirty items now. Returns the number of items written."""
+        if self._flush_fn is None or not self._dirty:
+            return 0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            batch, self._dirty = self._dirty, {}
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                await self._flush_fn(list(batch.values()))
+            except Exception:
+                self.failures += 1
+                logger.exception("PERSIST_FLUSH_FAILED items=%s", len(batch))
+                # Retry on the next flush unless a newer version was marked meanwhile.
+                for key, item in batch.items():
+                    self._dirty.setdefault(key, item)
+                return 0
+            except asyncio.CancelledError:
+                # Cancelled mid-write (e.g. the loop is shutting down): keep the batch.
+                for key, item in batch.items():
+                    self._dirty.setdefault(key, item)
+                raise
+            self.flushes += 1
+            self.items_written += len(batch)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            return len(batch)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._dirty),
+            "flushes": self.flushes,
+            "items_written": self.items_written,
+            "failures": self.failures,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
+
+
+class RecoveryStats:
+    """Timings for games rehydrated from their last persisted snapshot."""
+
+    def __init__(self) -> None:
+        self.restored = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, duration_ms: float) -> None:
+        self.restored += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.last_ms = duration_ms
+
+    def stats(self) -> dict:
+        return {
+            "restored": self.restored,
+            "avg_ms": round(self.total_ms / self.restored, 3) if self.restored else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+# Lifecycle changes (ready, pause, claim, finish, ...) flush quickly.
+persistence_queue = WriteBehindQueue()
+# Gameplay checkpoints: each live game is written at most once per interval,
+# however many rolls and moves it sees, so a crash loses at most that window.
+checkpoint_queue = WriteBehindQueue(
+    interval=settings.checkpoint_interval_seconds,
+    threshold=settings.checkpoint_flush_threshold,
+)
+recovery_stats = RecoveryStats()
+
+
+def discard_pending(key: str) -> bool:
+    """Drop pending lifecycle and checkpoint writes for a key; True if any existed."""
+    dropped_lifecycle = persistence_queue.discard(key)
+    dropped_checkpoint = checkpoint_queue.discard(key)
+    return dropped_lifecycle or dropped_checkpoint
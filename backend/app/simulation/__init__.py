@@ -0,0 +1 @@
+"""Headless play of the rules engine: self-play games, engine benchmarks and NumPy batch balance runs (no HTTP, no DB)."""
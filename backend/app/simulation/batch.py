@@ -0,0 +1,451 @@
+"""
+Batch self-play in lockstep on NumPy arrays, for dice and chance balance analysis.
+
+    python -m app.simulation.batch --players 2 3 4 --games 1000000 --chance-rate 0.1
+    python -m app.simulation.batch --players 2 --games 500000 --impact
+
+Thousands of games advance together: every step, each unfinished game plays
+one turn (a chance play with probability ``chance_rate``, otherwise a roll and
+a uniformly random legal move, like ``selfplay.random_policy``). Positions use
+the engine's position codes in an ``(games, seats, 4)`` array, and moves, blocks,
+captures and the four chance options are the engine's rules applied to whole
+arrays, so results match ``selfplay.play_games`` in distribution (not game by
+game; the random streams differ).
+
+``--impact`` answers "what does one chance option do for the player who uses
+it": seat 0 plays chance at ``chance_rate`` but always draws the same option,
+everyone else only rolls, and seat 0's win rate is compared with a run where
+nobody plays chance.
+
+NumPy is only needed here, not by the API server: ``pip install numpy``.
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from app.services.game_engine import (
+    ACTIVE_COLORS_BY_COUNT,
+    BEFORE_HOME_LANE,
+    CHANCE_OPTIONS,
+    COLORS,
+    FINISHED_CODE,
+    MOVE_TABLE,
+    NEAREST_START_PATH,
+    PATH_CODE_BASE,
+    PATH_LENGTH,
+    ROUTE_PROGRESS,
+    SAFE_PATH_INDEXES,
+    TOKENS_PER_PLAYER,
+)
+
+CHANCE_IDS = [option["id"] for option in CHANCE_OPTIONS]
+OPPONENT_BACK_4, ADVANCE_ALL_BY_1, SKIP_NEXT_PLAYER, CLOSEST_TO_START = range(4)
+CODES = FINISHED_CODE + 1
+DEFAULT_BATCH_SIZE = 65536
+DEFAULT_MAX_TURNS = 5000
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The batch simulator needs NumPy: pip install numpy")
+
+
+class _Tables:
+    """Engine lookup tables as arrays indexed by [seat, position code, ...]."""
+
+    def __init__(self, player_count: int) -> None:
+        colors = list(ACTIVE_COLORS_BY_COUNT.get(player_count, COLORS[:player_count]))
+        seats = len(colors)
+        self.seats = seats
+        # [seat, code, roll] -> destination code; 0 (the yard, never a destination) when the roll cannot be used.
+        move = np.zeros((seats, CODES, 7), dtype=np.int8)
+        # [seat, code] -> squares traveled since the start tile, -1 off the track.
+        self.progress = np.full((seats, CODES), -1, dtype=np.int16)
+        self.before_home = np.zeros((seats, CODES), dtype=bool)
+        for seat, color in enumerate(colors):
+            for code in range(CODES):
+                for roll in range(1, 7):
+                    destination = MOVE_TABLE[color][code][roll]
+                    if destination is not None:
+                        move[seat, code, roll] = destination
+            for path_index in range(PATH_LENGTH):
+                code = PATH_CODE_BASE + path_index
+                self.progress[seat, code] = ROUTE_PROGRESS[color][path_index]
+                self.before_home[seat, code] = BEFORE_HOME_LANE[color][path_index]
+        # Weighted die, as in GameEngine.roll_dice (weights 2,2,2,2,2,5): one face per fifteenth.
+        self.roll_faces = np.array([1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 6, 6, 6], dtype=np.int64)
+        self.move_flat = move.ravel()
+        self.move_by_1 = np.ascontiguousarray(move[:, :, 1]).ravel()
+        self.nearest_start = np.zeros(CODES, dtype=np.int8)
+        self.back_4 = np.zeros(CODES, dtype=np.int8)
+        self.safe = np.zeros(CODES, dtype=bool)
+        self.on_path = np.zeros(CODES, dtype=bool)
+        for path_index in range(PATH_LENGTH):
+            code = PATH_CODE_BASE + path_index
+            self.nearest_start[code] = PATH_CODE_BASE + NEAREST_START_PATH[path_index]
+            self.back_4[code] = PATH_CODE_BASE + (path_index - 4) % PATH_LENGTH
+            self.safe[code] = path_index in SAFE_PATH_INDEXES
+            self.on_path[code] = True
+
+
+@dataclass
+class BatchResult:
+    player_count: int
+    winners: "np.ndarray"        # seat index per game, -1 when max_turns was hit
+    turns: "np.ndarray"          # rolls plus chance plays per game
+    captures: "np.ndarray"       # captures made by moves (chance plays not counted, as in selfplay)
+    chance_plays: "np.ndarray"   # (games, 4): plays of each CHANCE_OPTIONS entry
+    seconds: float
+
+    def summary(self) -> dict:
+        games = len(self.winners)
+        finished = self.winners >= 0
+        turns = self.turns[finished]
+        return {
+            "player_count": self.player_count,
+            "games": games,
+            "games_per_sec": round(games / self.seconds, 1) if self.seconds else 0.0,
+            "win_rate_by_seat": [
+                round(float((self.winners == seat).sum()) / games, 4) for seat in range(self.player_count)
+            ],
+            "unfinished": int(games - finished.sum()),
+            "turns_mean": round(float(turns.mean()), 1) if len(turns) else 0.0,
+            "turns_p50": int(np.percentile(turns, 50)) if len(turns) else 0,
+            "turns_p90": int(np.percentile(turns, 90)) if len(turns) else 0,
+            "captures_mean": round(float(self.captures.mean()), 2) if games else 0.0,
+            "chance_plays": {
+                option_id: int(self.chance_plays[:, index].sum()) for index, option_id in enumerate(CHANCE_IDS)
+            },
+        }
+
+
+def _contest(
+    tables: _Tables,
+    board: "np.ndarray",
+    mover: "np.ndarray",
+    sources: "np.ndarray",
+    destinations: "np.ndarray",
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Blocked and capturing moves, one candidate move per game (``is_blocked`` / ``can_capture``).
+
+    Only a move from a track square to a track square can be blocked or
+    capture; leaving the yard and home-column moves never are.
+    """
+    occupied = np.zeros(len(mover), dtype=np.int8)
+    total = np.zeros(len(mover), dtype=np.int8)
+    own = np.zeros(len(mover), dtype=np.int8)
+    for seat in range(tables.seats):
+        count = (board[seat, 0] == destinations).astype(np.int8)
+        for token_index in range(1, TOKENS_PER_PLAYER):
+            count += board[seat, token_index] == destinations
+        occupied += count > 0
+        total += count
+        own += count * (mover == seat)
+    opponent = tables.on_path[sources] & tables.on_path[destinations] & (occupied == 1) & (own == 0)
+    blocked = opponent & (total >= 2)
+    capturable = opponent & (total == 1) & ~tables.safe[destinations]
+    return blocked, capturable
+
+
+def _capture(tables: _Tables, board: "np.ndarray", capture: "np.ndarray", squares: "np.ndarray") -> None:
+    """Send the single opponent token on ``squares`` back to the yard where ``capture`` is set."""
+    for seat in range(tables.seats):
+        for token_index in range(TOKENS_PER_PLAYER):
+            row = board[seat, token_index]
+            row[capture & (row == squares)] = 0
+
+
+def _place(board: "np.ndarray", mover: "np.ndarray", tokens, where: "np.ndarray", codes: "np.ndarray") -> None:
+    lanes = np.flatnonzero(where)
+    tokens = tokens[lanes] if isinstance(tokens, np.ndarray) else tokens
+    board[mover[lanes], tokens, lanes] = codes[lanes]
+
+
+def _all_finished(board: "np.ndarray", mover: "np.ndarray", lanes: "np.ndarray") -> "np.ndarray":
+    finished = board[mover, 0, lanes] == FINISHED_CODE
+    for token_index in range(1, TOKENS_PER_PLAYER):
+        finished &= board[mover, token_index, lanes] == FINISHED_CODE
+    return finished
+
+
+def _advance_all_by_1(tables: _Tables, board: "np.ndarray", mover: "np.ndarray", active: "np.ndarray") -> None:
+    """Chance: each of the mover's tokens, in order, moves 1 if it can (capturing as usual)."""
+    lanes = np.arange(len(mover))
+    for token_index in range(TOKENS_PER_PLAYER):
+        sources = board[mover, token_index, lanes]
+        destinations = tables.move_by_1[mover * CODES + sources]
+        blocked, capturable = _contest(tables, board, mover, sources, destinations)
+        movable = active & (destinations > 0) & ~blocked
+        _capture(tables, board, movable & capturable, destinations)
+        _place(board, mover, token_index, movable, destinations)
+
+
+def _opponent_back_4(tables: _Tables, board: "np.ndarray", mover: "np.ndarray", active: "np.ndarray") -> None:
+    """Chance: the most advanced opponent token on the track moves back 4 squares."""
+    best = np.full(len(mover), -1, dtype=np.int16)
+    best_seat = np.zeros(len(mover), dtype=np.int64)
+    best_token = np.zeros(len(mover), dtype=np.int64)
+    for seat in range(tables.seats):
+        for token_index in range(TOKENS_PER_PLAYER):
+            progress = tables.progress[seat][board[seat, token_index]]
+            # Highest progress, then lowest token index, then earliest seat: the first max in seat order.
+            score = np.where(
+                (progress >= 0) & (mover != seat),
+                progress * 16 + (3 - token_index) * 4 + (3 - seat),
+                -1,
+            )
+            better = score > best
+            best = np.where(better, score, best)
+            best_seat[better] = seat
+            best_token[better] = token_index
+    lanes = np.flatnonzero(active & (best >= 0))
+    seats, tokens = best_seat[lanes], best_token[lanes]
+    board[seats, tokens, lanes] = tables.back_4[board[seats, tokens, lanes]]
+
+
+def _closest_to_start(tables: _Tables, board: "np.ndarray", mover: "np.ndarray", active: "np.ndarray") -> None:
+    """Chance: the mover's token closest to its own start (before the home lane) jumps to the nearest start tile."""
+    lanes = np.arange(len(mover))
+    none = 1 << 14
+    best = np.full(len(mover), none, dtype=np.int16)
+    best_token = np.zeros(len(mover), dtype=np.int64)
+    for token_index in range(TOKENS_PER_PLAYER):
+        index = mover * CODES + board[mover, token_index, lanes]
+        progress = tables.progress.ravel()[index]
+        key = np.where(
+            tables.before_home.ravel()[index],
+            np.minimum(progress, PATH_LENGTH - progress) * 4 + token_index,
+            none,
+        )
+        better = key < best
+        best = np.where(better, key, best)
+        best_token[better] = token_index
+    lanes = np.flatnonzero(active & (best < none))
+    seats, tokens = mover[lanes], best_token[lanes]
+    board[seats, tokens, lanes] = tables.nearest_start[board[seats, tokens, lanes]]
+
+
+def _play_chance(
+    tables: _Tables,
+    board: "np.ndarray",
+    mover: "np.ndarray",
+    options: "np.ndarray",
+) -> "np.ndarray":
+    """Apply one drawn chance option per game; returns whether the mover won."""
+    _opponent_back_4(tables, board, mover, options == OPPONENT_BACK_4)
+    _advance_all_by_1(tables, board, mover, options == ADVANCE_ALL_BY_1)
+    _closest_to_start(tables, board, mover, options == CLOSEST_TO_START)
+    return _all_finished(board, mover, np.arange(len(mover)))
+
+
+def _simulate_chunk(
+    tables: _Tables,
+    games: int,
+    rng: "np.random.Generator",
+    chance_rate: "np.ndarray",
+    chance_weights: "np.ndarray",
+    policy: str,
+    max_turns: int,
+) -> tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    seats = tables.seats
+    winners = np.full(games, -1, dtype=np.int64)
+    turns = np.zeros(games, dtype=np.int32)
+    captures = np.zeros(games, dtype=np.int32)
+    chance_plays = np.zeros((games, len(CHANCE_IDS)), dtype=np.int32)
+
+    # State of the unfinished games, compacted once enough have finished; ``ids``
+    # maps a lane back to its game and ``alive`` marks lanes still playing.
+    # board[seat, token, lane] is a position code.
+    ids = np.arange(games)
+    alive = np.ones(games, dtype=bool)
+    board = np.zeros((seats, TOKENS_PER_PLAYER, games), dtype=np.int8)
+    current = np.zeros(games, dtype=np.int64)
+    live_turns = np.zeros(games, dtype=np.int32)
+    live_captures = np.zeros(games, dtype=np.int32)
+    live_plays = np.zeros((games, len(CHANCE_IDS)), dtype=np.int32)
+
+    while len(ids):
+        count = len(ids)
+        lanes = np.arange(count)
+        mover = current
+        live_turns += alive
+        use_chance = alive & (rng.random(count) < chance_rate[mover])
+        rolling = alive & ~use_chance
+        step = np.ones(count, dtype=np.int64)
+
+        # Rolls: every lane is evaluated, lanes playing chance never move.
+        # mine[lane, token] is the mover's own tokens, gathered once per step.
+        mine = board[mover, :, lanes]
+        rolls = tables.roll_faces[rng.integers(0, len(tables.roll_faces), count)]
+        best_score = np.full(count, -1.0)
+        choice = np.zeros(count, dtype=np.int64)
+        chosen_destination = np.zeros(count, dtype=np.int8)
+        chosen_capture = np.zeros(count, dtype=bool)
+        noise = rng.random((TOKENS_PER_PLAYER, count)) if policy == "random" else None
+        for token_index in range(TOKENS_PER_PLAYER):
+            sources = mine[:, token_index]
+            destinations = tables.move_flat[(mover * CODES + sources) * 7 + rolls]
+            blocked, capturable = _contest(tables, board, mover, sources, destinations)
+            legal = rolling & (destinations > 0) & ~blocked
+            # "first" keeps the lowest legal token; "random" the legal token with the highest noise.
+            score = noise[token_index] if noise is not None else np.full(count, float(TOKENS_PER_PLAYER - token_index))
+            better = legal & (score > best_score)
+            best_score = np.where(better, score, best_score)
+            choice[better] = token_index
+            chosen_destination = np.where(better, destinations, chosen_destination)
+            chosen_capture = np.where(better, capturable, chosen_capture)
+        moved = best_score >= 0
+        capture = moved & chosen_capture
+        _capture(tables, board, capture, chosen_destination)
+        live_captures += capture
+        _place(board, mover, choice, moved, chosen_destination)
+        moved_lanes = np.flatnonzero(moved)
+        mine[moved_lanes, choice[moved_lanes]] = chosen_destination[moved_lanes]
+        won = moved & (mine == FINISHED_CODE).all(axis=1)
+        # A six keeps the turn when a token moved; a pass always hands it on.
+        step[moved & (rolls == 6)] = 0
+
+        # Chance plays, on the (usually small) subset of lanes that chose it.
+        chance_lanes = np.flatnonzero(use_chance)
+        if len(chance_lanes):
+            options = rng.choice(len(CHANCE_IDS), size=len(chance_lanes), p=chance_weights)
+            live_plays[chance_lanes, options] += 1
+            sub_board = board[:, :, chance_lanes]
+            won[chance_lanes] = _play_chance(tables, sub_board, mover[chance_lanes], options)
+            board[:, :, chance_lanes] = sub_board
+            step[chance_lanes] = np.where(options == SKIP_NEXT_PLAYER, 2, 1)
+
+        current = (mover + step) % seats
+        done = alive & (won | (live_turns >= max_turns))
+        if done.any():
+            finished = ids[done]
+            winners[finished] = np.where(won[done], mover[done], -1)
+            turns[finished] = live_turns[done]
+            captures[finished] = live_captures[done]
+            chance_plays[finished] = live_plays[done]
+            alive &= ~done
+            # Finished lanes idle until an eighth of the batch is dead, then the arrays shrink.
+            if count - alive.sum() > count // 8:
+                ids = ids[alive]
+                board = board[:, :, alive]
+                current = current[alive]
+                live_turns = live_turns[alive]
+                live_captures = live_captures[alive]
+                live_plays = live_plays[alive]
+                alive = alive[alive]
+
+    return winners, turns, captures, chance_plays
+
+
+def simulate_batch(
+    player_count: int,
+    games: int,
+    seed: int = 0,
+    chance_rate: Union[float, Sequence[float]] = 0.0,
+    chance_weights: Optional[Sequence[float]] = None,
+    policy: str = "random",
+    max_turns: int = DEFAULT_MAX_TURNS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> BatchResult:
+    """
+    Play ``games`` games in lockstep batches of ``batch_size``.
+
+    ``chance_rate`` is one probability for every seat or one per seat;
+    ``chance_weights`` are the draw probabilities of the ``CHANCE_OPTIONS``
+    (uniform by default, as in the engine). ``policy`` is "random" or "first".
+    """
+    _require_numpy()
+    if policy not in ("random", "first"):
+        raise ValueError(f"Unknown batch policy: {policy!r}")
+    tables = _Tables(player_count)
+    rates = np.broadcast_to(np.asarray(chance_rate, dtype=float), (tables.seats,))
+    weights = np.full(len(CHANCE_IDS), 1 / len(CHANCE_IDS)) if chance_weights is None else np.asarray(chance_weights, dtype=float)
+    weights = weights / weights.sum()
+    rng = np.random.default_rng(seed)
+
+    started = time.perf_counter()
+    parts = []
+    for offset in range(0, games, batch_size):
+        parts.append(
+            _simulate_chunk(tables, min(batch_size, games - offset), rng, rates, weights, policy, max_turns)
+        )
+    seconds = time.perf_counter() - started
+    winners, turns, captures, chance_plays = (np.concatenate(column) for column in zip(*parts))
+    return BatchResult(tables.seats, winners, turns, captures, chance_plays, seconds)
+
+
+def chance_impact(
+    player_count: int,
+    games: int,
+    seed: int = 0,
+    chance_rate: float = 0.1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Seat 0's win rate when it alone plays one chance option at ``chance_rate``, per option."""
+    _require_numpy()
+    rates = [chance_rate] + [0.0] * (min(4, max(2, player_count)) - 1)
+    baseline = simulate_batch(player_count, games, seed, 0.0, batch_size=batch_size).summary()
+    base_rate = baseline["win_rate_by_seat"][0]
+    report = {"baseline_seat0_win_rate": base_rate, "options": {}}
+    for index, option_id in enumerate(CHANCE_IDS):
+        weights = [0.0] * len(CHANCE_IDS)
+        weights[index] = 1.0
+        summary = simulate_batch(player_count, games, seed + index + 1, rates, weights, batch_size=batch_size).summary()
+        rate = summary["win_rate_by_seat"][0]
+        report["options"][option_id] = {
+            "seat0_win_rate": rate,
+            "delta": round(rate - base_rate, 4),
+            "turns_mean": summary["turns_mean"],
+        }
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", choices=(2, 3, 4), default=[2, 3, 4])
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chance-rate", type=float, default=0.1)
+    parser.add_argument("--policy", choices=("random", "first"), default="random")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--impact", action="store_true", help="per-option win-rate impact for seat 0")
+    args = parser.parse_args(argv)
+    try:
+        _require_numpy()
+    except RuntimeError as exc:
+        print(exc)
+        return 2
+
+    for player_count in args.players:
+        if args.impact:
+            report = chance_impact(player_count, args.games, args.seed, args.chance_rate, args.batch_size)
+            print(f"{player_count}p  seat 0 baseline win rate {report['baseline_seat0_win_rate']:.4f}")
+            for option_id, row in report["options"].items():
+                print(
+                    f"    {option_id:<42} win rate {row['seat0_win_rate']:.4f}  "
+                    f"({row['delta']:+.4f})  turns {row['turns_mean']}"
+                )
+            continue
+        summary = simulate_batch(
+            player_count, args.games, args.seed, args.chance_rate, policy=args.policy, batch_size=args.batch_size
+        ).summary()
+        print(
+            f"{player_count}p  {summary['games']} games in {summary['games'] / summary['games_per_sec']:.1f}s  "
+            f"win rate by seat {summary['win_rate_by_seat']}  turns mean {summary['turns_mean']} "
+            f"p50 {summary['turns_p50']} p90 {summary['turns_p90']}  unfinished {summary['unfinished']}"
+        )
+        print(f"    chance plays {summary['chance_plays']}  captures/game {summary['captures_mean']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
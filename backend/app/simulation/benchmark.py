@@ -0,0 +1,184 @@
+"""
+Engine throughput benchmark on headless self-play.
+
+    python -m app.simulation.benchmark                  # compare with the saved baseline
+    python -m app.simulation.benchmark --save-baseline  # record a new baseline
+
+For 2-, 3- and 4-player games it reports games/sec and moves/sec (best of
+``--repeat`` runs) and the transient memory allocated per move (move
+generation plus ``apply_move``, measured with tracemalloc). A fingerprint of
+every game's outcome is stored too: the same seed must play the same games,
+so a changed fingerprint means the rules changed, not just the speed.
+
+Throughput numbers are machine specific; re-save the baseline when moving
+to a different box.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from app.services.game_engine import get_engine
+from app.simulation.selfplay import POLICIES, play_game, play_games
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+PLAYER_COUNTS = (2, 3, 4)
+DEFAULT_GAMES = 300
+DEFAULT_SEED = 20240
+DEFAULT_CHANCE_RATE = 0.1
+DEFAULT_TOLERANCE = 0.2
+ALLOC_SAMPLE_GAMES = 20
+
+
+class _AllocationProbe:
+    """Engine stand-in that measures tracemalloc peaks around move generation and moves."""
+
+    def __init__(self, engine) -> None:
+        self._engine = engine
+        self.moves = 0
+        self.bytes = 0
+
+    def __getattr__(self, name):
+        return getattr(self._engine, name)
+
+    def _measure(self, fn, *args):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn(*args)
+        self.bytes += tracemalloc.get_traced_memory()[1] - before
+        return result
+
+    def move_options(self, state, roll):
+        return self._measure(self._engine.move_options, state, roll)
+
+    def apply_move(self, state, color, token_index, roll):
+        self.moves += 1
+        return self._measure(self._engine.apply_move, state, color, token_index, roll)
+
+
+def _fingerprint(results) -> str:
+    digest = hashlib.sha256()
+    for result in results:
+        digest.update(
+            f"{result.winner_index}:{result.turns}:{result.moves}:{result.captures};".encode()
+        )
+    return digest.hexdigest()[:16]
+
+
+def _alloc_bytes_per_move(player_count: int, seed: int, policy: str, chance_rate: float) -> float:
+    probe = _AllocationProbe(get_engine(player_count))
+    rng = random.Random(seed)
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOC_SAMPLE_GAMES):
+            play_game(player_count, rng, policy, chance_rate, engine=probe)
+    finally:
+        tracemalloc.stop()
+    return probe.bytes / probe.moves if probe.moves else 0.0
+
+
+def run_benchmark(
+    player_count: int,
+    games: int = DEFAULT_GAMES,
+    seed: int = DEFAULT_SEED,
+    policy: str = "random",
+    chance_rate: float = DEFAULT_CHANCE_RATE,
+    repeat: int = 3,
+) -> dict:
+    best = None
+    results = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        results = play_games(player_count, games, seed, policy, chance_rate)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    moves = sum(result.moves for result in results)
+    return {
+        "games_per_sec": round(games / best, 1),
+        "moves_per_sec": round(moves / best, 1),
+        "moves_per_game": round(moves / games, 1),
+        "alloc_bytes_per_move": round(_alloc_bytes_per_move(player_count, seed, policy, chance_rate), 1),
+        "unfinished": sum(result.winner_index is None for result in results),
+        "fingerprint": _fingerprint(results),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of ``current`` against ``baseline`` results, as readable lines."""
+    problems = []
+    for key, now in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        label = f"{key}p"
+        if now["fingerprint"] != before["fingerprint"]:
+            problems.append(f"{label}: game outcomes changed (fingerprint {before['fingerprint']} -> {now['fingerprint']})")
+        for metric in ("games_per_sec", "moves_per_sec"):
+            if now[metric] < before[metric] * (1 - tolerance):
+                problems.append(f"{label}: {metric} {before[metric]} -> {now[metric]}")
+        if now["alloc_bytes_per_move"] > before["alloc_bytes_per_move"] * (1 + tolerance):
+            problems.append(
+                f"{label}: alloc_bytes_per_move {before['alloc_bytes_per_move']} -> {now['alloc_bytes_per_move']}"
+            )
+    return problems
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--chance-rate", type=float, default=DEFAULT_CHANCE_RATE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--players", type=int, nargs="+", choices=PLAYER_COUNTS, default=list(PLAYER_COUNTS))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    config = {
+        "games": args.games,
+        "seed": args.seed,
+        "policy": args.policy,
+        "chance_rate": args.chance_rate,
+    }
+    current = {}
+    for player_count in args.players:
+        current[str(player_count)] = run_benchmark(
+            player_count, args.games, args.seed, args.policy, args.chance_rate, args.repeat
+        )
+        row = current[str(player_count)]
+        print(
+            f"{player_count}p  {row['games_per_sec']:>9.1f} games/s  {row['moves_per_sec']:>11.1f} moves/s  "
+            f"{row['alloc_bytes_per_move']:>7.1f} B/move  {row['moves_per_game']:>6.1f} moves/game  "
+            f"fingerprint {row['fingerprint']}"
+        )
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({"config": config, "results": current}, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    saved = json.loads(args.baseline.read_text())
+    if saved.get("config") != config:
+        print(f"Baseline was recorded with {saved.get('config')}; not comparable with {config}")
+        return 0
+    problems = compare(current, saved["results"], args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if not problems:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Self-play: complete games on ``GameEngine`` with pluggable move policies.
+
+A turn follows the same rules as the API: the player either plays chance
+(before rolling) or rolls; with no legal move the turn is passed, otherwise
+the policy picks one of the legal moves. All randomness comes from the
+``random.Random`` passed in, so a seed reproduces a game exactly.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence, Union
+
+from app.services.game_engine import (
+    CHANCE_OPTIONS,
+    ROUTE_PROGRESS,
+    GameEngine,
+    GameEngineState,
+    MoveOption,
+    TokenPositionKind,
+    advance_turn,
+    end_chance_turn,
+    end_move_turn,
+    get_engine,
+)
+
+Policy = Callable[[GameEngineState, list[MoveOption], random.Random], MoveOption]
+
+DEFAULT_MAX_TURNS = 5000
+
+
+def random_policy(state: GameEngineState, options: list[MoveOption], rng: random.Random) -> MoveOption:
+    """Any legal move, uniformly."""
+    return rng.choice(options)
+
+
+def first_policy(state: GameEngineState, options: list[MoveOption], rng: random.Random) -> MoveOption:
+    """The lowest-numbered token that can move."""
+    return options[0]
+
+
+def _option_score(state: GameEngineState, option: MoveOption) -> tuple[int, int]:
+    if option.kind == TokenPositionKind.HOME:
+        # Entering or advancing in the home column is always safe progress.
+        return (2, option.home_index or 0)
+    if option.path_index is None:
+        return (0, 0)
+    progress = ROUTE_PROGRESS[option.color][option.path_index]
+    if state.can_capture(option.path_index, option.color):
+        return (3, progress)
+    return (1, progress)
+
+
+def greedy_policy(state: GameEngineState, options: list[MoveOption], rng: random.Random) -> MoveOption:
+    """Capture if possible, then move into/along home, then advance the furthest token."""
+    return max(options, key=lambda option: _option_score(state, option))
+
+
+POLICIES: dict[str, Policy] = {
+    "random": random_policy,
+    "first": first_policy,
+    "greedy": greedy_policy,
+}
+
+
+@dataclass
+class SelfPlayResult:
+    player_count: int
+    winner_index: Optional[int]  # None when the game hit max_turns
+    turns: int = 0  # rolls plus chance plays
+    rolls: int = 0
+    moves: int = 0
+    passes: int = 0
+    captures: int = 0
+    chances: dict[str, int] = field(default_factory=lambda: {option["id"]: 0 for option in CHANCE_OPTIONS})
+
+
+def _resolve_policy(policy: Union[str, Policy]) -> Policy:
+    return POLICIES[policy] if isinstance(policy, str) else policy
+
+
+def play_game(
+    player_count: int,
+    rng: random.Random,
+    policies: Union[str, Policy, Sequence[Union[str, Policy]]] = "random",
+    chance_rate: float = 0.0,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    engine: Optional[GameEngine] = None,
+) -> SelfPlayResult:
+    """
+    Play one game to the end (or ``max_turns`` turns).
+
+    ``policies`` is one policy for every seat or one per seat; names refer to
+    ``POLICIES``. ``chance_rate`` is the probability that a player plays
+    chance instead of rolling at the start of a turn.
+    """
+    engine = engine or get_engine(player_count)
+    if isinstance(policies, str) or callable(policies):
+        seat_policies = [_resolve_policy(policies)] * len(engine.active_colors)
+    else:
+        seat_policies = [_resolve_policy(policy) for policy in policies]
+    state = engine.new_game()
+    result = SelfPlayResult(player_count=engine.player_count, winner_index=None)
+
+    while state.winner_index is None and result.turns < max_turns:
+        result.turns += 1
+        if chance_rate and rng.random() < chance_rate:
+            option_id = engine.draw_chance(rng)
+            _, turns_to_advance = engine.apply_chance(state, option_id)
+            result.chances[option_id] += 1
+            end_chance_turn(state, turns_to_advance)
+            continue
+
+        roll = engine.roll_dice(rng)
+        state.last_roll = roll
+        state.has_rolled = True
+        result.rolls += 1
+        options = engine.move_options(state, roll)
+        if not options:
+            result.passes += 1
+            advance_turn(state)
+            continue
+
+        option = seat_policies[state.current_player_index](state, options, rng)
+        move = engine.apply_move(state, option.color, option.token_index, roll)
+        result.moves += 1
+        if move.captured:
+            result.captures += 1
+        end_move_turn(state, move)
+
+    result.winner_index = state.winner_index
+    return result
+
+
+def play_games(
+    player_count: int,
+    games: int,
+    seed: int = 0,
+    policies: Union[str, Policy, Sequence[Union[str, Policy]]] = "random",
+    chance_rate: float = 0.0,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> list[SelfPlayResult]:
+    """``games`` games from one seeded RNG; the same arguments give the same results."""
+    rng = random.Random(seed)
+    engine = get_engine(player_count)
+    return [
+        play_game(player_count, rng, policies, chance_rate, max_turns, engine)
+        for _ in range(games)
+    ]
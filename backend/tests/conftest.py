@@ -0,0 +1,40 @@
+import asyncio
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.core.config.
+_tmp = tempfile.mkdtemp(prefix="ludo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.db"
+os.environ["LOBBY_STORE_PATH"] = f"{_tmp}/lobbies.db"
+
+import pytest
+
+import app.models.game  # noqa: F401,E402
+import app.models.game_action  # noqa: F401,E402
+import app.models.user  # noqa: F401,E402
+from app.core.database import Base, engine  # noqa: E402
+
+
+def _run(coro):
+    """Run a coroutine on a fresh loop; pooled aiosqlite connections are bound to the loop that opened them."""
+
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _reset_tables() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+def run():
+    """Empty tables, and a runner for async test bodies."""
+    _run(_reset_tables())
+    return _run
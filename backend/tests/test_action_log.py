@@ -0,0 +1,93 @@
+import asyncio
+from unittest import mock
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import SessionLocal
+from app.models.game_action import GameAction
+from app.services.action_log import ActionLogWriter, LoggedAction
+
+
+def _entry(game_id: str, seq: int) -> LoggedAction:
+    return LoggedAction(game_id=game_id, seq=seq, action="pass", player_index=0, payload={})
+
+
+async def _stored() -> list[tuple[str, int]]:
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(GameAction.game_id, GameAction.seq).order_by(GameAction.game_id, GameAction.seq)
+        )
+        return [tuple(row) for row in result]
+
+
+def test_duplicate_row_is_rejected_without_blocking_other_games(run):
+    writer = ActionLogWriter(interval=60)
+    writer.append(_entry("game-a", 1))
+    assert run(writer.flush()) == 1
+
+    writer.append(_entry("game-b", 1))
+    writer.append(_entry("game-a", 1))  # duplicate (game_id, seq)
+    writer.append(_entry("game-b", 2))
+    assert run(writer.flush()) == 2
+
+    assert writer.stats()["pending"] == 0
+    assert writer.rejected == 1
+    assert run(_stored()) == [("game-a", 1), ("game-b", 1), ("game-b", 2)]
+
+
+def test_transient_failure_keeps_the_batch_for_the_next_flush(run):
+    writer = ActionLogWriter(interval=60)
+    writer.append(_entry("game-a", 1))
+    writer.append(_entry("game-a", 2))
+    failure = OperationalError("INSERT", {}, Exception("database is locked"))
+    with mock.patch.object(ActionLogWriter, "_insert", side_effect=failure):
+        assert run(writer.flush()) == 0
+    assert writer.stats()["pending"] == 2
+    assert writer.failures == 1
+
+    assert run(writer.flush()) == 2
+    assert run(_stored()) == [("game-a", 1), ("game-a", 2)]
+
+
+def test_stop_during_insert_writes_the_buffered_entries(run):
+    async def main():
+        writer = ActionLogWriter(interval=0.01)
+        writer.append(_entry("game-a", 1))
+        writer.append(_entry("game-a", 2))
+        started = asyncio.Event()
+        insert = ActionLogWriter._insert
+
+        async def slow_insert(entries):
+            started.set()
+            await asyncio.sleep(0.05)
+            await insert(entries)
+
+        with mock.patch.object(ActionLogWriter, "_insert", side_effect=slow_insert):
+            writer.start()
+            await started.wait()
+            writer.append(_entry("game-a", 3))  # appended while the first batch is in flight
+            await writer.stop()
+        return writer.stats()["pending"], await _stored()
+
+    pending, stored = run(main())
+    assert pending == 0
+    assert stored == [("game-a", 1), ("game-a", 2), ("game-a", 3)]
+
+
+def test_cancelled_insert_keeps_the_entries(run):
+    async def main():
+        writer = ActionLogWriter(interval=60)
+        writer.append(_entry("game-a", 1))
+        writer.append(_entry("game-a", 2))
+        async def hung_insert(entries):
+            await asyncio.sleep(60)
+
+        with mock.patch.object(ActionLogWriter, "_insert", side_effect=hung_insert):
+            flush = asyncio.create_task(writer.flush())
+            await asyncio.sleep(0.01)
+            flush.cancel()
+            await asyncio.gather(flush, return_exceptions=True)
+        return writer.stats()["pending"]
+
+    assert run(main()) == 2
@@ -0,0 +1,52 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes.games import _bot_act
+from app.core.database import engine
+from app.main import app
+from app.services.bot_search import BotDecision
+from app.services.game_actor import game_actors
+from app.services.lobby_store import lobby_store
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+def _start_two_player_game(client) -> tuple[str, list[str]]:
+    created = client.post("/games", json={"player_count": 2}).json()
+    game_id = created["lobby"]["game_id"]
+    player_ids = [created["player_id"], client.post(f"/games/{game_id}/join", json={}).json()["player_id"]]
+    for player_id in player_ids:
+        client.post(f"/games/{game_id}/ready", headers={"X-Player-ID": player_id})
+    return game_id, player_ids
+
+
+def _stale_move(client, game_id: str, player_id: str) -> None:
+    """Apply a bot move for a token the search picked but that cannot move now."""
+    version = client.portal.call(lobby_store.get, game_id).state_version
+    decision = BotDecision(action="move", token_index=None)
+    client.portal.call(game_actors.submit, game_id, lambda: _bot_act(game_id, player_id, version, decision))
+
+
+def test_stale_bot_move_falls_back_to_a_legal_move_or_a_pass(client):
+    game_id, player_ids = _start_two_player_game(client)
+    moved = passed = False
+    while not (moved and passed):
+        game = client.get(f"/games/{game_id}", headers={"X-Player-ID": player_ids[0]}).json()
+        player_id = player_ids[game["current_player_index"]]
+        rolled = client.post(f"/games/{game_id}/roll", headers={"X-Player-ID": player_id}).json()
+
+        _stale_move(client, game_id, player_id)
+
+        after = client.get(f"/games/{game_id}", headers={"X-Player-ID": player_id}).json()
+        assert not after["has_rolled"] or after["status"] == "finished"
+        if rolled["valid_moves"]:
+            moved = True
+            assert after["tokens"] != game["tokens"]
+        else:
+            passed = True
+            assert after["current_player_index"] != game["current_player_index"]
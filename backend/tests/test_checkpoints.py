@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.api.routes.games import persist_lobbies
+from app.core.database import SessionLocal, engine
+from app.main import app
+from app.models.game import Game
+from app.services.persistence import checkpoint_queue
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+@pytest.fixture
+def checkpoints(client):
+    """Hold off the checkpoint timer and record which games each flush writes."""
+    written: list[list[str]] = []
+
+    async def record(lobbies):
+        written.append([lobby.game_id for lobby in lobbies])
+        await persist_lobbies(lobbies)
+
+    async def restart(flush_fn, interval):
+        await checkpoint_queue.stop()
+        checkpoint_queue.interval = interval
+        checkpoint_queue.start(flush_fn)
+
+    interval = checkpoint_queue.interval
+    client.portal.call(restart, record, 3600.0)
+    yield written
+    client.portal.call(restart, persist_lobbies, interval)
+
+
+def _stored_state(client, game_id: str) -> tuple[str, dict]:
+    async def load():
+        async with SessionLocal() as db:
+            game = (await db.execute(select(Game).where(Game.game_id == game_id))).scalar_one()
+            return game.status, json.loads(game.engine_state_json)
+
+    return client.portal.call(load)
+
+
+def test_gameplay_is_checkpointed_once_per_interval(client, checkpoints):
+    created = client.post("/games", json={"player_count": 2}).json()
+    game_id = created["lobby"]["game_id"]
+    player_ids = [created["player_id"], client.post(f"/games/{game_id}/join", json={}).json()["player_id"]]
+    for player_id in player_ids:
+        client.post(f"/games/{game_id}/ready", headers={"X-Player-ID": player_id})
+
+    for _ in range(12):
+        game = client.get(f"/games/{game_id}", headers={"X-Player-ID": player_ids[0]}).json()
+        headers = {"X-Player-ID": player_ids[game["current_player_index"]]}
+        if not game["has_rolled"]:
+            client.post(f"/games/{game_id}/roll", headers=headers)
+        elif game["valid_moves"]:
+            client.post(f"/games/{game_id}/move", headers=headers, json=game["valid_moves"][0])
+        else:
+            client.post(f"/games/{game_id}/pass", headers=headers)
+    assert checkpoints == []
+
+    client.portal.call(checkpoint_queue.flush)
+
+    assert [game_ids.count(game_id) for game_ids in checkpoints] == [1]
+    live = client.get(f"/games/{game_id}", headers={"X-Player-ID": player_ids[0]}).json()
+    status, state = _stored_state(client, game_id)
+    assert status == "active"
+    assert state["current_player_index"] == live["current_player_index"]
+    assert state["has_rolled"] == live["has_rolled"]
+    assert state["last_roll"] == live["last_roll"]
+    assert state["tokens"] == live["tokens"]
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import socket
+from unittest import mock
+
+from app.services.connection_manager import (
+    ConnectionManager,
+    Envelope,
+    InMemoryBus,
+    SlowConsumerPolicy,
+    UnixSocketBus,
+    _Connection,
+    encode_message,
+)
+
+
+class _FakeSocket:
+    """Records what the connection's writer task sends."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _connection(max_queue: int) -> _Connection:
+    return _Connection(websocket=None, max_queue=max_queue)
+
+
+def test_drop_policy_discards_state_replaced_by_incoming_message():
+    conn = _connection(2)
+    assert conn.enqueue("game_state_updated", "old", SlowConsumerPolicy.DROP)
+    assert conn.enqueue("player_connected", "joined", SlowConsumerPolicy.DROP)
+    assert conn.enqueue("game_state_updated", "new", SlowConsumerPolicy.DROP)
+    assert [text for _, text in conn.queue] == ["joined", "new"]
+    assert conn.dropped == 1
+
+
+def test_drop_policy_discards_state_replaced_by_queued_message():
+    conn = _connection(3)
+    for message_type, text in (
+        ("game_state_updated", "old"),
+        ("opponent_rolling", "rolling"),
+        ("game_state_updated", "new"),
+    ):
+        assert conn.enqueue(message_type, text, SlowConsumerPolicy.DROP)
+    assert conn.enqueue("player_disconnected", "left", SlowConsumerPolicy.DROP)
+    assert [text for _, text in conn.queue] == ["rolling", "new", "left"]
+
+
+def test_drop_policy_keeps_the_only_queued_state():
+    conn = _connection(2)
+    assert conn.enqueue("game_state_updated", "only", SlowConsumerPolicy.DROP)
+    assert conn.enqueue("opponent_rolling", "rolling", SlowConsumerPolicy.DROP)
+    # Nothing newer of either type is queued, so the slow consumer is dropped instead.
+    assert not conn.enqueue("player_disconnected", "left", SlowConsumerPolicy.DROP)
+    assert [text for _, text in conn.queue] == ["only", "rolling"]
+    assert conn.dropped == 0
+
+
+def test_disconnect_policy_never_drops():
+    conn = _connection(1)
+    assert conn.enqueue("game_state_updated", "old", SlowConsumerPolicy.DISCONNECT)
+    assert not conn.enqueue("game_state_updated", "new", SlowConsumerPolicy.DISCONNECT)
+
+
+def test_broadcast_encodes_once_and_shares_the_text():
+    async def main():
+        manager = ConnectionManager(max_queue=8, slow_consumer_policy="drop", bus=InMemoryBus())
+        sockets = {player_id: _FakeSocket() for player_id in ("a", "b", "c")}
+        for player_id, websocket in sockets.items():
+            await manager.connect("game-1", player_id, websocket)
+        with mock.patch(
+            "app.services.connection_manager.encode_message", wraps=encode_message
+        ) as encode:
+            await manager.broadcast("game-1", {"type": "game_state_updated", "turn": 1})
+            await manager.broadcast_except("game-1", "a", {"type": "opponent_rolling", "player_index": 0})
+        await asyncio.sleep(0.01)  # let the writer tasks drain their queues
+        for player_id in sockets:
+            manager.disconnect("game-1", player_id)
+        return encode.call_count, {player_id: websocket.sent for player_id, websocket in sockets.items()}
+
+    encodes, sent = asyncio.run(main())
+    assert encodes == 2
+    assert sent["a"] == ['{"type":"game_state_updated","turn":1}']
+    assert sent["b"] == sent["c"] == sent["a"] + ['{"type":"opponent_rolling","player_index":0}']
+    # Every socket is handed the same string object, not a copy per player.
+    assert sent["a"][0] is sent["b"][0] is sent["c"][0]
+    assert sent["b"][1] is sent["c"][1]
+
+
+def test_envelope_round_trips_through_bytes():
+    envelope = Envelope(
+        "game-1",
+        "game_state_updated",
+        '{"type":"game_state_updated","name":"Zoë\\n"}',
+        delta_type="game_state_updated",
+        delta_text='{"delta":{}}',
+        exclude_player_id="p1",
+    )
+    decoded = Envelope.from_bytes(envelope.to_bytes())
+    assert [getattr(decoded, name) for name in Envelope.__slots__] == [
+        getattr(envelope, name) for name in Envelope.__slots__
+    ]
+    assert Envelope.from_bytes(Envelope("game-1", None, "{}").to_bytes()).delta_text is None
+
+
+def test_unix_socket_bus_carries_broadcasts_between_workers(tmp_path):
+    async def main():
+        directory = str(tmp_path / "bus")
+        sender = ConnectionManager(max_queue=8, slow_consumer_policy="drop", bus=UnixSocketBus(directory))
+        receiver = ConnectionManager(max_queue=8, slow_consumer_policy="drop", bus=UnixSocketBus(directory))
+        await sender.start()
+        await receiver.start()
+        # A socket file left behind by a worker that died.
+        stale = os.path.join(directory, "dead.sock")
+        dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        dead.bind(stale)
+        dead.close()
+
+        full, delta, excluded = _FakeSocket(), _FakeSocket(), _FakeSocket()
+        await receiver.connect("game-1", "full", full)
+        await receiver.connect("game-1", "delta", delta, delta=True)
+        await receiver.connect("game-1", "excluded", excluded)
+        await sender.broadcast(
+            "game-1",
+            {"type": "game_state_updated", "version": 2},
+            delta_message={"type": "game_state_updated", "version": 2, "base_version": 1},
+        )
+        await sender.broadcast_except("game-1", "excluded", {"type": "opponent_rolling"})
+        for _ in range(100):
+            if len(full.sent) == 2:
+                break
+            await asyncio.sleep(0.01)
+        for player_id in ("full", "delta", "excluded"):
+            receiver.disconnect("game-1", player_id)
+        stats = sender.bus.stats(), receiver.bus.stats()
+        await sender.close()
+        await receiver.close()
+        return full.sent, delta.sent, excluded.sent, stats, os.path.exists(stale)
+
+    full, delta, excluded, (sent, received), stale_left = asyncio.run(main())
+    assert full == ['{"type":"game_state_updated","version":2}', '{"type":"opponent_rolling"}']
+    assert delta == ['{"type":"game_state_updated","version":2,"base_version":1}', '{"type":"opponent_rolling"}']
+    assert excluded == ['{"type":"game_state_updated","version":2}']
+    assert (sent["published"], received["received"]) == (2, 2)
+    assert not stale_left
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import engine
+from app.main import app
+from app.services.connection_manager import SlowConsumerPolicy, manager
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+def _start_two_player_game(client) -> tuple[str, list[str]]:
+    created = client.post("/games", json={"player_count": 2}).json()
+    game_id = created["lobby"]["game_id"]
+    player_ids = [created["player_id"], client.post(f"/games/{game_id}/join", json={}).json()["player_id"]]
+    for player_id in player_ids:
+        client.post(f"/games/{game_id}/ready", headers={"X-Player-ID": player_id})
+    return game_id, player_ids
+
+
+def _play_step(client, game_id: str, player_ids: list[str]) -> None:
+    """One roll, move or pass by whoever is to act; each broadcasts a state update."""
+    game = client.get(f"/games/{game_id}", headers={"X-Player-ID": player_ids[0]}).json()
+    headers = {"X-Player-ID": player_ids[game["current_player_index"]]}
+    if not game["has_rolled"]:
+        client.post(f"/games/{game_id}/roll", headers=headers)
+    elif game["valid_moves"]:
+        client.post(f"/games/{game_id}/move", headers=headers, json=game["valid_moves"][0])
+    else:
+        client.post(f"/games/{game_id}/pass", headers=headers)
+
+
+def _current_version(client, game_id: str, player_id: str) -> int:
+    return client.get(f"/games/{game_id}", headers={"X-Player-ID": player_id}).json()["version"]
+
+
+def test_delta_clients_get_diffs_and_others_full_snapshots(client):
+    game_id, player_ids = _start_two_player_game(client)
+    with client.websocket_connect(f"/games/{game_id}/ws?player_id={player_ids[0]}&protocol=delta") as delta_ws, \
+            client.websocket_connect(f"/games/{game_id}/ws?player_id={player_ids[1]}") as full_ws:
+        synced = delta_ws.receive_json()
+        assert synced["type"] == "sync"
+        assert full_ws.receive_json()["type"] == "sync"
+
+        _play_step(client, game_id, player_ids)
+
+        delta = delta_ws.receive_json()
+        full = full_ws.receive_json()
+        assert delta["type"] == full["type"] == "game_state_updated"
+        assert (delta["base_version"], delta["version"]) == (synced["version"], synced["version"] + 1)
+        assert "game" not in delta
+        assert delta["delta"]["has_rolled"] is True
+        assert "tokens" not in delta["delta"]  # a roll moves nothing
+        assert full["version"] == full["game"]["version"] == delta["version"]
+        assert full["game"]["has_rolled"] is True
+
+
+def test_dropped_delta_leaves_a_gap_and_resync_catches_up(client, monkeypatch):
+    game_id, player_ids = _start_two_player_game(client)
+    monkeypatch.setattr(manager, "slow_consumer_policy", SlowConsumerPolicy.DROP)
+    with client.websocket_connect(f"/games/{game_id}/ws?player_id={player_ids[0]}&protocol=delta") as ws:
+        seen_version = ws.receive_json()["version"]
+
+        # Stall the socket's writer so updates pile up in a two-message queue.
+        conn = manager._connections[game_id][player_ids[0]]
+
+        async def stall():
+            conn.task.cancel()
+            await asyncio.sleep(0)
+            conn.max_queue = 2
+
+        async def unstall():
+            conn.task = asyncio.create_task(
+                conn.run(lambda: manager._drop_connection(game_id, player_ids[0], conn))
+            )
+
+        client.portal.call(stall)
+        for _ in range(3):
+            _play_step(client, game_id, player_ids)
+        assert conn.dropped == 1
+        client.portal.call(unstall)
+
+        first = ws.receive_json()
+        assert first["base_version"] > seen_version  # the client notices the missing update
+        ws.receive_json()
+        ws.send_json({"type": "resync"})
+        synced = ws.receive_json()
+        assert synced["type"] == "sync"
+        assert synced["version"] == synced["game"]["version"] == _current_version(client, game_id, player_ids[0])
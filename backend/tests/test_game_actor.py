@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.services.game_actor import GameActorRegistry
+
+
+def test_stop_cancels_running_and_queued_commands():
+    async def main():
+        registry = GameActorRegistry(idle_seconds=60)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(60)
+
+        async def quick():
+            return "done"
+
+        running = asyncio.create_task(registry.submit("game-1", slow))
+        queued = asyncio.create_task(registry.submit("game-1", quick))
+        await started.wait()
+        await registry.stop()
+        return await asyncio.wait_for(asyncio.gather(running, queued, return_exceptions=True), timeout=1)
+
+    outcomes = asyncio.run(main())
+    assert all(isinstance(outcome, asyncio.CancelledError) for outcome in outcomes)
+
+
+def test_commands_run_in_order_and_errors_reach_the_caller():
+    async def main():
+        registry = GameActorRegistry(idle_seconds=60)
+        seen = []
+
+        async def record(value):
+            await asyncio.sleep(0)
+            seen.append(value)
+            return value
+
+        async def fail():
+            raise ValueError("bad move")
+
+        results = await asyncio.gather(*(registry.submit("game-1", lambda v=v: record(v)) for v in range(5)))
+        with pytest.raises(ValueError):
+            await registry.submit("game-1", fail)
+        await registry.stop()
+        return seen, results
+
+    seen, results = asyncio.run(main())
+    assert seen == results == [0, 1, 2, 3, 4]
@@ -0,0 +1,98 @@
+import random
+from typing import Optional
+
+import pytest
+
+from app.services.game_engine import (
+    HOME_ENTRANCE_PATH,
+    PATH_LENGTH,
+    START_PATH_INDEX,
+    TokenPositionKind,
+    TokenState,
+    advance_turn,
+    end_chance_turn,
+    end_move_turn,
+    get_engine,
+)
+
+Destination = tuple[TokenPositionKind, Optional[int], Optional[int]]
+
+
+# The rules as written before the board moved to position codes and lookup
+# tables: token by token, off TokenState, with no precomputation.
+def _reference_blocked(tokens: list[TokenState], path_index: int, moving_color: str) -> bool:
+    at = [t for t in tokens if t.kind == TokenPositionKind.PATH and t.path_index == path_index]
+    if len(at) < 2:
+        return False
+    return all(t.color == at[0].color for t in at) and at[0].color != moving_color
+
+
+def _reference_destination(tokens: list[TokenState], token: TokenState, roll: int) -> Optional[Destination]:
+    if token.kind == TokenPositionKind.YARD:
+        return (TokenPositionKind.PATH, START_PATH_INDEX[token.color], None) if roll == 6 else None
+    if token.kind == TokenPositionKind.HOME:
+        next_index = token.home_index + roll
+        return (TokenPositionKind.HOME, None, next_index) if next_index <= 5 else None
+    start = START_PATH_INDEX[token.color]
+    steps_to_entrance = (HOME_ENTRANCE_PATH[token.color] - start) % PATH_LENGTH
+    traveled = (token.path_index - start) % PATH_LENGTH
+    if traveled + roll > steps_to_entrance:
+        home_index = traveled + roll - steps_to_entrance - 1
+        return (TokenPositionKind.HOME, None, home_index) if home_index <= 5 else None
+    new_path = (token.path_index + roll) % PATH_LENGTH
+    if _reference_blocked(tokens, new_path, token.color):
+        return None
+    return (TokenPositionKind.PATH, new_path, None)
+
+
+def _played_states(player_count: int, games: int, seed: int):
+    """Every state reached by random play with chance, before and after each roll."""
+    engine = get_engine(player_count)
+    rng = random.Random(seed)
+    for _ in range(games):
+        state = engine.new_game()
+        while state.winner_index is None:
+            yield engine, state
+            if rng.random() < 0.1:
+                _, turns = engine.apply_chance(state, engine.draw_chance(rng))
+                end_chance_turn(state, turns)
+                continue
+            roll = engine.roll_dice(rng)
+            state.last_roll, state.has_rolled = roll, True
+            yield engine, state
+            options = engine.move_options(state, roll)
+            if not options:
+                advance_turn(state)
+                continue
+            option = rng.choice(options)
+            end_move_turn(state, engine.apply_move(state, option.color, option.token_index, roll))
+        yield engine, state
+
+
+@pytest.mark.parametrize("player_count", [2, 3, 4])
+def test_move_options_match_reference_rules(player_count):
+    checked = 0
+    for engine, state in _played_states(player_count, games=8, seed=player_count):
+        if state.has_rolled or state.winner_index is not None:
+            continue
+        tokens = state.tokens
+        mover = state.active_colors[state.current_player_index]
+        for roll in range(1, 7):
+            expected = [
+                (token.token_index, destination)
+                for token in tokens
+                if token.color == mover
+                for destination in [_reference_destination(tokens, token, roll)]
+                if destination is not None
+            ]
+            options = engine.move_options(state, roll)
+            assert all(option.color == mover for option in options)
+            assert [
+                (option.token_index, (option.kind, option.path_index, option.home_index))
+                for option in options
+            ] == expected
+            assert engine.valid_moves(state, roll) == [(mover, index) for index, _ in expected]
+            for token in tokens:
+                assert engine.get_move_destination(state, token, roll) == _reference_destination(tokens, token, roll)
+            checked += 1
+    assert checked > 1000
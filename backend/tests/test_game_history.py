@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes.games import persist_lobbies
+from app.core.config import get_cors_origins
+from app.core.database import engine
+from app.main import app
+from app.services.game_engine import get_engine
+from app.services.lobby_store import LobbyRecord, PlayerRecord
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+def _finished_game(game_id: str, user_id: int, created_at: datetime) -> LobbyRecord:
+    state = get_engine(2).new_game()
+    state.winner_index = 0
+    return LobbyRecord(
+        game_id=game_id,
+        player_count=2,
+        players=[
+            PlayerRecord(player_id="p0", color="red", player_index=0, display_name="Me", ready=True, user_id=user_id),
+            PlayerRecord(player_id="p1", color="yellow", player_index=1, display_name="Them", ready=True),
+        ],
+        status="finished",
+        engine_state=state,
+        created_at=created_at,
+    )
+
+
+def test_history_pages_follow_the_cursor_to_the_end(client):
+    token = client.post(
+        "/auth/register",
+        json={"username": "history_user", "email": "history_user@example.com", "password": "pw123456"},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = client.get("/auth/me", headers=headers).json()["id"]
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    finished = [_finished_game(f"game-{i:02d}", user_id, start + timedelta(minutes=i)) for i in range(7)]
+    # Two games created in the same instant are ordered by game id.
+    finished += [_finished_game(f"game-tie-{suffix}", user_id, start + timedelta(hours=1)) for suffix in "ab"]
+    client.portal.call(persist_lobbies, finished)
+    live_id = client.post("/games", json={"player_count": 2}, headers=headers).json()["lobby"]["game_id"]
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/auth/me/games", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([item["game_id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    expected = [live_id, "game-tie-b", "game-tie-a"] + [f"game-{i:02d}" for i in reversed(range(7))]
+    assert pages == [expected[i:i + 3] for i in range(0, len(expected), 3)]
+
+
+def test_history_cursor_header_is_readable_cross_origin(client):
+    response = client.get("/health", headers={"Origin": get_cors_origins()[0]})
+    assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
+
+
+def test_malformed_cursor_is_rejected(client):
+    token = client.post(
+        "/auth/register",
+        json={"username": "history_other", "email": "history_other@example.com", "password": "pw123456"},
+    ).json()["access_token"]
+    response = client.get("/auth/me/games", params={"cursor": "%%%"}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+import copy
+
+from sqlalchemy import select
+
+from app.api.routes.games import persist_lobbies
+from app.core.database import SessionLocal
+from app.models.game import Game, GameParticipant
+from app.services.game_engine import get_engine
+from app.services.lobby_store import LobbyRecord, PlayerRecord
+
+
+def _active_lobby(game_id: str, version: int) -> LobbyRecord:
+    return LobbyRecord(
+        game_id=game_id,
+        player_count=2,
+        players=[
+            PlayerRecord(player_id="p0", color="red", player_index=0, display_name="Ann", ready=True),
+            PlayerRecord(player_id="p1", color="yellow", player_index=1, display_name="Bob", ready=True),
+        ],
+        status="active",
+        engine_state=get_engine(2).new_game(),
+        state_version=version,
+    )
+
+
+def _finish(lobby: LobbyRecord, winner_index: int) -> None:
+    lobby.engine_state.winner_index = winner_index
+    lobby.status = "finished"
+    lobby.state_version += 1
+
+
+async def _stored(game_id: str):
+    async with SessionLocal() as db:
+        game = (await db.execute(select(Game).where(Game.game_id == game_id))).scalar_one()
+        seats = (await db.execute(
+            select(GameParticipant.player_index, GameParticipant.is_winner)
+            .where(GameParticipant.game_id == game_id)
+            .order_by(GameParticipant.player_index)
+        )).all()
+        return game, [tuple(seat) for seat in seats]
+
+
+def test_older_copy_flushed_late_does_not_overwrite_newer_row(run):
+    stale = _active_lobby("game-1", version=4)
+    current = copy.deepcopy(stale)
+    _finish(current, winner_index=1)
+
+    # Worker B writes the finished game, then worker A flushes its queued checkpoint.
+    run(persist_lobbies([current]))
+    run(persist_lobbies([stale]))
+
+    game, seats = run(_stored("game-1"))
+    assert game.status == "completed"
+    assert game.state_version == 5
+    assert game.winner_display_name == "Bob"
+    assert seats == [(0, 0), (1, 1)]
+
+
+def test_newer_and_same_version_copies_still_write(run):
+    lobby = _active_lobby("game-2", version=3)
+    run(persist_lobbies([lobby]))
+
+    lobby.players[0].display_name = "Ann Lee"  # same version: seat changes do not bump it
+    run(persist_lobbies([lobby]))
+    assert run(_stored("game-2"))[0].player_one_display_name == "Ann Lee"
+
+    _finish(lobby, winner_index=0)
+    run(persist_lobbies([lobby]))
+    game, seats = run(_stored("game-2"))
+    assert (game.status, game.state_version) == ("completed", 4)
+    assert seats == [(0, 1), (1, 0)]
+
+
+def test_resaving_a_finished_game_keeps_its_end_time(run):
+    lobby = _active_lobby("game-3", version=7)
+    _finish(lobby, winner_index=1)
+    run(persist_lobbies([lobby]))
+    ended_at = run(_stored("game-3"))[0].ended_at
+    assert ended_at is not None
+
+    # Spilled again later, e.g. by the lobby cache's idle sweep.
+    run(persist_lobbies([lobby]))
+    assert run(_stored("game-3"))[0].ended_at == ended_at
+
+
+def test_reset_clears_the_end_time_for_the_next_game(run):
+    lobby = _active_lobby("game-4", version=2)
+    lobby.status = "aborted"
+    run(persist_lobbies([lobby]))
+    assert run(_stored("game-4"))[0].ended_at is not None
+
+    lobby.status = "waiting"
+    lobby.engine_state = None
+    run(persist_lobbies([lobby]))
+    assert run(_stored("game-4"))[0].ended_at is None
@@ -0,0 +1,147 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import engine
+from app.main import app
+from app.services.lobby_store import lobby_store
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+@pytest.fixture
+def evict(client, monkeypatch):
+    """Spill and drop every resident lobby, as an idle sweep would."""
+    monkeypatch.setattr(lobby_store, "idle_seconds", 0.0)
+    monkeypatch.setattr(lobby_store, "_in_use", lambda game_id: False)
+
+    def run(game_id: str) -> None:
+        client.portal.call(lobby_store.evict)
+        assert client.portal.call(lobby_store.get, game_id) is None
+
+    return run
+
+
+def _headers(player_id: str, token: str = "") -> dict:
+    headers = {"X-Player-ID": player_id}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _register(client, username: str) -> str:
+    response = client.post(
+        "/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": "pw123456"},
+    )
+    return response.json()["access_token"]
+
+
+def _start_two_player_game(client, host_token: str = "", guest_token: str = "") -> tuple[str, list[str]]:
+    created = client.post("/games", json={"player_count": 2}, headers=_headers("", host_token)).json()
+    game_id = created["lobby"]["game_id"]
+    joined = client.post(f"/games/{game_id}/join", json={}, headers=_headers("", guest_token)).json()
+    player_ids = [created["player_id"], joined["player_id"]]
+    for player_id, token in zip(player_ids, (host_token, guest_token)):
+        assert client.post(f"/games/{game_id}/ready", headers=_headers(player_id, token)).status_code == 200
+    return game_id, player_ids
+
+
+def _current_player(client, game_id: str, player_ids: list[str]) -> str:
+    game = client.get(f"/games/{game_id}", headers=_headers(player_ids[0])).json()
+    return player_ids[game["current_player_index"]]
+
+
+def test_waiting_lobby_keeps_its_seats(client, evict):
+    created = client.post("/games", json={"player_count": 3, "display_name": "Host"}).json()
+    game_id, host_id = created["lobby"]["game_id"], created["player_id"]
+    guest_id = client.post(f"/games/{game_id}/join", json={"display_name": "Guest"}).json()["player_id"]
+    assert client.post(f"/games/{game_id}/ready", headers=_headers(host_id)).status_code == 200
+
+    evict(game_id)
+
+    lobby = client.get(f"/games/{game_id}/lobby").json()
+    assert lobby["status"] == "waiting"
+    assert [(p["display_name"], p["ready"]) for p in lobby["players"]] == [("Host", True), ("Guest", False)]
+    third_id = client.post(f"/games/{game_id}/join", json={"display_name": "Third"}).json()["player_id"]
+    assert client.post(f"/games/{game_id}/ready", headers=_headers(guest_id)).status_code == 200
+    assert client.post(f"/games/{game_id}/ready", headers=_headers(third_id)).json()["status"] == "active"
+
+
+def test_active_guest_game_keeps_player_ids(client, evict):
+    game_id, player_ids = _start_two_player_game(client)
+    before = client.get(f"/games/{game_id}", headers=_headers(player_ids[0])).json()
+
+    evict(game_id)
+
+    after = client.get(f"/games/{game_id}", headers=_headers(player_ids[0])).json()
+    assert after["status"] == "active"
+    assert after["tokens"] == before["tokens"]
+    assert after["current_player_index"] == before["current_player_index"]
+    roll = client.post(f"/games/{game_id}/roll", headers=_headers(_current_player(client, game_id, player_ids)))
+    assert roll.status_code == 200, roll.text
+
+
+def test_active_game_of_registered_users(client, evict):
+    host_token, guest_token = _register(client, "evict_host"), _register(client, "evict_guest")
+    game_id, player_ids = _start_two_player_game(client, host_token, guest_token)
+
+    evict(game_id)
+
+    current = _current_player(client, game_id, player_ids)
+    token = host_token if current == player_ids[0] else guest_token
+    assert client.post(f"/games/{game_id}/roll", headers=_headers(current, token)).status_code == 200
+    history = client.get("/auth/me/games", headers={"Authorization": f"Bearer {guest_token}"}).json()
+    assert [item["status"] for item in history if item["game_id"] == game_id] == ["active"]
+
+
+def test_paused_game_resumes(client, evict):
+    game_id, player_ids = _start_two_player_game(client)
+    assert client.post(f"/games/{game_id}/pause", headers=_headers(player_ids[0])).status_code == 200
+
+    evict(game_id)
+
+    assert client.get(f"/games/{game_id}", headers=_headers(player_ids[0])).json()["status"] == "paused"
+    statuses = [
+        client.post(f"/games/{game_id}/resume", headers=_headers(player_id)).json()["status"]
+        for player_id in player_ids
+    ]
+    assert statuses[-1] == "active"
+
+
+def test_finished_game_stays_finished(client, evict):
+    game_id, player_ids = _start_two_player_game(client)
+    game = None
+    for _ in range(5000):
+        game = client.get(f"/games/{game_id}", headers=_headers(player_ids[0])).json()
+        if game["status"] == "finished":
+            break
+        headers = _headers(player_ids[game["current_player_index"]])
+        if not game["has_rolled"]:
+            if not client.post(f"/games/{game_id}/roll", headers=headers).json()["valid_moves"]:
+                client.post(f"/games/{game_id}/pass", headers=headers)
+            continue
+        move = game["valid_moves"][0]
+        client.post(f"/games/{game_id}/move", headers=headers, json=move)
+    assert game["status"] == "finished"
+
+    evict(game_id)
+
+    after = client.get(f"/games/{game_id}", headers=_headers(player_ids[0])).json()
+    assert (after["status"], after["winner_index"]) == ("finished", game["winner_index"])
+
+
+def test_paused_game_keeps_resume_votes(client, evict):
+    game_id, player_ids = _start_two_player_game(client)
+    assert client.post(f"/games/{game_id}/pause", headers=_headers(player_ids[0])).status_code == 200
+    voted = client.post(f"/games/{game_id}/resume", headers=_headers(player_ids[0])).json()
+    assert voted["status"] == "paused"
+
+    evict(game_id)
+
+    resumed = client.post(f"/games/{game_id}/resume", headers=_headers(player_ids[1])).json()
+    assert resumed["status"] == "active"
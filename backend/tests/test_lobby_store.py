@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from app.services.lobby_store import (
+    LobbyConflictError,
+    LobbyRecord,
+    LobbyStore,
+    PlayerRecord,
+    SqliteLobbyStore,
+    dict_to_lobby,
+    lobby_to_dict,
+)
+
+
+def _lobby(game_id: str, *user_ids) -> LobbyRecord:
+    return LobbyRecord(
+        game_id=game_id,
+        player_count=4,
+        players=[
+            PlayerRecord(player_id=f"p{i}", color=color, player_index=i, display_name=f"P{i}", user_id=user_id)
+            for i, (color, user_id) in enumerate(zip(("red", "yellow", "green", "blue"), user_ids))
+        ],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A fresh SQLite store and a runner that keeps its connections on one loop."""
+    sqlite_store = SqliteLobbyStore(str(tmp_path / "lobbies.db"))
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(sqlite_store.start())
+    yield sqlite_store, loop.run_until_complete
+    loop.run_until_complete(sqlite_store.close())
+    loop.close()
+
+
+def test_seat_lookups_follow_added_players_and_bound_users():
+    lobby = _lobby("game-1", 7)
+    guest = PlayerRecord(player_id="guest", color="yellow", player_index=1, display_name="Guest")
+    lobby.add_player(guest)
+    assert lobby.player_by_id("guest") is guest
+    assert lobby.player_by_color("yellow") is guest
+    assert lobby.player_by_index(1) is guest
+    assert lobby.player_by_user(7) is lobby.players[0]
+    assert (lobby.player_by_id(None), lobby.player_by_user(None), lobby.player_by_color(None)) == (None, None, None)
+
+    lobby.bind_user(guest, 8)
+    lobby.bind_user(lobby.players[0], None)
+    assert lobby.player_by_user(8) is guest
+    assert lobby.player_by_user(7) is None
+    assert lobby.user_ids() == frozenset({8})
+
+
+def test_seat_lookups_survive_serialization_and_keep_the_first_duplicate():
+    lobby = _lobby("game-1", 7, 8)
+    restored = dict_to_lobby(lobby_to_dict(lobby))
+    assert restored.player_by_user(8).player_id == "p1"
+    assert restored.indexed_user_ids == frozenset({7, 8})
+
+    # A linear scan finds the first matching seat; the index must agree.
+    restored.add_player(PlayerRecord(player_id="p1", color="green", player_index=2, display_name="Dup"))
+    assert restored.player_by_id("p1").color == "yellow"
+    assert restored.player_by_color("green").display_name == "Dup"
+
+
+def test_store_without_required_methods_cannot_be_built():
+    class Partial(LobbyStore):
+        async def get(self, game_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_add_rejects_a_taken_game_id(store):
+    sqlite_store, run = store
+    run(sqlite_store.add(_lobby("game-1", 7)))
+    with pytest.raises(LobbyConflictError):
+        run(sqlite_store.add(_lobby("game-1", 8)))
+    assert [p.user_id for p in run(sqlite_store.get("game-1")).players] == [7]
+
+
+def test_save_from_a_stale_copy_conflicts(store):
+    sqlite_store, run = store
+    run(sqlite_store.add(_lobby("game-1")))
+    first = run(sqlite_store.get("game-1"))
+    second = run(sqlite_store.get("game-1"))
+
+    first.status = "active"
+    run(sqlite_store.save(first))
+    second.status = "paused"
+    with pytest.raises(LobbyConflictError):
+        run(sqlite_store.save(second))
+    assert sqlite_store.conflicts == 1
+
+    stored = run(sqlite_store.get("game-1"))
+    assert (stored.status, stored.store_version) == ("active", 2)
+    stored.status = "paused"
+    run(sqlite_store.save(stored))  # a reloaded copy saves fine
+    assert run(sqlite_store.get("game-1")).status == "paused"
+
+
+def test_games_for_user_follows_seat_changes(store):
+    sqlite_store, run = store
+    run(sqlite_store.add(_lobby("game-1", 7, None)))
+    run(sqlite_store.add(_lobby("game-2", 8, 7)))
+    assert sorted(lobby.game_id for lobby in run(sqlite_store.games_for_user(7))) == ["game-1", "game-2"]
+
+    lobby = run(sqlite_store.get("game-1"))
+    lobby.bind_user(lobby.players[0], None)
+    lobby.bind_user(lobby.players[1], 9)
+    run(sqlite_store.save(lobby))
+    assert [lobby.game_id for lobby in run(sqlite_store.games_for_user(7))] == ["game-2"]
+    assert [lobby.game_id for lobby in run(sqlite_store.games_for_user(9))] == ["game-1"]
+
+    run(sqlite_store.delete("game-2"))
+    assert run(sqlite_store.games_for_user(7)) == []
+    assert run(sqlite_store.games_for_user(8)) == []
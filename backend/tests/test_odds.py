@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import engine
+from app.main import app
+from app.services.game_engine import get_engine
+from app.services.odds import MIN_ROLLOUTS, OddsBusy, OddsRequest, OddsService, estimate, odds_service
+
+
+def _request(seed: int = 1, time_budget: float = 0.0) -> OddsRequest:
+    state = get_engine(4).new_game()
+    return OddsRequest(
+        active_colors=tuple(state.active_colors),
+        positions=bytes(state.positions),
+        seat=state.current_player_index,
+        seed=seed,
+        chance_rate=0.1,
+        time_budget=time_budget,
+    )
+
+
+@pytest.fixture
+def service():
+    """An odds service on threads instead of spawned processes, to keep the tests quick."""
+    odds = OddsService(workers=2, cache_size=2, max_pending=8)
+    odds._executor = ThreadPoolExecutor(max_workers=2)
+    yield odds
+    odds.shutdown()
+
+
+def test_estimate_is_reproducible_for_a_position():
+    first = estimate(_request(seed=5))
+    assert first.rollouts == MIN_ROLLOUTS
+    assert first.wins == estimate(_request(seed=5)).wins
+    assert sum(first.probabilities) == pytest.approx(1.0)
+
+
+def test_concurrent_requests_for_a_position_share_one_estimate(service):
+    async def main():
+        results = await asyncio.gather(*(service.estimate(1, _request(time_budget=0.05)) for _ in range(5)))
+        again = await service.estimate(1, _request(time_budget=0.05))
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert len({id(result) for result, _ in results}) == 1
+    assert [cached for _, cached in results] == [False, True, True, True, True]
+    assert again == (results[0][0], True)
+    stats = service.stats()
+    assert (stats["computed"], stats["coalesced"], stats["hits"], stats["pending"]) == (1, 4, 1, 0)
+
+
+def test_cache_keeps_the_most_recently_used_positions(service):
+    async def main():
+        await service.estimate(1, _request(seed=1))
+        await service.estimate(2, _request(seed=2))
+        await service.estimate(1, _request(seed=1))  # 1 is now newer than 2
+        await service.estimate(3, _request(seed=3))
+        return [(await service.estimate(key, _request(seed=key)))[1] for key in (1, 2)]
+
+    assert asyncio.run(main()) == [True, False]
+
+
+def test_too_many_pending_estimates_are_refused(service):
+    service.max_pending = 1
+
+    async def main():
+        first = asyncio.create_task(service.estimate(1, _request(time_budget=0.05)))
+        await asyncio.sleep(0)
+        with pytest.raises(OddsBusy):
+            await service.estimate(2, _request(seed=2))
+        await first
+
+    asyncio.run(main())
+    assert service.rejected == 1
+
+
+def test_odds_endpoint_serves_repeat_requests_from_the_cache(monkeypatch):
+    monkeypatch.setattr(odds_service, "_executor", ThreadPoolExecutor(max_workers=1))
+    with TestClient(app) as client:
+        created = client.post("/games", json={"player_count": 2}).json()
+        game_id = created["lobby"]["game_id"]
+        joined = client.post(f"/games/{game_id}/join", json={}).json()
+        for player_id in (created["player_id"], joined["player_id"]):
+            client.post(f"/games/{game_id}/ready", headers={"X-Player-ID": player_id})
+
+        first = client.get(f"/games/{game_id}/odds").json()
+        second = client.get(f"/games/{game_id}/odds").json()
+        client.portal.call(engine.dispose)
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["odds"] == first["odds"]
+    assert second["position_hash"] == first["position_hash"]
+    assert sum(color["win_probability"] for color in first["odds"]) == pytest.approx(1.0, abs=1e-3)
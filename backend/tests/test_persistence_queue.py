@@ -0,0 +1,53 @@
+import asyncio
+
+from app.services.persistence import WriteBehindQueue
+
+
+class _SlowWriter:
+    """Flush function that takes a while, so a stop can land mid-write."""
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.written: list = []
+
+    async def __call__(self, items: list) -> None:
+        self.started.set()
+        await asyncio.sleep(0.05)
+        self.written.extend(items)
+
+
+def test_stop_during_flush_writes_the_in_flight_batch():
+    async def main():
+        queue = WriteBehindQueue(interval=60, threshold=2)
+        writer = _SlowWriter()
+        queue.start(writer)
+        queue.mark_dirty("a", "a1")
+        queue.mark_dirty("b", "b1")
+        await writer.started.wait()
+        queue.mark_dirty("a", "a2")  # marked while the first batch is being written
+        await queue.stop()
+        return writer.written, queue.pending()
+
+    written, pending = asyncio.run(main())
+    assert written == ["a1", "b1", "a2"]
+    assert pending == 0
+
+
+def test_cancelled_flush_puts_the_batch_back():
+    async def main():
+        queue = WriteBehindQueue(interval=60, threshold=100)
+        writer = _SlowWriter()
+        queue.start(writer)
+        queue.mark_dirty("a", "a1")
+        queue.mark_dirty("b", "b1")
+        flush = asyncio.create_task(queue.flush())
+        await writer.started.wait()
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions=True)
+        pending = queue.pending()
+        await queue.stop()
+        return pending, writer.written
+
+    pending, written = asyncio.run(main())
+    assert pending == 2
+    assert written == ["a1", "b1"]
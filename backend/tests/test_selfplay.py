@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.simulation.benchmark import BASELINE_PATH, PLAYER_COUNTS, _fingerprint
+from app.simulation.selfplay import play_games
+
+BASELINE = json.loads(BASELINE_PATH.read_text())
+
+
+@pytest.mark.parametrize("player_count", PLAYER_COUNTS)
+def test_seeded_games_match_saved_baseline(player_count):
+    config = BASELINE["config"]
+    results = play_games(
+        player_count,
+        config["games"],
+        seed=config["seed"],
+        policies=config["policy"],
+        chance_rate=config["chance_rate"],
+    )
+    assert all(result.winner_index is not None for result in results)
+    assert _fingerprint(results) == BASELINE["results"][str(player_count)]["fingerprint"]
+
+
+def test_same_seed_plays_the_same_games():
+    first = play_games(4, 20, seed=7, policies=["random", "greedy", "first", "random"], chance_rate=0.2)
+    again = play_games(4, 20, seed=7, policies=["random", "greedy", "first", "random"], chance_rate=0.2)
+    assert first == again
+    assert play_games(4, 20, seed=8, chance_rate=0.2) != first
+
+
+def test_every_game_is_accounted_for():
+    for result in play_games(3, 30, seed=11, chance_rate=0.3):
+        assert result.turns == result.rolls + sum(result.chances.values())
+        assert result.rolls == result.moves + result.passes
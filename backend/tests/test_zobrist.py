@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from app.services.game_engine import (
+    ZOBRIST_ROLL,
+    ZOBRIST_SEATING,
+    ZOBRIST_TOKEN,
+    ZOBRIST_TURN,
+    ZOBRIST_WINNER,
+    GameEngineState,
+    advance_turn,
+    dict_to_state,
+    end_chance_turn,
+    end_move_turn,
+    get_engine,
+    state_to_dict,
+)
+
+
+def _full_zobrist(state: GameEngineState) -> int:
+    value = 0
+    for slot, code in enumerate(state.positions):
+        value ^= ZOBRIST_TOKEN[slot][code]
+    for color_slot, color in enumerate(state.active_colors):
+        value ^= ZOBRIST_SEATING[(color_slot, color)]
+    value ^= ZOBRIST_TURN[state.current_player_index]
+    value ^= ZOBRIST_ROLL[(state.last_roll or 0) + (7 if state.has_rolled else 0)]
+    if state.winner_index is not None:
+        value ^= ZOBRIST_WINNER[state.winner_index]
+    return value
+
+
+def _played_states(player_count: int, games: int, seed: int):
+    """Every state reached by random play with chance, before and after each roll."""
+    engine = get_engine(player_count)
+    rng = random.Random(seed)
+    for _ in range(games):
+        state = engine.new_game()
+        while state.winner_index is None:
+            yield state
+            if rng.random() < 0.1:
+                _, turns = engine.apply_chance(state, engine.draw_chance(rng))
+                end_chance_turn(state, turns)
+                continue
+            roll = engine.roll_dice(rng)
+            state.last_roll, state.has_rolled = roll, True
+            yield state
+            options = engine.move_options(state, roll)
+            if not options:
+                advance_turn(state)
+                continue
+            option = rng.choice(options)
+            end_move_turn(state, engine.apply_move(state, option.color, option.token_index, roll))
+        yield state
+
+
+@pytest.mark.parametrize("player_count", [2, 3, 4])
+def test_incremental_zobrist_matches_full_recompute(player_count):
+    for state in _played_states(player_count, games=10, seed=100 + player_count):
+        assert state.zobrist == _full_zobrist(state)
+        assert dict_to_state(state_to_dict(state)).zobrist == state.zobrist
+
+
+def test_zobrist_distinguishes_seating_turn_and_roll():
+    hashes = {get_engine(player_count).new_game().zobrist for player_count in (2, 3, 4)}
+    assert len(hashes) == 3
+
+    state = get_engine(2).new_game()
+    before = state.zobrist
+    state.last_roll, state.has_rolled = 6, True
+    rolled = state.zobrist
+    state.current_player_index = 1
+    assert len({before, rolled, state.zobrist}) == 3
@@ -1,5 +1,8 @@
 const RAW_API_BASE_URL = import.meta.env.VITE_API_BASE_URL ?? "";
 
+// Largest page GET /auth/me/games serves.
+const HISTORY_PAGE_SIZE = 200;
+
 const NETWORK_ERROR_MSG =
   "Could not reach the server. Make sure the backend is running on port 8080.";
 
@@ -36,7 +39,12 @@ async function readErrorDetail(response: Response, fallback: string): Promise<st
   }
 }
 
-async function requestJson<T>(path: string, init: RequestInit, fallback: string): Promise<T> {
+async function requestJson<T>(
+  path: string,
+  init: RequestInit,
+  fallback: string,
+  onHeaders?: (headers: Headers) => void
+): Promise<T> {
   const candidates = getApiBaseCandidates();
   let lastError: Error | null = null;
   let sawOnlyNotFound = true;
@@ -55,6 +63,7 @@ async function requestJson<T>(path: string, init: RequestInit, fallback: string)
         }
         throw new Error(detail);
       }
+      onHeaders?.(response.headers);
       return (await response.json()) as T;
     } catch (e) {
       if (e instanceof TypeError) {
@@ -281,11 +290,24 @@ export async function resetGame(
 }
 
 export async function fetchMyGames(token: string): Promise<import("../types/game").GameHistoryItem[]> {
-  return requestJson<import("../types/game").GameHistoryItem[]>(
-    "/auth/me/games",
-    { headers: { Authorization: `Bearer ${token}` } },
-    "Failed to fetch game history"
-  );
+  // History is served in pages; follow X-Next-Cursor until the last one.
+  const games: import("../types/game").GameHistoryItem[] = [];
+  let cursor: string | null = null;
+  do {
+    const query: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const paging: { next: string | null } = { next: null };
+    const page = await requestJson<import("../types/game").GameHistoryItem[]>(
+      `/auth/me/games?limit=${HISTORY_PAGE_SIZE}${query}`,
+      { headers: { Authorization: `Bearer ${token}` } },
+      "Failed to fetch game history",
+      (headers) => {
+        paging.next = headers.get("X-Next-Cursor");
+      }
+    );
+    games.push(...page);
+    cursor = paging.next;
+  } while (cursor);
+  return games;
 }
 
 export async function deleteMyGame(gameId: string, token: string): Promise<void> {
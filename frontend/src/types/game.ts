@@ -18,6 +18,7 @@ export interface LobbyPlayer {
   display_name: string;
   ready: boolean;
   connected: boolean;
+  is_bot?: boolean;
 }
 
 export interface LobbyState {